@@ -0,0 +1,265 @@
+"""
+Seekable block-gzip JSONL with a sidecar record index.
+
+A block-gzip file is an ordinary multi-member gzip stream in which every
+member holds whole JSONL records (≈64 KiB uncompressed per block), so plain
+`gzip.open` / `zcat` still stream it unchanged.  Next to it lives
+`<file>.idx`:
+
+    magic  b"BGZIDX1\\0"
+    uint64 n_blocks, uint64 n_records
+    uint64 block_offset[n_blocks + 1]     (compressed byte offsets, + EOF)
+    uint64 first_record[n_blocks + 1]     (record number, + n_records)
+
+That gives
+  • count()           – number of records without decompressing anything
+  • get(i)            – record i, decompressing one block
+  • get_many(idx)     – a batch of records, one decompression per block
+  • iter_blocks(a, b) – records of blocks [a, b), i.e. one byte range,
+                        so N readers can split a file with shard_blocks()
+
+The writer can also commit() mid-stream (close the current block, fsync,
+persist the index) and later resume from that point, which is what
+common.checkpoint builds on.
+
+Usage
+-----
+    python -m common.blockgz convert data/news_segmented.jsonl.gz   # re-block + index
+    python -m common.blockgz count   data/news_segmented.jsonl.gz
+    python -m common.blockgz get     data/news_segmented.jsonl.gz 123456
+"""
+from __future__ import annotations
+
+import argparse
+import bisect
+import io
+import os
+import struct
+import sys
+import zlib
+from array import array
+from pathlib import Path
+from typing import Iterator, List, Tuple
+
+MAGIC = b"BGZIDX1\0"
+BLOCK_SIZE = 1 << 16
+
+
+def index_path(path) -> Path:
+    return Path(f"{path}.idx")
+
+
+def load_index(path) -> Tuple[array, array, int]:
+    """(block offsets, first record numbers, n_records) from `<path>.idx`."""
+    with open(index_path(path), "rb") as f:
+        if f.read(len(MAGIC)) != MAGIC:
+            raise ValueError(f"{index_path(path)} is not a block-gzip index")
+        n_blocks, n_records = struct.unpack("<QQ", f.read(16))
+        offsets = array("Q")
+        offsets.frombytes(f.read(8 * (n_blocks + 1)))
+        firsts = array("Q")
+        firsts.frombytes(f.read(8 * (n_blocks + 1)))
+    return offsets, firsts, n_records
+
+
+class BlockGzipWriter(io.RawIOBase):
+    """
+    Binary write stream that cuts its input into gzip members at record
+    (newline) boundaries and writes the sidecar index on close.
+
+    With *resume_at* (a size returned by an earlier commit()), reopen the
+    file at that point instead: later bytes are truncated away and the
+    index state is restored, so writing continues as if never interrupted.
+    """
+
+    def __init__(self, path, level: int = 3, block_size: int = BLOCK_SIZE,
+                 resume_at: int | None = None):
+        self.path = Path(path)
+        self.level = level
+        self.block_size = block_size
+        self._pending = bytearray()
+        if resume_at is not None:
+            offsets, firsts, _ = load_index(self.path)
+            k = bisect.bisect_left(offsets, resume_at)
+            if k == len(offsets) or offsets[k] != resume_at:
+                raise ValueError(f"{self.path}: {resume_at} is not a block boundary")
+            self._f = open(self.path, "r+b")
+            self._f.truncate(resume_at)
+            self._f.seek(resume_at)
+            self._offsets, self._firsts = offsets[:k], firsts[:k]
+            self._records = firsts[k]
+        else:
+            self._f = open(self.path, "wb")
+            self._offsets = array("Q")
+            self._firsts = array("Q")
+            self._records = 0
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, b) -> int:
+        self._pending += b
+        while len(self._pending) >= self.block_size:
+            cut = self._pending.rfind(b"\n", 0, self.block_size) + 1
+            if cut == 0:  # one record longer than a block: take it whole
+                cut = self._pending.find(b"\n") + 1
+                if cut == 0:
+                    break
+            self._emit(bytes(self._pending[:cut]))
+            del self._pending[:cut]
+        return len(b)
+
+    def _emit(self, block: bytes) -> None:
+        self._offsets.append(self._f.tell())
+        self._firsts.append(self._records)
+        co = zlib.compressobj(self.level, zlib.DEFLATED, 31)  # 31 → gzip header
+        self._f.write(co.compress(block) + co.flush())
+        self._records += block.count(b"\n")
+
+    def _close_block(self) -> None:
+        if self._pending:
+            if not self._pending.endswith(b"\n"):
+                self._pending += b"\n"
+            self._emit(bytes(self._pending))
+            self._pending.clear()
+
+    def _write_index(self, end: int) -> None:
+        tmp = index_path(self.path).with_suffix(".idx.tmp")
+        with open(tmp, "wb") as f:
+            f.write(MAGIC + struct.pack("<QQ", len(self._offsets), self._records))
+            f.write(self._offsets.tobytes() + struct.pack("<Q", end))
+            f.write(self._firsts.tobytes() + struct.pack("<Q", self._records))
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, index_path(self.path))
+
+    def commit(self) -> int:
+        """Close the current block, fsync and persist the index; returns the file size."""
+        self._close_block()
+        self._f.flush()
+        os.fsync(self._f.fileno())
+        end = self._f.tell()
+        self._write_index(end)
+        return end
+
+    def close(self) -> None:
+        if self.closed:
+            return
+        self._close_block()
+        end = self._f.tell()
+        self._f.close()
+        self._write_index(end)
+        super().close()
+
+
+class BlockGzipFile:
+    """Random-access reader over a block-gzip file and its index."""
+
+    def __init__(self, path):
+        self.path = Path(path)
+        self.offsets, self.firsts, self.n_records = load_index(self.path)
+        if self.offsets[-1] != self.path.stat().st_size:
+            raise ValueError(f"stale index {index_path(self.path)}: "
+                             f"{self.path} was rewritten without it")
+        self.n_blocks = len(self.offsets) - 1
+        self._f = open(self.path, "rb")
+
+    def count(self) -> int:
+        return self.n_records
+
+    def read_block(self, b: int) -> List[bytes]:
+        """Raw JSONL lines (newline included) of block *b*."""
+        self._f.seek(self.offsets[b])
+        data = self._f.read(self.offsets[b + 1] - self.offsets[b])
+        return zlib.decompress(data, 31).splitlines(keepends=True)
+
+    def block_of(self, i: int) -> int:
+        if not 0 <= i < self.n_records:
+            raise IndexError(i)
+        return bisect.bisect_right(self.firsts, i, 0, self.n_blocks) - 1
+
+    def get(self, i: int) -> bytes:
+        b = self.block_of(i)
+        return self.read_block(b)[i - self.firsts[b]]
+
+    def get_many(self, indices) -> List[bytes]:
+        """Records at *indices* (in that order), decompressing each block once."""
+        by_block = {}
+        for i in indices:
+            by_block.setdefault(self.block_of(i), []).append(i)
+        found = {}
+        for b, idx in by_block.items():
+            lines = self.read_block(b)
+            for i in idx:
+                found[i] = lines[i - self.firsts[b]]
+        return [found[i] for i in indices]
+
+    def iter_blocks(self, start: int = 0, stop: int | None = None) -> Iterator[bytes]:
+        for b in range(start, self.n_blocks if stop is None else stop):
+            yield from self.read_block(b)
+
+    def shard_blocks(self, n: int) -> List[Tuple[int, int]]:
+        """Split the blocks into *n* contiguous ranges of similar byte size."""
+        total = self.offsets[-1]
+        bounds = [0]
+        for k in range(1, n):
+            bounds.append(bisect.bisect_left(self.offsets, total * k // n, 0, self.n_blocks))
+        bounds.append(self.n_blocks)
+        return [(a, b) for a, b in zip(bounds, bounds[1:])]
+
+    def close(self) -> None:
+        self._f.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def is_indexed(path) -> bool:
+    """True if *path* has a valid, up-to-date block index."""
+    try:
+        BlockGzipFile(path).close()
+    except (OSError, ValueError):
+        return False
+    return True
+
+
+def convert(path, level: int = 3) -> None:
+    """
+    Rewrite a (single-stream) gzip JSONL file as block-gzip + index, in
+    place.  Blank lines are dropped, as readers skip them, so that line
+    numbers in the index are record numbers.
+    """
+    import gzip
+
+    path = Path(path)
+    tmp = path.with_name(path.name + ".tmp")
+    with gzip.open(path, "rb") as fin, BlockGzipWriter(tmp, level) as fout:
+        while lines := fin.readlines(1 << 20):
+            fout.write(b"".join(line for line in lines if line.strip()))
+    os.replace(tmp, path)
+    os.replace(index_path(tmp), index_path(path))
+
+
+# ---------------------------------------------------------------------------
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser()
+    sub = ap.add_subparsers(dest="cmd", required=True)
+    for name in ("convert", "count", "get"):
+        p = sub.add_parser(name)
+        p.add_argument("path")
+        if name == "get":
+            p.add_argument("i", type=int)
+    args = ap.parse_args()
+
+    if args.cmd == "convert":
+        convert(args.path)
+        print(f"✅ {args.path} re-blocked, index → {index_path(args.path)}")
+    elif args.cmd == "count":
+        with BlockGzipFile(args.path) as bg:
+            print(bg.count())
+    else:
+        with BlockGzipFile(args.path) as bg:
+            sys.stdout.buffer.write(bg.get(args.i))
@@ -0,0 +1,223 @@
+"""
+Crash-safe, resumable stage output.
+
+A stage writes through a `Checkpoint` instead of a bare record writer and
+reports how many input records it has fully consumed.  Every *every* input
+records (at the stage's own batch boundaries) the output is committed:
+
+  • buffered lines are flushed, the current gzip block is closed, the file
+    is fsync'ed and, for block-gzip, the `.idx` is rewritten;
+  • `<output>.ckpt.json` is atomically replaced with the input offset, the
+    record count and the sha256 of every committed output segment.
+
+After a crash, `--resume` re-opens the output at the last commit (verifying
+the committed segments first, truncating anything after them) and the stage
+re-reads its input from the recorded offset.  Commit points depend only on
+the input, so a resumed run is byte-identical to an uninterrupted one.
+
+With `--incremental` an existing output is kept: input articles whose ID
+it already held when the run started are skipped via seen() and only the
+delta is appended.  The IDs of the written articles are committed
+alongside, to `<output>.ids` (common.incremental), which only incremental
+runs keep; a full run deletes it, and seen() is then always False.  In
+both modes repeated IDs within one input are written as they come.
+
+Resumable outputs are plain JSONL and block-gzip JSONL (*.jsonl, *.jsonl.gz);
+other formats are written normally, without a manifest.
+
+Manifest
+--------
+    {"input": ..., "output": ..., "records_in": 900000, "records_out": 900000,
+     "bytes_out": 123456789, "base_bytes": 0, "ids": 0, "base_ids": 0,
+     "incremental": false, "complete": false,
+     "segments": [{"records_in": 10000, "bytes": 1234567, "sha256": "…"}, …]}
+
+`base_bytes` / `base_ids` are where this run started appending (0 unless
+incremental); `segments` cover the bytes written by this run.
+
+Usage
+-----
+    with Checkpoint(inp, out, resume=args.resume,
+                    incremental=args.incremental) as ckpt:
+        for art in read_records(inp, start=ckpt.start):
+            if not ckpt.seen(art):
+                ckpt.write(process(art))
+            ckpt.advance()
+"""
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+from pathlib import Path
+
+from common.incremental import IdIndex, content_id
+from common.records import (COLUMNAR_SUFFIXES, JsonlWriter, compression_for,
+                            open_writer)
+
+DEFAULT_EVERY = 10_000     # input records between commits
+
+
+def manifest_path(out_path) -> Path:
+    return Path(f"{out_path}.ckpt.json")
+
+
+def is_resumable(out_path) -> bool:
+    return (Path(out_path).suffix not in COLUMNAR_SUFFIXES
+            and compression_for(out_path) in ("gzip", "none"))
+
+
+def _sha256(path, start: int, stop: int) -> str:
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        f.seek(start)
+        left = stop - start
+        while left:
+            chunk = f.read(min(left, 1 << 20))
+            if not chunk:
+                raise ValueError(f"{path} is shorter than its checkpoint")
+            h.update(chunk)
+            left -= len(chunk)
+    return h.hexdigest()
+
+
+class Checkpoint:
+    """Record writer for *out_path* that commits every *every* input records."""
+
+    def __init__(self, in_path, out_path, resume: bool = False,
+                 every: int = DEFAULT_EVERY, codec: str | None = None,
+                 level: int | None = None, incremental: bool = False):
+        self.in_path, self.out_path = str(in_path), str(out_path)
+        self.every = every
+        self.enabled = is_resumable(out_path)
+        self.incremental = incremental
+        self.manifest = manifest_path(out_path)
+        self.records_in = self.records_out = self.bytes_out = self.base_bytes = 0
+        self.base_ids = 0
+        self.segments: list[dict] = []
+        self.ids: IdIndex | None = None
+
+        if (resume or incremental) and not self.enabled:
+            raise ValueError(f"--resume / --incremental are not supported for "
+                             f"{out_path} (use .jsonl or .jsonl.gz)")
+        if resume:
+            self._load()
+            self._f = JsonlWriter(out_path, codec, level, resume_at=self.bytes_out)
+        elif incremental and Path(out_path).exists():
+            self._append()
+            self._f = JsonlWriter(out_path, codec, level, resume_at=self.bytes_out)
+        elif self.enabled:
+            self.manifest.unlink(missing_ok=True)
+            if incremental:
+                self.ids = IdIndex.fresh(out_path)
+            else:
+                IdIndex.discard(out_path)
+            self._f = JsonlWriter(out_path, codec, level)
+        else:
+            self._f = open_writer(out_path, codec, level)
+        self.start = self.records_in
+        self._last_commit = self.records_in
+
+    # -- resume ---------------------------------------------------------------
+    def _load(self) -> None:
+        if not self.manifest.exists():
+            raise FileNotFoundError(f"no checkpoint {self.manifest} to resume from")
+        m = json.loads(self.manifest.read_text())
+        if m["input"] != self.in_path:
+            raise ValueError(f"{self.manifest} was written for input {m['input']}, "
+                             f"not {self.in_path}")
+        pos = m["base_bytes"]
+        for seg in m["segments"]:
+            if _sha256(self.out_path, pos, seg["bytes"]) != seg["sha256"]:
+                raise ValueError(f"{self.out_path}: committed bytes {pos}–{seg['bytes']} "
+                                 "do not match the checkpoint")
+            pos = seg["bytes"]
+        self.records_in = m["records_in"]
+        self.records_out = m["records_out"]
+        self.bytes_out = m["bytes_out"]
+        self.base_bytes = m["base_bytes"]
+        self.segments = m["segments"]
+        self.incremental = m["incremental"]
+        if self.incremental:
+            self.base_ids = m.get("base_ids", m["ids"])
+            self.ids = IdIndex.open(self.out_path, m["ids"], known=self.base_ids)
+
+    def _append(self) -> None:
+        """Start an incremental run at the end of the existing output."""
+        size = n_ids = None
+        if self.manifest.exists():
+            m = json.loads(self.manifest.read_text())
+            if not m["complete"]:
+                raise ValueError(f"{self.out_path} has an unfinished run; "
+                                 "complete it with --resume first")
+            size = m["bytes_out"]
+            # a full run keeps no `.ids`; IdIndex.open rebuilds it from the output
+            n_ids = m["ids"] if m["incremental"] else None
+        self.ids = IdIndex.open(self.out_path, n_ids)
+        self.records_out = self.base_ids = self.ids.size
+        self.bytes_out = self.base_bytes = (Path(self.out_path).stat().st_size
+                                            if size is None else size)
+
+    def seen(self, art: dict) -> bool:
+        """True if *art* was in the output before this (incremental) run: skip it."""
+        return self.ids is not None and content_id(art) in self.ids
+
+    # -- writing --------------------------------------------------------------
+    def write(self, rec: dict) -> None:
+        self._f.write(rec)
+        self.records_out += 1
+        if self.ids is not None:  # keyed like seen()
+            self.ids.append(content_id(rec))
+
+    def advance(self, n: int = 1) -> None:
+        """Mark *n* more input records as fully written; commits when due."""
+        self.records_in += n
+        if self.records_in - self._last_commit >= self.every:
+            self.commit()
+
+    def commit(self, complete: bool = False) -> None:
+        if not self.enabled:
+            return
+        size = self._f.commit()
+        if size != self.bytes_out:
+            self.segments.append({"records_in": self.records_in, "bytes": size,
+                                  "sha256": _sha256(self.out_path, self.bytes_out, size)})
+            self.bytes_out = size
+        n_ids = self.ids.commit() if self.ids is not None else 0
+        self._last_commit = self.records_in
+        state = {"input": self.in_path, "output": self.out_path,
+                 "records_in": self.records_in, "records_out": self.records_out,
+                 "bytes_out": self.bytes_out, "base_bytes": self.base_bytes,
+                 "ids": n_ids, "base_ids": self.base_ids,
+                 "incremental": self.incremental,
+                 "complete": complete, "segments": self.segments}
+        tmp = self.manifest.with_suffix(".tmp")
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(state, f, indent=1)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, self.manifest)
+
+    def close(self) -> None:
+        self.commit(complete=True)
+        self._f.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, *exc):
+        if exc_type is None:
+            self.close()
+        else:  # leave the manifest at the last commit
+            self._f.close()
+
+
+def add_arguments(ap) -> None:
+    """The --resume / --incremental / --checkpoint-every flags of the stage scripts."""
+    ap.add_argument("--resume", action="store_true",
+                    help="continue from the last checkpoint of OUTPUT")
+    ap.add_argument("--incremental", action="store_true",
+                    help="keep OUTPUT and only process (and append) input "
+                         "articles whose ID it does not hold yet")
+    ap.add_argument("--checkpoint-every", type=int, default=DEFAULT_EVERY,
+                    help=f"input records between commits (default {DEFAULT_EVERY:,})")
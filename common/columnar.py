@@ -0,0 +1,166 @@
+"""
+Columnar (Arrow IPC / Parquet) storage for pipeline records.
+
+Row-oriented JSONL spends most of its bytes and parse time on the
+`sentences` and `sentiments` lists.  Here every record field becomes a
+typed column:
+
+  • sentences        list<string>   – one flat UTF-8 buffer + per-article offsets
+  • tickers          list<string>
+  • sentiment_ids    list<int8>     – 0 NEG, 1 NEU, 2 POS
+  • sentiment_conf   list<float64>
+  • sectors          map<string, float64>
+  • overall / sectors_summary  struct / map<string, struct>  (final schema)
+
+Any other field is typed from the first batch of rows.  A `sentiments`
+list of dicts is stored as the two flat sentiment_* columns.
+
+Arrow IPC files (.arrow / .feather) are memory-mapped on read; Parquet files
+(.parquet) are compressed and directly usable for ad-hoc analysis, e.g.
+    pandas.read_parquet(path, columns=["date", "tickers"])
+"""
+from __future__ import annotations
+
+from pathlib import Path
+from typing import Dict, Iterator, List
+
+import pyarrow as pa
+import pyarrow.ipc as ipc
+import pyarrow.parquet as pq
+
+LABELS = ["NEG", "NEU", "POS"]
+LABEL_ID = {lbl: i for i, lbl in enumerate(LABELS)}
+
+_SCORE = pa.struct([("label", pa.string()), ("confidence", pa.float64())])
+KNOWN_TYPES = {
+    "id": pa.string(),
+    "sentences": pa.list_(pa.string()),
+    "tickers": pa.list_(pa.string()),
+    "ticker_mentions": pa.list_(pa.list_(pa.int32())),
+    "sentiment_ids": pa.list_(pa.int8()),
+    "sentiment_conf": pa.list_(pa.float64()),
+    "sectors": pa.map_(pa.string(), pa.float64()),
+    "overall": _SCORE,
+    "sectors_summary": pa.map_(pa.string(), pa.struct(
+        [("weight", pa.float64()), ("label", pa.string()), ("confidence", pa.float64())])),
+}
+PARQUET_SUFFIXES = {".parquet", ".pq"}
+ARROW_SUFFIXES = {".arrow", ".feather", ".ipc"}
+
+
+def is_columnar(path) -> bool:
+    return Path(path).suffix in PARQUET_SUFFIXES | ARROW_SUFFIXES
+
+
+# ---------------------------------------------------------------------------
+# Writing
+# ---------------------------------------------------------------------------
+def _to_row(rec: dict) -> dict:
+    """Replace a `sentiments` list of dicts by the two flat columns."""
+    if "sentiments" not in rec:
+        return rec
+    rec = dict(rec)
+    sents = rec.pop("sentiments")
+    rec["sentiment_ids"] = [LABEL_ID[s["label"]] for s in sents]
+    rec["sentiment_conf"] = [s["confidence"] for s in sents]
+    return rec
+
+
+def infer_schema(rows: List[dict]) -> pa.Schema:
+    fields = []
+    for key in dict.fromkeys(k for r in rows for k in r):
+        typ = KNOWN_TYPES.get(key)
+        if typ is None:
+            typ = pa.array([r.get(key) for r in rows]).type
+            if pa.types.is_null(typ):  # all-null in the first batch
+                typ = pa.string()
+        fields.append(pa.field(key, typ))
+    return pa.schema(fields)
+
+
+class ColumnarWriter:
+    """Buffer rows and flush them as Parquet row groups / IPC record batches."""
+
+    def __init__(self, path, batch_size: int = 10_000):
+        self.path = Path(path)
+        self.batch_size = batch_size
+        self.rows: List[dict] = []
+        self.schema: pa.Schema | None = None
+        self._writer = None
+
+    def write(self, rec: dict) -> None:
+        self.rows.append(_to_row(rec))
+        if len(self.rows) >= self.batch_size:
+            self.flush()
+
+    def _open(self) -> None:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        if self.path.suffix in PARQUET_SUFFIXES:
+            self._writer = pq.ParquetWriter(self.path, self.schema,
+                                            compression="zstd")
+        else:
+            self._writer = ipc.new_file(self.path, self.schema)
+
+    def flush(self) -> None:
+        if not self.rows:
+            return
+        if self.schema is None:
+            self.schema = infer_schema(self.rows)
+            self._open()
+        table = pa.Table.from_pylist(self.rows, schema=self.schema)
+        self._writer.write_table(table)
+        self.rows.clear()
+
+    def close(self) -> None:
+        self.flush()
+        if self._writer is None:  # no rows: still leave a valid, empty file
+            self.schema = pa.schema([])
+            self._open()
+        self._writer.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+# ---------------------------------------------------------------------------
+# Reading
+# ---------------------------------------------------------------------------
+def _batches(path: Path, columns=None) -> Iterator[pa.RecordBatch]:
+    if path.suffix in PARQUET_SUFFIXES:
+        yield from pq.ParquetFile(path, memory_map=True).iter_batches(columns=columns)
+    else:
+        reader = ipc.open_file(pa.memory_map(str(path), "r"))
+        for i in range(reader.num_record_batches):
+            batch = reader.get_batch(i)
+            yield batch.select(columns) if columns else batch
+
+
+def read_table(path, columns=None) -> pa.Table:
+    """Whole file as a pyarrow Table (zero-copy for memory-mapped IPC)."""
+    path = Path(path)
+    if path.suffix in PARQUET_SUFFIXES:
+        return pq.read_table(path, columns=columns, memory_map=True)
+    table = ipc.open_file(pa.memory_map(str(path), "r")).read_all()
+    return table.select(columns) if columns else table
+
+
+def count_columnar(path) -> int:
+    path = Path(path)
+    if path.suffix in PARQUET_SUFFIXES:
+        return pq.ParquetFile(path).metadata.num_rows
+    reader = ipc.open_file(pa.memory_map(str(path), "r"))
+    return sum(reader.get_batch(i).num_rows for i in range(reader.num_record_batches))
+
+
+def read_columnar(path, columns=None) -> Iterator[Dict]:
+    """Yield records as dicts (map columns come back as plain dicts)."""
+    for batch in _batches(Path(path), columns):
+        maps = [f.name for f in batch.schema if pa.types.is_map(f.type)]
+        for row in batch.to_pylist():
+            for name in maps:
+                if row[name] is not None:
+                    row[name] = dict(row[name])
+            yield row
@@ -0,0 +1,133 @@
+"""
+Stable article IDs and the per-output index of IDs already processed.
+
+Every article gets `id` = blake2b-128 of headline, date and body, assigned
+by `segment.py` and carried through every later stage, so a record can be
+recognised without looking at anything a stage adds.
+
+Next to each output of an `--incremental` run lives `<output>.ids` — one
+32-char hex ID per line, append-only, in output order.  The next
+incremental run loads it (or rebuilds it from the output if missing),
+skips input articles whose ID was already there (one set lookup instead of
+a spaCy / FinBERT pass) and appends only the delta to the existing output
+and index (see common.checkpoint).  IDs written by the current run are not
+looked up, so duplicates within one input are kept, as in a full run.
+
+Usage
+-----
+    idx = IdIndex.open("data/news_sentiment.jsonl.gz")
+    if content_id(art) in idx: ...
+"""
+from __future__ import annotations
+
+import hashlib
+import os
+from pathlib import Path
+
+ID_LINE = 33               # 32 hex chars + "\n"
+
+
+def content_id(art: dict) -> str:
+    """
+    The article's `id`, or the hash of headline \\0 date \\0 raw body.
+    Records with neither (written before IDs existed) raise ValueError:
+    their tidied sentences cannot reproduce the ID segment.py stamps.
+    """
+    if art.get("id"):
+        return art["id"]
+    body = art.get("body")
+    if body is None:
+        raise ValueError("record has no `id` and no `body` to derive it from")
+    key = f"{art.get('headline') or ''}\0{art.get('date') or ''}\0{body}"
+    return hashlib.blake2b(key.encode("utf-8"), digest_size=16).hexdigest()
+
+
+def ids_path(out_path) -> Path:
+    return Path(f"{out_path}.ids")
+
+
+class IdIndex:
+    """
+    Lookup set over the IDs an output held before this run, plus the IDs
+    appended since the last commit (written to `<output>.ids` on commit).
+    """
+
+    def __init__(self, path, ids=(), size: int = 0):
+        self.path = Path(path)
+        self.ids = set(ids)
+        self.size = size           # committed lines in the file
+        self._pending: list[str] = []
+
+    @classmethod
+    def open(cls, out_path, size: int | None = None,
+             known: int | None = None) -> "IdIndex":
+        """
+        Index of *out_path*, truncated to *size* IDs if given, whose lookups
+        cover the first *known* IDs (default: all of them).
+        """
+        path = ids_path(out_path)
+        if not path.exists():
+            if size or (size is None and Path(out_path).exists()):
+                return cls.rebuild(out_path, size, known)
+            return cls(path)
+        with open(path, "r+b") as f:
+            if size is not None:
+                f.truncate(size * ID_LINE)
+            n = f.seek(0, os.SEEK_END) // ID_LINE
+            f.seek(0)
+            ids = f.read(ID_LINE * (n if known is None else known)).decode("ascii").split()
+        return cls(path, ids, n)
+
+    @classmethod
+    def fresh(cls, out_path) -> "IdIndex":
+        path = ids_path(out_path)
+        path.unlink(missing_ok=True)
+        return cls(path)
+
+    @staticmethod
+    def discard(out_path) -> None:
+        """Drop the index of an output that is being rewritten from scratch."""
+        ids_path(out_path).unlink(missing_ok=True)
+
+    @classmethod
+    def rebuild(cls, out_path, size: int | None = None,
+                known: int | None = None) -> "IdIndex":
+        """Index the first *size* records of an output without a `.ids` file."""
+        from common.records import read_records
+
+        idx = cls(ids_path(out_path))
+        idx.path.unlink(missing_ok=True)
+        for i, rec in enumerate(read_records(out_path)):
+            if i == size:
+                break
+            try:
+                cid = content_id(rec)
+            except ValueError:
+                raise ValueError(f"{out_path} record {i} has no `id`; rebuild it "
+                                 "with a full (non-incremental) run") from None
+            if known is None or i < known:
+                idx.ids.add(cid)
+            idx.append(cid)
+        idx.commit()
+        return idx
+
+    def __contains__(self, cid: str) -> bool:
+        return cid in self.ids
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def append(self, cid: str) -> None:
+        """Record that *cid* was written to the output (persisted on commit)."""
+        self._pending.append(cid)
+
+    def commit(self) -> int:
+        """Append pending IDs to disk (fsync'ed); returns the committed count."""
+        if self._pending:
+            with open(self.path, "ab") as f:
+                f.write("".join(f"{c}\n" for c in self._pending).encode("ascii"))
+                f.flush()
+                os.fsync(f.fileno())
+            self.size += len(self._pending)
+            self._pending.clear()
+        return self.size
@@ -0,0 +1,150 @@
+"""
+Persistent key → JSON value cache (SQLite) with optional per-entry expiry
+and an optional LRU size bound.
+
+One store for every cache in the pipeline:
+  * responses of slow external services (sector lookups, LLM labels) are
+    served until their time-to-live runs out, then count as missing so the
+    caller refetches them;
+  * memoised model outputs (models.sentiment_cache) never expire but are
+    capped at *max_entries*, evicting the least recently used.
+
+A cached value may itself be None (e.g. "this ticker has no sector"), which
+is different from not being cached: get_many() only returns the keys it has.
+Keys are str or bytes.
+
+Thread-safe; several processes may share one file (WAL, busy timeout).
+
+Usage
+-----
+    cache = KVCache("cache/sectors.db")
+    fresh = cache.get_many(keys)                    # {key: value}
+    cache.put_many({"yfinance:AAPL": "Technology"}, ttl=30 * 86400)
+    print(cache.stats())
+"""
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import Dict, Iterable, Optional
+
+# SQLite's default host-parameter limit is 999; stay safely below it
+_CHUNK = 900
+_MISSING = object()
+_COLUMNS = ("key", "value", "last_used", "expires")
+
+
+class KVCache:
+    def __init__(self, path: str, default_ttl: Optional[float] = None,
+                 max_entries: Optional[int] = None):
+        """
+        *default_ttl* in seconds (None = entries never expire); *max_entries*
+        bounds the store, evicting least-recently-used keys (None = unbounded).
+        """
+        self.default_ttl = default_ttl
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        # generous busy timeout: several worker processes may share one file
+        self.db = sqlite3.connect(path, timeout=60, check_same_thread=False)
+        # pipelined mode reads and writes from different threads
+        self._lock = threading.RLock()
+        self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.execute("PRAGMA synchronous=NORMAL")
+        cols = tuple(r[1] for r in self.db.execute("PRAGMA table_info(entries)"))
+        if cols and cols != _COLUMNS:
+            # a file from an older cache layout: its contents are disposable
+            self.db.execute("DROP TABLE entries")
+        self.db.execute(
+            "CREATE TABLE IF NOT EXISTS entries ("
+            " key PRIMARY KEY,"
+            " value TEXT NOT NULL,"
+            " last_used REAL NOT NULL,"
+            " expires REAL)")
+        self.db.execute(
+            "CREATE INDEX IF NOT EXISTS entries_last_used ON entries(last_used)")
+        self.db.commit()
+        (self._size,) = self.db.execute("SELECT COUNT(*) FROM entries").fetchone()
+
+    # ------------------------------------------------------------------ #
+    def get_many(self, keys: Iterable) -> Dict[object, object]:
+        """Unexpired entries among *keys*; hits and misses count every key given."""
+        keys = list(keys)
+        unique = list(dict.fromkeys(keys))
+        now = time.time()
+        found = {}
+        with self._lock:
+            for i in range(0, len(unique), _CHUNK):
+                chunk = unique[i:i + _CHUNK]
+                marks = ",".join("?" * len(chunk))
+                for k, v in self.db.execute(
+                        f"SELECT key, value FROM entries WHERE key IN ({marks})"
+                        " AND (expires IS NULL OR expires > ?)", (*chunk, now)):
+                    found[k] = json.loads(v)
+            if found and self.max_entries is not None:
+                # touch hits so LRU eviction keeps them
+                self.db.executemany("UPDATE entries SET last_used = ? WHERE key = ?",
+                                    [(now, k) for k in found])
+            hits = sum(k in found for k in keys)
+            self.hits += hits
+            self.misses += len(keys) - hits
+        return found
+
+    def get(self, key, default=None):
+        value = self.get_many([key]).get(key, _MISSING)
+        return default if value is _MISSING else value
+
+    def put_many(self, items: Dict[object, object], ttl: Optional[float] = _MISSING) -> None:
+        """Store *items*, expiring after *ttl* seconds (default: default_ttl)."""
+        now = time.time()
+        ttl = self.default_ttl if ttl is _MISSING else ttl
+        expires = None if ttl is None else now + ttl
+        rows = [(k, json.dumps(v), now, expires) for k, v in items.items()]
+        with self._lock:
+            # count only new keys: a refetched entry overwrites its row
+            added = self.db.executemany(
+                "INSERT OR IGNORE INTO entries(key, value, last_used, expires) "
+                "VALUES (?, ?, ?, ?)", rows).rowcount
+            if added < len(rows):
+                self.db.executemany(
+                    "UPDATE entries SET value = ?, last_used = ?, expires = ? "
+                    "WHERE key = ?", [(v, t, e, k) for k, v, t, e in rows])
+            self._size += added
+            if self.max_entries is not None and self._size > self.max_entries:
+                self._evict()
+            self.db.commit()
+
+    def put(self, key, value, ttl: Optional[float] = _MISSING) -> None:
+        self.put_many({key: value}, ttl)
+
+    def purge(self) -> int:
+        """Delete expired entries; returns how many."""
+        with self._lock:
+            n = self.db.execute("DELETE FROM entries WHERE expires <= ?",
+                                (time.time(),)).rowcount
+            self.db.commit()
+            self._size -= n
+        return n
+
+    def _evict(self) -> None:
+        # other processes may share the file, so recount before deleting
+        (n,) = self.db.execute("SELECT COUNT(*) FROM entries").fetchone()
+        if n > self.max_entries:
+            self.db.execute(
+                "DELETE FROM entries WHERE key IN ("
+                " SELECT key FROM entries ORDER BY last_used LIMIT ?)",
+                (n - self.max_entries,))
+        self._size = min(n, self.max_entries)
+
+    # ------------------------------------------------------------------ #
+    def stats(self) -> str:
+        total = self.hits + self.misses
+        rate = self.hits / total if total else 0.0
+        return f"cache hits {self.hits:,} / misses {self.misses:,} ({rate:.1%} hit rate)"
+
+    def close(self) -> None:
+        with self._lock:
+            self.db.commit()
+            self.db.close()
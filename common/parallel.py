@@ -0,0 +1,68 @@
+"""
+Ordered batch parallelism for the record-by-record stages.
+
+A stage reads its input sequentially (checkpoint / incremental bookkeeping
+stay in the parent), groups the records that need work into batches,
+farms the batches out to a spawn pool whose initializer loads the stage's
+resources once per worker, and writes results back in input order.  At
+most 2·N batches are in flight, so memory stays bounded however far the
+reader could run ahead.
+
+Usage
+-----
+    from common import parallel
+
+    batches = parallel.iter_batches(read_records(inp, start=fout.start), fout, 200)
+    with parallel.spawn_pool(n, init_worker) as pool:
+        for consumed, arts in parallel.ordered_map(pool, n, process_batch, batches):
+            for art in arts:
+                fout.write(art)
+            fout.advance(consumed)
+"""
+from __future__ import annotations
+
+import multiprocessing as mp
+from collections import deque
+from typing import Callable, Iterable, Iterator, Tuple
+
+
+def spawn_pool(n_process: int, initializer: Callable | None = None, initargs: tuple = ()):
+    """A *n_process* pool of freshly spawned workers (no inherited state)."""
+    return mp.get_context("spawn").Pool(n_process, initializer, initargs)
+
+
+def ordered_map(pool, n_process: int, fn: Callable, batches: Iterable[Tuple[int, list]],
+                *args) -> Iterator[Tuple[int, object]]:
+    """
+    fn(batch, *args) over (consumed, batch) *batches* on *pool*, yielding
+    (consumed, result) in input order with at most 2·n_process in flight.
+    """
+    pending = deque()
+    for consumed, batch in batches:
+        if len(pending) >= 2 * n_process:
+            done, result = pending.popleft()
+            yield done, result.get()
+        pending.append((consumed, pool.apply_async(fn, (batch, *args))))
+    while pending:
+        done, result = pending.popleft()
+        yield done, result.get()
+
+
+def iter_batches(arts: Iterable[dict], fout, batch_size: int) -> Iterator[Tuple[int, list]]:
+    """
+    (input records consumed, new articles) per *batch_size* new articles,
+    skipping the ones *fout* (a Checkpoint) has already seen.
+    """
+    batch_arts = []
+    consumed = 0
+    for art in arts:
+        consumed += 1
+        if not fout.seen(art):
+            batch_arts.append(art)
+        if len(batch_arts) >= batch_size:
+            yield consumed, batch_arts
+            batch_arts = []
+            consumed = 0
+    # any remainder
+    if consumed:
+        yield consumed, batch_arts
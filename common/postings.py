@@ -0,0 +1,330 @@
+"""
+Inverted index over scored (final-schema) articles: ticker, sector, label
+and date → record numbers, memory-mapped.
+
+"All NEG articles mentioning NVDA in March with confidence ≥ 80" used to
+mean decompressing and parsing all of `news_final_*.jsonl.gz`.  `build`
+writes a sidecar `<records>.postings` with one sorted postings list per
+key, plus small per-record columns for the range filters; `ArticleIndex`
+maps it and answers a query by
+
+  1. taking the shortest candidate list among the constraints (list
+     lengths are known from the offsets alone; a date range is one
+     contiguous slice of the date postings),
+  2. checking the candidates against the other ticker / sector lists
+     (binary search) and the label / day / confidence columns,
+  3. reading only the matching records: one block decompression per
+     touched block of a block-gzip file (common.blockgz), one seek per
+     record of a plain .jsonl file.
+
+so a query costs time proportional to its candidates and matches, not to
+the corpus.  `label` and `confidence` are the article's `overall` ones;
+`sector` is any key of `sectors_summary`.
+
+Layout: a common.sectionfile with magic b"POSTNG1\\0" and sections
+
+    meta                JSON: version, source file name / size / mtime,
+                        n_records
+    <field>_keys        "\\n"-terminated keys, sorted, for field in
+                        ticker, sector, label, date
+    <field>_off         uint64[n_keys + 1] into <field>_post
+    <field>_post        uint32 record numbers, ascending per key
+    day                 int32[n_records]   date.toordinal(), 0 = undated
+    label               uint8[n_records]   0 NEG, 1 NEU, 2 POS, 255 none
+    conf                uint16[n_records]  confidence × 100
+    line_off            uint64[n_records]  byte offsets (plain .jsonl only)
+
+The index records the size and mtime of its source; opening it after the
+source changed raises, and `build` simply runs again (one streaming pass).
+
+Usage
+-----
+    python -m common.postings build data/news_final_10k.jsonl.gz
+    python -m common.postings query data/news_final_10k.jsonl.gz \
+        --ticker NVDA --label NEG --start 2024-01-01 --end 2024-03-31 \
+        --min-conf 80 [--limit 20] [--count]
+
+    with ArticleIndex("data/news_final_10k.jsonl.gz") as idx:
+        rows = idx.search(ticker="NVDA", label="NEG", min_conf=80)
+        arts = idx.fetch(rows)
+"""
+from __future__ import annotations
+
+import argparse
+import bisect
+import datetime as dt
+import json
+import sys
+import time
+from array import array
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Tuple
+
+import numpy as np
+
+from common.blockgz import BlockGzipFile, is_indexed
+from common.records import get_codec, read_lines
+from common.sectionfile import SectionFile, string_table, write
+
+MAGIC = b"POSTNG1\0"
+VERSION = 2
+FIELDS = ("ticker", "sector", "label", "date")
+LABELS = ("NEG", "NEU", "POS")
+NO_LABEL = 255
+CONF_SCALE = 100
+
+
+def postings_path(path) -> Path:
+    return Path(f"{path}.postings")
+
+
+def _stamp(path) -> dict:
+    st = Path(path).stat()
+    return {"source": Path(path).name, "size": st.st_size, "mtime_ns": st.st_mtime_ns}
+
+
+def _day(date: str) -> int:
+    try:
+        return dt.date.fromisoformat(date).toordinal()
+    except ValueError:
+        return 0
+
+
+# ---------------------------------------------------------------------------
+# Build
+# ---------------------------------------------------------------------------
+def _iter_lines(path) -> Iterator[Tuple[bytes, Optional[int]]]:
+    """(JSONL line, byte offset or None) per record, in record order."""
+    path = Path(path)
+    if path.suffix == ".gz":
+        if not is_indexed(path):
+            raise ValueError(f"{path} has no block index; run "
+                             f"`python -m common.blockgz convert {path}` first")
+        for line in read_lines(path):
+            yield line, None
+    elif path.suffix in (".jsonl", ".json"):
+        pos = 0
+        with open(path, "rb") as f:
+            for line in f:
+                if line.strip():
+                    yield line, pos
+                pos += len(line)
+    else:
+        raise ValueError(f"{path}: postings need block-gzip or plain JSONL records")
+
+
+def build(path, out=None, codec: Optional[str] = None) -> Path:
+    """Index the records at *path* into *out* (default `<path>.postings`)."""
+    loads, _ = get_codec(codec)
+    stamp = _stamp(path)
+    lists: Dict[str, Dict[str, array]] = {f: {} for f in FIELDS}
+    day, label, conf, line_off = array("i"), array("B"), array("H"), array("Q")
+
+    def post(field: str, key: str, i: int) -> None:
+        ids = lists[field].get(key)
+        if ids is None:
+            ids = lists[field][key] = array("I")
+        if not ids or ids[-1] != i:  # duplicate key within one record
+            ids.append(i)
+
+    for n, (line, off) in enumerate(_iter_lines(path)):
+        rec = loads(line)
+        if off is not None:
+            line_off.append(off)
+        for tk in rec.get("tickers") or ():
+            post("ticker", tk, n)
+        for sec in rec.get("sectors_summary") or ():
+            post("sector", sec, n)
+        overall = rec.get("overall") or {}
+        lbl = overall.get("label")
+        if lbl in LABELS:
+            post("label", lbl, n)
+            label.append(LABELS.index(lbl))
+        else:
+            label.append(NO_LABEL)
+        conf.append(round((overall.get("confidence") or 0) * CONF_SCALE))
+        date = str(rec.get("date") or "")[:10]
+        day.append(_day(date) if date else 0)
+        if day[-1]:
+            post("date", date, n)
+
+    sections = {"meta": json.dumps({"version": VERSION, **stamp,
+                                    "n_records": len(day)}).encode()}
+    for field in FIELDS:
+        keys = sorted(lists[field])
+        offs = array("Q", [0])
+        for k in keys:
+            offs.append(offs[-1] + len(lists[field][k]))
+        sections[f"{field}_keys"] = string_table(keys)
+        sections[f"{field}_off"] = offs.tobytes()
+        sections[f"{field}_post"] = b"".join(lists[field][k].tobytes() for k in keys)
+    sections.update(day=day.tobytes(), label=label.tobytes(), conf=conf.tobytes(),
+                    line_off=line_off.tobytes())
+    return write(out or postings_path(path), MAGIC, VERSION, sections)
+
+
+# ---------------------------------------------------------------------------
+# Query
+# ---------------------------------------------------------------------------
+class ArticleIndex(SectionFile):
+    """Read-only, memory-mapped postings of one records file."""
+
+    def __init__(self, path, index=None, codec: Optional[str] = None):
+        super().__init__(index or postings_path(path), MAGIC, VERSION, kind="postings")
+        self.index_path = self.path
+        self.path = Path(path)
+        self.meta = json.loads(bytes(self.raw("meta")))
+        stamp = _stamp(self.path)
+        if any(self.meta[k] != v for k, v in stamp.items() if k != "source"):
+            raise ValueError(f"stale postings {self.index_path}: {self.path} changed; "
+                             f"run `python -m common.postings build {self.path}`")
+        self.n_records = self.meta["n_records"]
+        self.day = self._array("day", np.int32)
+        self.label = self._array("label", np.uint8)
+        self.conf = self._array("conf", np.uint16)
+        self._keys: Dict[str, Dict[str, int]] = {}
+        self._loads, _ = get_codec(codec)
+        self._records = None
+
+    def _array(self, name: str, dtype) -> np.ndarray:
+        off, length = self.sections[name]
+        return np.frombuffer(self._mm, dtype, length // np.dtype(dtype).itemsize, off)
+
+    # -- postings ----------------------------------------------------------------
+    def keys(self, field: str) -> Dict[str, int]:
+        """key → key id of *field*, in sorted key order."""
+        if field not in self._keys:
+            keys = self.strings(f"{field}_keys")
+            self._keys[field] = {k: i for i, k in enumerate(keys)}
+        return self._keys[field]
+
+    def _span(self, field: str, lo: int, hi: int) -> np.ndarray:
+        """Postings of key ids [lo, hi) — one contiguous slice."""
+        offs = self._array(f"{field}_off", np.uint64)
+        return self._array(f"{field}_post", np.uint32)[int(offs[lo]):int(offs[hi])]
+
+    def postings(self, field: str, key: str) -> np.ndarray:
+        """Ascending record numbers with *key* (a view into the mapping)."""
+        kid = self.keys(field).get(key)
+        return self._span(field, kid, kid + 1) if kid is not None else np.empty(0, np.uint32)
+
+    def date_range(self, start: Optional[str] = None, end: Optional[str] = None) -> np.ndarray:
+        """Record numbers dated within [start, end], ascending."""
+        dates = list(self.keys("date"))
+        lo = bisect.bisect_left(dates, start) if start else 0
+        hi = bisect.bisect_right(dates, end) if end else len(dates)
+        return np.sort(self._span("date", lo, hi)) if hi > lo else np.empty(0, np.uint32)
+
+    def search(self, ticker: Optional[str] = None, sector: Optional[str] = None,
+               label: Optional[str] = None, start: Optional[str] = None,
+               end: Optional[str] = None, min_conf: Optional[float] = None,
+               max_conf: Optional[float] = None) -> np.ndarray:
+        """Ascending record numbers matching every given constraint."""
+        lists = {f: self.postings(f, k) for f, k in
+                 (("ticker", ticker), ("sector", sector), ("label", label)) if k is not None}
+        dated = start is not None or end is not None
+        if not lists and not dated:
+            cand = np.arange(self.n_records, dtype=np.uint32)
+        else:
+            # drive with the shortest list; a date range is sized from its offsets
+            sizes = {f: len(p) for f, p in lists.items()}
+            if dated:
+                dates = list(self.keys("date"))
+                lo = bisect.bisect_left(dates, start) if start else 0
+                hi = bisect.bisect_right(dates, end) if end else len(dates)
+                offs = self._array("date_off", np.uint64)
+                sizes["date"] = int(offs[hi] - offs[lo]) if hi > lo else 0
+            driver = min(sizes, key=sizes.get)
+            cand = self.date_range(start, end) if driver == "date" else lists.pop(driver)
+            for field in ("ticker", "sector"):
+                if field in lists and len(cand):
+                    p = lists[field]
+                    pos = np.minimum(np.searchsorted(p, cand), len(p) - 1)
+                    cand = cand[p[pos] == cand] if len(p) else cand[:0]
+        mask = np.ones(len(cand), bool)
+        if label is not None:
+            mask &= self.label[cand] == (LABELS.index(label) if label in LABELS else -1)
+        if start is not None:
+            mask &= self.day[cand] >= _day(start)
+        if end is not None:
+            day = self.day[cand]
+            mask &= (day <= _day(end)) & (day > 0)
+        if min_conf is not None:
+            mask &= self.conf[cand] >= round(min_conf * CONF_SCALE)
+        if max_conf is not None:
+            mask &= self.conf[cand] <= round(max_conf * CONF_SCALE)
+        return cand[mask]
+
+    # -- records -----------------------------------------------------------------
+    def fetch(self, rows) -> List[dict]:
+        """Records at record numbers *rows*, in that order."""
+        rows = [int(i) for i in rows]
+        if self.path.suffix == ".gz":
+            if self._records is None:
+                self._records = BlockGzipFile(self.path)
+            lines = self._records.get_many(rows)
+        else:
+            if self._records is None:
+                self._records = open(self.path, "rb")
+            offs = self._array("line_off", np.uint64)
+            lines = []
+            for i in rows:
+                self._records.seek(int(offs[i]))
+                lines.append(self._records.readline())
+        return [self._loads(line) for line in lines]
+
+    def query(self, limit: Optional[int] = None, **constraints) -> List[dict]:
+        """Records matching *constraints* (see search), at most *limit*."""
+        return self.fetch(self.search(**constraints)[:limit])
+
+    def close(self) -> None:
+        if self._records is not None:
+            self._records.close()
+        self.day = self.label = self.conf = None
+        super().close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+# ---------------------------------------------------------------------------
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser()
+    ap.add_argument("cmd", choices=("build", "query", "info"))
+    ap.add_argument("path", help="news_final_*.jsonl.gz (block-gzip) or .jsonl")
+    ap.add_argument("--ticker")
+    ap.add_argument("--sector")
+    ap.add_argument("--label", choices=LABELS)
+    ap.add_argument("--start", help="first day, YYYY-MM-DD")
+    ap.add_argument("--end", help="last day, YYYY-MM-DD")
+    ap.add_argument("--min-conf", type=float)
+    ap.add_argument("--max-conf", type=float)
+    ap.add_argument("--limit", type=int)
+    ap.add_argument("--count", action="store_true", help="print the match count only")
+    args = ap.parse_args()
+
+    if args.cmd == "build":
+        t0 = time.perf_counter()
+        out = build(args.path)
+        print(f"✅ postings → {out} ({out.stat().st_size:,} bytes, "
+              f"{time.perf_counter() - t0:.1f} s)")
+        sys.exit(0)
+    with ArticleIndex(args.path) as idx:
+        if args.cmd == "info":
+            print(f"{idx.index_path}: {idx.n_records:,} records, " + ", ".join(
+                f"{len(idx.keys(f)):,} {f} keys" for f in FIELDS))
+            sys.exit(0)
+        t0 = time.perf_counter()
+        rows = idx.search(args.ticker, args.sector, args.label, args.start, args.end,
+                          args.min_conf, args.max_conf)
+        if args.count:
+            print(len(rows))
+        else:
+            _, dumps = get_codec()
+            for rec in idx.fetch(rows[:args.limit]):
+                sys.stdout.buffer.write(dumps(rec) + b"\n")
+        print(f"⏱ {len(rows):,} matches in {(time.perf_counter() - t0) * 1000:.1f} ms",
+              file=sys.stderr)
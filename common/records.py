@@ -0,0 +1,283 @@
+"""
+Shared record I/O for every pipeline stage.
+
+The file extension picks the container:
+  • *.parquet / *.pq             – Parquet        (common.columnar)
+  • *.arrow / *.feather / *.ipc  – Arrow IPC, memory-mapped on read
+  • *.gz                         – gzip-compressed JSONL, written as
+                                   seekable block-gzip + `.idx` (common.blockgz)
+  • *.zst / *.zstd               – zstd-compressed JSONL   (needs `zstandard`)
+  • anything else                – plain JSONL
+
+JSONL is read and written in binary with large buffers and a fast codec:
+orjson when installed (the "auto" default), else msgspec, else stdlib json.
+Writers batch encoded lines and hand them to the compressor in bulk.
+
+Compression level defaults to a fast setting suitable for intermediates
+(gzip 3 instead of gzip.open's 9); override per call or for a whole run
+through the environment:
+
+    RECORDS_CODEC=json|orjson|msgspec|auto
+    RECORDS_LEVEL=<int>
+
+Usage
+-----
+    for art in read_records("data/news_tickers_10k.jsonl.gz"):
+        ...
+    with open_writer("data/news_sentiment_10k.jsonl.zst", level=6) as out:
+        out.write(art)
+"""
+from __future__ import annotations
+
+import gzip
+import io
+import json
+import os
+from itertools import islice
+from pathlib import Path
+from typing import Callable, Dict, Iterable, Iterator, Tuple
+
+from common.blockgz import BlockGzipFile, BlockGzipWriter, is_indexed
+
+try:
+    import orjson
+except ImportError:  # optional speed-up
+    orjson = None
+try:
+    import msgspec
+except ImportError:  # optional speed-up
+    msgspec = None
+
+_DECODE_ERRORS = (ValueError,) + ((msgspec.DecodeError,) if msgspec else ())
+
+# kept here (not imported from common.columnar) so JSONL-only users never
+# import pyarrow
+COLUMNAR_SUFFIXES = {".parquet", ".pq", ".arrow", ".feather", ".ipc"}
+ZSTD_SUFFIXES = {".zst", ".zstd"}
+DEFAULT_LEVEL = {"gzip": 3, "zstd": 3}
+BUFFER_SIZE = 1 << 20      # 1 MiB read / write buffers
+FLUSH_EVERY = 1_000        # records per bulk write
+
+
+# ---------------------------------------------------------------------------
+# Codecs:  name → (loads(bytes) -> obj, dumps(obj) -> bytes)
+# ---------------------------------------------------------------------------
+def _json_dumps(obj) -> bytes:
+    return json.dumps(obj, ensure_ascii=False).encode("utf-8")
+
+
+def get_codec(name: str | None = None) -> Tuple[Callable, Callable]:
+    name = name or os.environ.get("RECORDS_CODEC", "auto")
+    if name == "auto":
+        name = "orjson" if orjson else "msgspec" if msgspec else "json"
+    if name == "orjson":
+        if orjson is None:
+            raise ImportError("codec 'orjson' requested but orjson is not installed")
+        return orjson.loads, orjson.dumps
+    if name == "msgspec":
+        if msgspec is None:
+            raise ImportError("codec 'msgspec' requested but msgspec is not installed")
+        return msgspec.json.Decoder().decode, msgspec.json.Encoder().encode
+    if name == "json":
+        return json.loads, _json_dumps
+    raise ValueError(f"unknown codec {name!r}")
+
+
+# ---------------------------------------------------------------------------
+# Compression
+# ---------------------------------------------------------------------------
+def compression_for(path) -> str:
+    suffix = Path(path).suffix
+    if suffix == ".gz":
+        return "gzip"
+    if suffix in ZSTD_SUFFIXES:
+        return "zstd"
+    return "none"
+
+
+def open_binary(path, mode: str = "r", level: int | None = None):
+    """Buffered binary stream over *path*, (de)compressing by extension."""
+    assert mode in ("r", "w")
+    comp = compression_for(path)
+    if comp != "none" and level is None:
+        level = int(os.environ.get("RECORDS_LEVEL", DEFAULT_LEVEL[comp]))
+    if comp == "gzip":
+        if mode == "r":
+            return io.BufferedReader(gzip.open(path, "rb"), BUFFER_SIZE)
+        # block-gzip: still one valid gzip stream, plus a record index
+        return BlockGzipWriter(path, level)
+    if comp == "zstd":
+        import zstandard
+
+        if mode == "r":
+            return io.BufferedReader(
+                zstandard.ZstdDecompressor().stream_reader(open(path, "rb")),
+                BUFFER_SIZE)
+        return io.BufferedWriter(
+            zstandard.ZstdCompressor(level=level).stream_writer(open(path, "wb")),
+            BUFFER_SIZE)
+    return open(path, mode + "b", buffering=BUFFER_SIZE)
+
+
+# ---------------------------------------------------------------------------
+# Reading
+# ---------------------------------------------------------------------------
+def read_lines(path, start: int = 0) -> Iterator[bytes]:
+    """
+    Raw JSONL lines (bytes, newline included) — no decoding.
+    *start* skips that many non-blank lines first; on an indexed block-gzip
+    file (which never holds blank lines) it seeks straight to the block.
+    """
+    if start and Path(path).suffix == ".gz" and is_indexed(path):
+        with BlockGzipFile(path) as bg:
+            if start >= bg.count():
+                return
+            b = bg.block_of(start)
+            yield from islice(bg.iter_blocks(b), start - bg.firsts[b], None)
+        return
+    with open_binary(path, "r") as f:
+        if start:
+            f = (line for line in f if line.strip())
+        yield from islice(f, start, None)
+
+
+def read_records(path, columns=None,
+                 on_error: Callable[[int, Exception], None] | None = None,
+                 codec: str | None = None, start: int = 0) -> "RecordReader":
+    """
+    Yield one dict per record; *columns* only narrows columnar reads.
+    A malformed JSONL line is passed to *on_error(lineno, exc)* and skipped,
+    or raises if no handler is given.  *start* resumes after that many
+    records (malformed lines included), e.g. from a common.checkpoint offset;
+    line numbers passed to *on_error* then count from the resume point.
+    The iterator's `position` is the input consumed so far, in those units.
+    """
+    return RecordReader(path, columns, on_error, codec, start)
+
+
+class RecordReader:
+    """
+    Iterator of read_records().  `position` = *start* + records yielded +
+    malformed lines skipped; it already counts the record just yielded, so
+    a stage can report it to common.checkpoint as consumed input.
+    """
+
+    def __init__(self, path, columns=None,
+                 on_error: Callable[[int, Exception], None] | None = None,
+                 codec: str | None = None, start: int = 0):
+        self.position = start
+        self._it = self._records(Path(path), columns, on_error, codec, start)
+
+    def __iter__(self) -> Iterator[Dict]:
+        return self._it
+
+    def __next__(self) -> Dict:
+        return next(self._it)
+
+    def _records(self, path, columns, on_error, codec, start) -> Iterator[Dict]:
+        if path.suffix in COLUMNAR_SUFFIXES:
+            from common.columnar import read_columnar
+
+            for rec in islice(read_columnar(path, columns), start, None):
+                self.position += 1
+                yield rec
+            return
+        loads, _ = get_codec(codec)
+        for i, line in enumerate(read_lines(path, start), 1):
+            if not line.strip():
+                continue
+            self.position += 1
+            try:
+                rec = loads(line)
+            except _DECODE_ERRORS as e:
+                if on_error is None:
+                    raise
+                on_error(i, e)
+                continue
+            yield rec
+
+
+def count_records(path) -> int | None:
+    """Record count from metadata alone (block index / Parquet footer), else None."""
+    path = Path(path)
+    if path.suffix in COLUMNAR_SUFFIXES:
+        from common.columnar import count_columnar
+
+        return count_columnar(path)
+    if path.suffix == ".gz" and is_indexed(path):
+        with BlockGzipFile(path) as bg:
+            return bg.count()
+    return None
+
+
+# ---------------------------------------------------------------------------
+# Writing
+# ---------------------------------------------------------------------------
+def _reopen(path, resume_at: int, level: int | None = None):
+    """Write stream over an existing *path*, truncated to a committed size."""
+    comp = compression_for(path)
+    if comp == "gzip":
+        if level is None:
+            level = int(os.environ.get("RECORDS_LEVEL", DEFAULT_LEVEL[comp]))
+        return BlockGzipWriter(path, level, resume_at=resume_at)
+    if comp != "none":
+        raise ValueError(f"cannot resume {comp}-compressed output {path}")
+    f = open(path, "r+b", buffering=BUFFER_SIZE)
+    f.truncate(resume_at)
+    f.seek(resume_at)
+    return f
+
+
+class JsonlWriter:
+    def __init__(self, path, codec: str | None = None, level: int | None = None,
+                 flush_every: int = FLUSH_EVERY, resume_at: int | None = None):
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        self._f = (open_binary(path, "w", level) if resume_at is None
+                   else _reopen(path, resume_at, level))
+        _, self._dumps = get_codec(codec)
+        self._buf: list[bytes] = []
+        self.flush_every = flush_every
+
+    def write(self, rec: dict) -> None:
+        self._buf.append(self._dumps(rec))
+        if len(self._buf) >= self.flush_every:
+            self.flush()
+
+    def write_lines(self, lines: Iterable[bytes]) -> None:
+        """Copy already-encoded JSONL lines (newline included)."""
+        self.flush()
+        self._f.writelines(lines)
+
+    def flush(self) -> None:
+        if self._buf:
+            self._buf.append(b"")
+            self._f.write(b"\n".join(self._buf))
+            self._buf.clear()
+
+    def commit(self) -> int:
+        """Flush everything written so far to disk; returns the file size."""
+        self.flush()
+        if isinstance(self._f, BlockGzipWriter):
+            return self._f.commit()
+        self._f.flush()
+        os.fsync(self._f.fileno())
+        return self._f.tell()
+
+    def close(self) -> None:
+        self.flush()
+        self._f.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def open_writer(path, codec: str | None = None, level: int | None = None):
+    """Record writer for *path*, chosen by extension (see module docstring)."""
+    if Path(path).suffix in COLUMNAR_SUFFIXES:
+        from common.columnar import ColumnarWriter
+
+        return ColumnarWriter(path)
+    return JsonlWriter(path, codec, level)
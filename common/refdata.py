@@ -0,0 +1,359 @@
+"""
+Precompiled, memory-mappable reference data: tickers, sectors, companies.
+
+`build` compiles the text sources
+
+    data/ticker_master.csv      – ticker whitelist
+    data/ticker2sector.csv      – ticker → sector (GICS names)
+    data/sector_map_filled.json – ticker → sector (Yahoo names)
+    data/company_dict.json      – company name → ticker
+
+into one versioned binary file, `data/refdata.bin`, parsed by one set of
+rules (empty / "Unknown" sectors mean no sector), and `RefData` opens it
+with mmap: loading takes milliseconds and every worker process maps the
+same page-cache pages instead of holding its own copy.
+
+Layout: a common.sectionfile with magic b"REFDAT1\\0" and sections
+
+    meta        JSON: version, size / mtime / sha256 of every source file,
+                counts (tickers, whitelisted, with a sector)
+    tickers     "\\n"-terminated symbols, sorted  →  ticker id = position
+    ticker_off  uint32[n_tickers + 1]  byte offset of each symbol in tickers
+    ticker_hash uint32[2^k]         open-addressing table (crc32, linear
+                probing) of ticker id + 1, 0 = empty slot
+    flags       uint8[n_tickers]    bit 0: in ticker_master (whitelist)
+    sectors     "\\n"-terminated sector names; id 0 = no sector
+    sector      uint16[n_tickers]   sector id from ticker2sector.csv
+    sector_alt  uint16[n_tickers]   sector id from sector_map_filled.json
+    companies   "\\n"-terminated company names
+    company_tk  uint32[n_companies] ticker id per name
+    ac_*        company-name Aho–Corasick automaton (nlp.ticker_matcher)
+                over spaCy's English tokens: ac_tokens (token table), ac_node / ac_tok / ac_dst (edges,
+                CSR), ac_fail, ac_out_off / ac_out ((ticker id, n tokens))
+
+Lookups run on the mapped arrays — `whitelist()` and `ticker_sector()`
+are read-only set / mapping views, `ticker_id()` probes the hash table —
+so opening the artifact builds no per-process tables; the views only
+memoise the keys actually asked about.
+
+The file records the size, mtime and hash of its sources; `load()` hashes
+a source only if its size or mtime changed, and returns None for a
+missing or stale artifact so callers fall back to the text files
+(common.resources does this).
+
+Usage
+-----
+    python -m common.refdata build          # → data/refdata.bin
+    python -m common.refdata info
+"""
+from __future__ import annotations
+
+import argparse
+import csv
+import hashlib
+import json
+import sys
+import zlib
+from array import array
+from collections.abc import Mapping, Set
+from pathlib import Path
+from typing import Dict, Iterator, Optional
+
+from common.resources import COMPANY_DICT, TICKER_MASTER, TICKER_SECTOR
+from common.sectionfile import SectionFile, string_table, write
+from nlp.ticker_matcher import ArrayAutomaton, CompanyMatcher, spacy_tokenizer
+
+MAGIC = b"REFDAT1\0"
+VERSION = 4
+REFDATA_PATH = "data/refdata.bin"
+SECTOR_MAP = "data/sector_map_filled.json"
+SOURCES = {
+    "ticker_master": TICKER_MASTER,
+    "ticker2sector": TICKER_SECTOR,
+    "sector_map": SECTOR_MAP,
+    "company_dict": COMPANY_DICT,
+}
+
+# ---------------------------------------------------------------------------
+# Text sources  (the one place their parsing rules live)
+# ---------------------------------------------------------------------------
+def clean_sector(sec) -> Optional[str]:
+    sec = (sec or "").strip()
+    return sec if sec and sec.lower() != "unknown" else None
+
+
+def parse_ticker_master(path) -> list[str]:
+    with open(path, encoding="utf-8") as f:
+        next(f)  # skip header
+        return [t for t in (line.strip() for line in f) if t]
+
+
+def parse_ticker_sector(path) -> Dict[str, str]:
+    """ticker → sector from a `ticker,sector` CSV, skipping empty / Unknown."""
+    out = {}
+    with open(path, newline="", encoding="utf-8") as f:
+        for row in csv.DictReader(f):
+            sec = clean_sector(row["sector"])
+            if sec:
+                out[row["ticker"].strip()] = sec
+    return out
+
+
+def parse_sector_map(path) -> Dict[str, str]:
+    with open(path, encoding="utf-8") as f:
+        return {t: s for t, s in ((t, clean_sector(s)) for t, s in json.load(f).items())
+                if s}
+
+
+def parse_company_dict(path) -> Dict[str, str]:
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def _sha256(path) -> str:
+    return hashlib.sha256(Path(path).read_bytes()).hexdigest()
+
+
+def _stamp(path) -> dict:
+    st = Path(path).stat()
+    return {"size": st.st_size, "mtime_ns": st.st_mtime_ns, "sha256": _sha256(path)}
+
+
+def _hash_table(keys: list[bytes]) -> array:
+    """Slots of ticker id + 1 (0 = empty), crc32-addressed, load factor ≤ 1/2."""
+    n_slots = 1 << max(1, (2 * len(keys) - 1).bit_length())
+    slots = array("I", bytes(4 * n_slots))
+    mask = n_slots - 1
+    for i, key in enumerate(keys):
+        h = zlib.crc32(key) & mask
+        while slots[h]:
+            h = (h + 1) & mask
+        slots[h] = i + 1
+    return slots
+
+
+# ---------------------------------------------------------------------------
+# Build
+# ---------------------------------------------------------------------------
+def build(out=REFDATA_PATH, sources: Dict[str, str] = SOURCES) -> Path:
+    master = parse_ticker_master(sources["ticker_master"])
+    t2s = parse_ticker_sector(sources["ticker2sector"])
+    alt = parse_sector_map(sources["sector_map"])
+    companies = parse_company_dict(sources["company_dict"])
+
+    tickers = sorted(set(master) | set(t2s) | set(alt)
+                     | {t for t in companies.values() if t})
+    tid = {t: i for i, t in enumerate(tickers)}
+    sector_names = [""] + sorted(set(t2s.values()) | set(alt.values()))
+    sid = {s: i for i, s in enumerate(sector_names)}
+    whitelist = set(master)
+
+    # company-name automaton, as extract_tickers.company_matcher builds it
+    matcher = CompanyMatcher(companies, tokenizer=spacy_tokenizer())
+    vocab = sorted({sym for goto in matcher.automaton._goto for sym in goto})
+    ac = matcher.automaton.to_arrays({s: i for i, s in enumerate(vocab)},
+                                     lambda v: (tid[v[0]], v[1]))
+    names = [n for n, t in companies.items() if t]
+    encoded = [t.encode("utf-8") for t in tickers]
+    offs = array("I", [0])
+    for t in encoded:
+        offs.append(offs[-1] + len(t) + 1)  # + the "\n" separator
+
+    sections = {
+        "meta": json.dumps({
+            "version": VERSION,
+            "sources": {k: _stamp(p) for k, p in sources.items()},
+            "counts": {"tickers": len(tickers),
+                       "whitelisted": sum(t in whitelist for t in tickers),
+                       "sector": sum(t in t2s for t in tickers),
+                       "sector_alt": sum(t in alt for t in tickers)},
+        }).encode(),
+        "tickers": string_table(tickers),
+        "ticker_off": offs.tobytes(),
+        "ticker_hash": _hash_table(encoded).tobytes(),
+        "flags": array("B", (t in whitelist for t in tickers)).tobytes(),
+        "sectors": string_table(sector_names),
+        "sector": array("H", (sid[t2s[t]] if t in t2s else 0 for t in tickers)).tobytes(),
+        "sector_alt": array("H", (sid[alt[t]] if t in alt else 0 for t in tickers)).tobytes(),
+        "companies": string_table(names),
+        "company_tk": array("I", (tid[companies[n]] for n in names)).tobytes(),
+        "ac_tokens": string_table(vocab),
+        **{f"ac_{k}": array("I", v).tobytes() for k, v in ac.items()},
+    }
+    return write(out, MAGIC, VERSION, sections)
+
+
+# ---------------------------------------------------------------------------
+# Load
+# ---------------------------------------------------------------------------
+class RefData(SectionFile):
+    """Read-only, memory-mapped view of a refdata artifact."""
+
+    def __init__(self, path=REFDATA_PATH):
+        super().__init__(path, MAGIC, VERSION, kind="refdata")
+        self.meta = json.loads(bytes(self.raw("meta")))
+        self.counts = self.meta["counts"]
+        self.n_tickers = self.counts["tickers"]
+        self.sector_names = self.strings("sectors")
+        self.flags = self.view("flags", "B")
+        self.sector = self.view("sector", "H")
+        self.sector_alt = self.view("sector_alt", "H")
+        self._symbols = self.raw("tickers")
+        self._off = self.view("ticker_off", "I")
+        self._slots = self.view("ticker_hash", "I")
+        self._mask = len(self._slots) - 1
+
+    def is_current(self, sources: Dict[str, str] = SOURCES) -> bool:
+        """
+        True if every source file still has the content it was built from;
+        only files whose size or mtime changed are hashed.
+        """
+        built = self.meta["sources"]
+        for k, p in sources.items():
+            stamp = built.get(k)
+            try:
+                st = Path(p).stat()
+            except OSError:
+                return False
+            if stamp is None:
+                return False
+            if (st.st_size, st.st_mtime_ns) != (stamp["size"], stamp["mtime_ns"]) \
+                    and _sha256(p) != stamp["sha256"]:
+                return False
+        return True
+
+    # -- lookups ---------------------------------------------------------------
+    def _symbol(self, i: int) -> bytes:
+        return self._symbols[self._off[i]:self._off[i + 1] - 1].tobytes()
+
+    def ticker(self, i: int) -> str:
+        """Symbol of ticker id *i*."""
+        return self._symbol(i).decode("utf-8")
+
+    def ticker_id(self, ticker: str) -> Optional[int]:
+        key = ticker.encode("utf-8")
+        slots, mask = self._slots, self._mask
+        h = zlib.crc32(key) & mask
+        while True:
+            v = slots[h]
+            if not v:
+                return None
+            if self._symbol(v - 1) == key:
+                return v - 1
+            h = (h + 1) & mask
+
+    def whitelist(self) -> "Whitelist":
+        return Whitelist(self)
+
+    def ticker_sector(self, alt: bool = False) -> "TickerSectors":
+        return TickerSectors(self, alt)
+
+    def company_dict(self) -> Dict[str, str]:
+        ticker = self.ticker
+        return dict(zip(self.strings("companies"),
+                        (ticker(i) for i in self.view("company_tk", "I"))))
+
+    def company_matcher(self) -> CompanyMatcher:
+        """Company matcher running directly on the mapped automaton arrays."""
+        ticker = self.ticker
+        arrays = {k: self.view(f"ac_{k}", "I")
+                  for k in ("node", "tok", "dst", "fail", "out_off", "out")}
+        return CompanyMatcher(automaton=ArrayAutomaton(
+            self.strings("ac_tokens"), decode=lambda v: (ticker(v[0]), v[1]),
+            **arrays), tokenizer=spacy_tokenizer())
+
+
+class Whitelist(Set):
+    """
+    Whitelisted symbols of a RefData, as a read-only set over its arrays.
+    Answers are memoised per symbol asked about, never built up front.
+    """
+
+    def __init__(self, rd: RefData):
+        self._rd = rd
+        self._memo: Dict[str, bool] = {}
+
+    def __contains__(self, ticker) -> bool:
+        hit = self._memo.get(ticker)
+        if hit is None:
+            i = self._rd.ticker_id(ticker) if isinstance(ticker, str) else None
+            hit = self._memo[ticker] = i is not None and bool(self._rd.flags[i] & 1)
+        return hit
+
+    def __iter__(self) -> Iterator[str]:
+        rd = self._rd
+        return (rd.ticker(i) for i, f in enumerate(rd.flags) if f & 1)
+
+    def __len__(self) -> int:
+        return self._rd.counts["whitelisted"]
+
+
+class TickerSectors(Mapping):
+    """
+    Ticker → sector name of a RefData (tickers without one are absent).
+    Answers are memoised per ticker asked about, never built up front.
+    """
+
+    def __init__(self, rd: RefData, alt: bool = False):
+        self._rd = rd
+        self._ids = rd.sector_alt if alt else rd.sector
+        self._len = rd.counts["sector_alt" if alt else "sector"]
+        self._memo: Dict[str, Optional[str]] = {}
+
+    def get(self, ticker, default=None):
+        try:
+            sector = self._memo[ticker]
+        except KeyError:
+            i = self._rd.ticker_id(ticker) if isinstance(ticker, str) else None
+            s = self._ids[i] if i is not None else 0
+            sector = self._memo[ticker] = self._rd.sector_names[s] if s else None
+        return default if sector is None else sector
+
+    def __getitem__(self, ticker) -> str:
+        sector = self.get(ticker)
+        if sector is None:
+            raise KeyError(ticker)
+        return sector
+
+    def __contains__(self, ticker) -> bool:
+        return self.get(ticker) is not None
+
+    def __iter__(self) -> Iterator[str]:
+        rd = self._rd
+        return (rd.ticker(i) for i, s in enumerate(self._ids) if s)
+
+    def __len__(self) -> int:
+        return self._len
+
+
+def load(path=REFDATA_PATH, check: bool = True) -> Optional[RefData]:
+    """The artifact at *path*, or None if it is missing, unreadable or stale."""
+    try:
+        rd = RefData(path)
+    except (OSError, ValueError):
+        return None
+    if check and not rd.is_current():
+        print(f"⚠️  {path} is older than its sources; run "
+              "`python -m common.refdata build`", file=sys.stderr)
+        return None
+    return rd
+
+
+# ---------------------------------------------------------------------------
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser()
+    ap.add_argument("cmd", choices=("build", "info"))
+    ap.add_argument("--path", default=REFDATA_PATH)
+    args = ap.parse_args()
+
+    if args.cmd == "build":
+        out = build(args.path)
+        print(f"✅ reference data → {out} ({out.stat().st_size:,} bytes)")
+    else:
+        rd = RefData(args.path)
+        print(f"{args.path}: version {rd.meta['version']}, "
+              f"{'current' if rd.is_current() else 'STALE'}")
+        print(f"  {rd.n_tickers:,} tickers, {len(rd.whitelist()):,} whitelisted, "
+              f"{len(rd.sector_names) - 1} sectors, "
+              f"{len(rd.company_dict()):,} company names, "
+              f"{len(rd.company_matcher().automaton):,} automaton states")
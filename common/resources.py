@@ -0,0 +1,125 @@
+"""
+Lazy, memoized registry of the pipeline's heavy resources.
+
+Reference data (ticker whitelist, company dictionary, ticker→sector map)
+and models (spaCy pipelines, the punkt sentence splitter) used to be loaded
+at import time, so any tool that imported one helper paid for all of them.
+Each resource is now a zero-argument loader registered with @resource: the
+first call loads it (once, even under threads), later calls return the same
+object, and importing a module costs nothing but its code.
+
+Worker processes load their own copy on first use — with the spawn pools
+used here that is once per worker, never per task.  The reference data
+comes from the memory-mapped artifact `data/refdata.bin` when it is present
+and current (common.refdata), so those copies share one set of pages; the
+text files are the fallback.
+
+Usage
+-----
+    from common import resources
+
+    if tk in resources.whitelist(): ...
+    resources.loaded()          # → ["whitelist"]
+
+    @resources.resource
+    def my_model():
+        return expensive_load()
+"""
+from __future__ import annotations
+
+import functools
+import threading
+from typing import (TYPE_CHECKING, AbstractSet, Callable, Dict, List, Mapping,
+                    Optional, TypeVar)
+
+if TYPE_CHECKING:
+    from common.refdata import RefData
+
+T = TypeVar("T")
+
+TICKER_MASTER = "data/ticker_master.csv"
+COMPANY_DICT = "data/company_dict.json"
+TICKER_SECTOR = "data/ticker2sector.csv"
+
+_registry: Dict[str, "_Lazy"] = {}
+
+
+class _Lazy:
+    """Thread-safe memoizing wrapper around a zero-argument loader."""
+
+    _unset = object()
+
+    def __init__(self, fn: Callable[[], T]):
+        functools.update_wrapper(self, fn)
+        self._fn = fn
+        self._value = self._unset
+        self._lock = threading.Lock()
+
+    def __call__(self) -> T:
+        value = self._value
+        if value is self._unset:
+            with self._lock:
+                if self._value is self._unset:
+                    self._value = self._fn()
+                value = self._value
+        return value
+
+    @property
+    def is_loaded(self) -> bool:
+        return self._value is not self._unset
+
+    def clear(self) -> None:
+        with self._lock:
+            self._value = self._unset
+
+
+def resource(fn: Callable[[], T]) -> Callable[[], T]:
+    """Register *fn* (by qualified name) as a lazily loaded, memoized resource."""
+    lazy = _Lazy(fn)
+    _registry[f"{fn.__module__}.{fn.__qualname__}"] = lazy
+    return lazy
+
+
+def loaded() -> List[str]:
+    """Names of the resources loaded so far in this process."""
+    return [name for name, lazy in _registry.items() if lazy.is_loaded]
+
+
+def clear() -> None:
+    """Drop every loaded resource (e.g. after the data files changed)."""
+    for lazy in _registry.values():
+        lazy.clear()
+
+
+# ---------------------------------------------------------------------------
+# Shared reference data
+# ---------------------------------------------------------------------------
+@resource
+def refdata() -> Optional["RefData"]:
+    """The compiled reference data, or None if missing / stale (see common.refdata)."""
+    from common import refdata as rd
+    return rd.load(rd.REFDATA_PATH)
+
+
+@resource
+def whitelist() -> AbstractSet[str]:
+    """Valid ticker symbols from ticker_master.csv (a view over refdata.bin if built)."""
+    from common.refdata import parse_ticker_master
+    rd = refdata()
+    return rd.whitelist() if rd else frozenset(parse_ticker_master(TICKER_MASTER))
+
+
+@resource
+def company_dict() -> Dict[str, str]:
+    """Company name → ticker."""
+    from common.refdata import parse_company_dict
+    rd = refdata()
+    return rd.company_dict() if rd else parse_company_dict(COMPANY_DICT)
+
+
+@resource
+def ticker_sector() -> Mapping[str, str]:
+    """Ticker → sector, skipping rows whose sector is empty or Unknown."""
+    from common.refdata import parse_ticker_sector
+    rd = refdata()
+    return rd.ticker_sector() if rd else parse_ticker_sector(TICKER_SECTOR)
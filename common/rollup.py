@@ -0,0 +1,304 @@
+"""
+Daily ticker / sector sentiment index, materialized incrementally (SQLite).
+
+The final output has one record per article, so "AAPL over the last 90
+days" would mean rescanning all of `news_final`.  `SentimentIndex` keeps
+one row per (ticker, date) and (sector, date) instead:
+
+    articles            number of articles
+    neg / neu / pos     articles per label
+    conf_neg / …        sum of their confidences
+    weight              sum of weights (ticker: 1 per article,
+                        sector: the `sectors_summary` weight)
+    score               Σ weight · sign(label) · confidence / 100,
+                        sign = -1 NEG, 0 NEU, +1 POS
+
+so net sentiment over any range is Σ score / Σ weight ∈ [-1, 1] and mean
+confidence per label is Σ conf_x / Σ x.  The rows are clustered by
+(kind, key, date), so a range query reads a handful of pages.
+
+Sums are kept as integers in the output's own precision (confidence to
+2 decimals, weight to 4), so merging is exact and order-independent:
+ingesting day by day gives the same table as one pass over the history.
+The IDs of ingested articles (common.incremental) are stored with the
+sums in the same transaction; ingest() skips known IDs, so feeding the
+whole, appended-to output again only adds the new days.
+
+Usage
+-----
+    python -m common.rollup series ticker AAPL --days 90
+    python -m common.rollup series sector Technology --start 2024-01-01
+    python -m common.rollup top ticker --days 30 [--by net] [-n 10]
+    python -m common.rollup info
+
+    idx = SentimentIndex("data/sentiment_index.db")
+    idx.ingest(read_records("data/news_final_10k.jsonl.gz"))
+    idx.series("ticker", "AAPL", start="2024-01-01")   # [{date, net, …}]
+"""
+from __future__ import annotations
+
+import argparse
+import datetime as dt
+import os
+import sqlite3
+import time
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from common.incremental import content_id
+
+INDEX_PATH = "data/sentiment_index.db"
+KINDS = ("ticker", "sector")
+LABELS = ("NEG", "NEU", "POS")
+SIGN = {"NEG": -1, "NEU": 0, "POS": 1}
+CONF_SCALE = 100        # confidences are rounded to 2 decimals
+WEIGHT_SCALE = 10_000   # sector weights to 4
+SCORE_SCALE = CONF_SCALE * WEIGHT_SCALE * 100   # score = w · conf / 100
+BATCH_SIZE = 5000       # articles per transaction
+_CHUNK = 900            # SQLite host-parameter limit is 999
+_LAST = "9999-12-31"    # open-ended range bound
+
+# value columns, in storage order
+_SUMS = ("articles", "neg", "neu", "pos", "conf_neg", "conf_neu", "conf_pos",
+         "weight", "score")
+
+
+def _fixed(x: float, scale: int) -> int:
+    return round(x * scale)
+
+
+class SentimentIndex:
+    def __init__(self, path: str = INDEX_PATH, readonly: bool = False):
+        if readonly:
+            self.db = sqlite3.connect(f"file:{path}?mode=ro", uri=True)
+        else:
+            os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+            self.db = sqlite3.connect(path, timeout=60)
+            self.db.execute("PRAGMA journal_mode=WAL")
+            self.db.execute("PRAGMA synchronous=NORMAL")
+            self.db.execute(
+                "CREATE TABLE IF NOT EXISTS daily ("
+                " kind TEXT NOT NULL, key TEXT NOT NULL, date TEXT NOT NULL,"
+                + "".join(f" {c} INTEGER NOT NULL," for c in _SUMS)
+                + " PRIMARY KEY (kind, key, date)) WITHOUT ROWID")
+            self.db.execute(
+                "CREATE INDEX IF NOT EXISTS daily_by_date ON daily (kind, date)")
+            self.db.execute(
+                "CREATE TABLE IF NOT EXISTS articles ("
+                " id TEXT PRIMARY KEY, date TEXT) WITHOUT ROWID")
+            self.db.commit()
+        self.db.row_factory = sqlite3.Row
+
+    # ------------------------------------------------------------------ #
+    # Ingest
+    # ------------------------------------------------------------------ #
+    @staticmethod
+    def _rows(rec: dict, date: str) -> Iterable[Tuple[str, str, str, List[int]]]:
+        """(kind, key, date, sums) contributed by one final record."""
+        overall = rec.get("overall") or {}
+        if overall.get("label") in SIGN:
+            lbl = overall["label"]
+            conf = _fixed(overall.get("confidence") or 0, CONF_SCALE)
+            vals = [1, 0, 0, 0, 0, 0, 0, WEIGHT_SCALE,
+                    SIGN[lbl] * conf * WEIGHT_SCALE]
+            vals[1 + LABELS.index(lbl)] = 1
+            vals[4 + LABELS.index(lbl)] = conf
+            for tk in dict.fromkeys(rec.get("tickers") or ()):
+                yield "ticker", tk, date, vals
+        for sec, s in (rec.get("sectors_summary") or {}).items():
+            lbl = s.get("label")
+            if lbl not in SIGN:
+                continue
+            conf = _fixed(s.get("confidence") or 0, CONF_SCALE)
+            w = _fixed(s.get("weight") or 0, WEIGHT_SCALE)
+            vals = [1, 0, 0, 0, 0, 0, 0, w, SIGN[lbl] * conf * w]
+            vals[1 + LABELS.index(lbl)] = 1
+            vals[4 + LABELS.index(lbl)] = conf
+            yield "sector", sec, date, vals
+
+    def _known(self, ids: List[str]) -> set:
+        known = set()
+        for i in range(0, len(ids), _CHUNK):
+            chunk = ids[i:i + _CHUNK]
+            known.update(r[0] for r in self.db.execute(
+                f"SELECT id FROM articles WHERE id IN ({','.join('?' * len(chunk))})",
+                chunk))
+        return known
+
+    def _merge(self, batch: List[Tuple[str, dict]]) -> Tuple[int, int]:
+        """Add the unseen records of *batch* in one transaction; (added, skipped)."""
+        known = self._known([i for i, _ in batch])
+        sums: Dict[Tuple[str, str, str], List[int]] = {}
+        new_ids = {}
+        for aid, rec in batch:
+            if aid in known or aid in new_ids:
+                continue
+            date = str(rec.get("date") or "")[:10]
+            new_ids[aid] = date or None
+            if not date:
+                continue  # undated: recorded as seen, not counted
+            for kind, key, day, vals in self._rows(rec, date):
+                acc = sums.get((kind, key, day))
+                if acc is None:
+                    sums[(kind, key, day)] = list(vals)
+                else:
+                    for j, v in enumerate(vals):
+                        acc[j] += v
+        with self.db:
+            self.db.executemany(
+                "INSERT INTO daily VALUES (?, ?, ?" + ", ?" * len(_SUMS) + ")"
+                " ON CONFLICT (kind, key, date) DO UPDATE SET "
+                + ", ".join(f"{c} = {c} + excluded.{c}" for c in _SUMS),
+                [(*k, *v) for k, v in sums.items()])
+            self.db.executemany("INSERT INTO articles VALUES (?, ?)", new_ids.items())
+        return len(new_ids), len(batch) - len(new_ids)
+
+    def ingest(self, records: Iterable[dict], batch_size: int = BATCH_SIZE,
+               progress=None) -> Tuple[int, int]:
+        """
+        Merge final-schema records; returns (added, skipped as already
+        ingested).  Each batch commits atomically with its article IDs,
+        so an interrupted ingest can simply be run again.
+        """
+        added = skipped = 0
+        batch: List[Tuple[str, dict]] = []
+        for rec in records:
+            batch.append((content_id(rec), rec))
+            if len(batch) >= batch_size:
+                a, s = self._merge(batch)
+                added, skipped, batch = added + a, skipped + s, []
+                if progress is not None:
+                    progress.update(a + s)
+        if batch:
+            a, s = self._merge(batch)
+            added, skipped = added + a, skipped + s
+            if progress is not None:
+                progress.update(a + s)
+        return added, skipped
+
+    # ------------------------------------------------------------------ #
+    # Queries
+    # ------------------------------------------------------------------ #
+    @staticmethod
+    def _decode(row) -> dict:
+        counts = {l: row[l.lower()] for l in LABELS}
+        weight = row["weight"] / WEIGHT_SCALE
+        out = {"articles": row["articles"], "counts": counts,
+               "confidence": {l: round(row[f"conf_{l.lower()}"] / CONF_SCALE / counts[l], 2)
+                              if counts[l] else None for l in LABELS},
+               "weight": weight,
+               "score": row["score"] / SCORE_SCALE,
+               "net": round(row["score"] / SCORE_SCALE / weight, 4) if weight else None}
+        if "date" in row.keys():
+            out = {"date": row["date"], **out}
+        return out
+
+    def resolve_range(self, start: Optional[str] = None, end: Optional[str] = None,
+                      days: Optional[int] = None) -> Tuple[Optional[str], Optional[str]]:
+        """(start, end) ISO dates; *days* counts back from *end* (default: latest day)."""
+        if days is not None:
+            end = end or self.latest_date()
+            if end:
+                start = (dt.date.fromisoformat(end) - dt.timedelta(days=days - 1)).isoformat()
+        return start, end
+
+    def series(self, kind: str, key: str, start: Optional[str] = None,
+               end: Optional[str] = None) -> List[dict]:
+        """One dict per day with articles of *key* in [start, end], by date."""
+        rows = self.db.execute(
+            "SELECT * FROM daily WHERE kind = ? AND key = ?"
+            " AND date >= ? AND date <= ? ORDER BY date",
+            (kind, key, start or "", end or _LAST))
+        return [self._decode(r) for r in rows]
+
+    def summary(self, kind: str, key: str, start: Optional[str] = None,
+                end: Optional[str] = None) -> dict:
+        """Totals of *key* over [start, end]."""
+        row = self.db.execute(
+            "SELECT " + ", ".join(f"COALESCE(SUM({c}), 0) AS {c}" for c in _SUMS)
+            + " FROM daily WHERE kind = ? AND key = ? AND date >= ? AND date <= ?",
+            (kind, key, start or "", end or _LAST)).fetchone()
+        return {"key": key, **self._decode(row)}
+
+    def top(self, kind: str, start: Optional[str] = None, end: Optional[str] = None,
+            n: int = 10, by: str = "net", min_articles: int = 5,
+            ascending: bool = False) -> List[dict]:
+        """Keys ranked by `net` or `articles` over [start, end]."""
+        order = {"net": "CAST(SUM(score) AS REAL) / SUM(weight)",
+                 "articles": "SUM(articles)"}[by]
+        rows = self.db.execute(
+            "SELECT key, " + ", ".join(f"SUM({c}) AS {c}" for c in _SUMS)
+            + " FROM daily WHERE kind = ? AND date >= ? AND date <= ?"
+            " GROUP BY key HAVING SUM(articles) >= ? AND SUM(weight) > 0"
+            f" ORDER BY {order} {'ASC' if ascending else 'DESC'}, key LIMIT ?",
+            (kind, start or "", end or _LAST, min_articles, n))
+        return [{"key": r["key"], **self._decode(r)} for r in rows]
+
+    def latest_date(self) -> Optional[str]:
+        return self.db.execute("SELECT MAX(date) FROM daily").fetchone()[0]
+
+    def stats(self) -> dict:
+        q = self.db.execute
+        out = {"articles": q("SELECT COUNT(*) FROM articles").fetchone()[0]}
+        for kind in KINDS:
+            out[f"{kind}s"] = q("SELECT COUNT(DISTINCT key) FROM daily WHERE kind = ?",
+                                (kind,)).fetchone()[0]
+        out["rows"] = q("SELECT COUNT(*) FROM daily").fetchone()[0]
+        out["first"], out["last"] = q("SELECT MIN(date), MAX(date) FROM daily").fetchone()
+        return out
+
+    def close(self) -> None:
+        self.db.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+# ---------------------------------------------------------------------------
+def _fmt(row: dict, label: str) -> str:
+    c = row["counts"]
+    net = "   n/a" if row["net"] is None else f"{row['net']:+.3f}"
+    return (f"{label:<20}{row['articles']:>7}{c['NEG']:>6}{c['NEU']:>6}{c['POS']:>6}"
+            f"{row['weight']:>10.2f}{net:>8}")
+
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser()
+    ap.add_argument("cmd", choices=("series", "top", "info"))
+    ap.add_argument("kind", nargs="?", choices=KINDS)
+    ap.add_argument("key", nargs="?", help="ticker or sector (series)")
+    ap.add_argument("--path", default=INDEX_PATH)
+    ap.add_argument("--start", help="first day, YYYY-MM-DD")
+    ap.add_argument("--end", help="last day (default: latest in the index)")
+    ap.add_argument("--days", type=int, help="the last N days up to --end")
+    ap.add_argument("--by", choices=("net", "articles"), default="net")
+    ap.add_argument("--asc", action="store_true", help="top: lowest first")
+    ap.add_argument("-n", type=int, default=10)
+    ap.add_argument("--min-articles", type=int, default=5)
+    args = ap.parse_args()
+    if not os.path.exists(args.path):
+        raise SystemExit(f"❌ {args.path} not found (python -m scripts.rollup_sentiment)")
+    if args.cmd != "info" and not args.kind or args.cmd == "series" and not args.key:
+        ap.error(f"{args.cmd} needs a kind" + (" and a key" if args.cmd == "series" else ""))
+
+    with SentimentIndex(args.path, readonly=True) as idx:
+        if args.cmd == "info":
+            print(f"{args.path}: {idx.stats()}")
+            raise SystemExit(0)
+        t0 = time.perf_counter()
+        start, end = idx.resolve_range(args.start, args.end, args.days)
+        if args.cmd == "series":
+            rows = idx.series(args.kind, args.key, start, end)
+            total = idx.summary(args.kind, args.key, start, end)
+        else:
+            rows = idx.top(args.kind, start, end, args.n, args.by,
+                           args.min_articles, args.asc)
+        ms = (time.perf_counter() - t0) * 1000
+        print(f"{'':<20}{'arts':>7}{'NEG':>6}{'NEU':>6}{'POS':>6}{'weight':>10}{'net':>8}")
+        for r in rows:
+            print(_fmt(r, r.get("date") or r.get("key")))
+        if args.cmd == "series":
+            print(_fmt(total, "total"))
+        print(f"⏱ {len(rows)} rows, {start or '…'} – {end or '…'}, {ms:.1f} ms")
@@ -0,0 +1,102 @@
+"""
+Versioned, memory-mappable files of named binary sections — the container
+format shared by common.refdata and common.postings.
+
+Layout (little-endian, sections 8-byte aligned)
+------
+    char[8] magic, uint32 version, uint32 n_sections
+    n_sections × (char[16] name, uint64 offset, uint64 length)
+    section payloads
+
+A section is raw bytes: a JSON blob, a packed array (host order, hence the
+little-endian requirement) or a string table — "\\n"-terminated UTF-8, see
+`string_table`.  `write` is atomic (temp file + rename); `SectionFile` maps
+the file read-only and hands out zero-copy views.
+
+Usage
+-----
+    write(path, b"EXAMPLE\\0", 1, {"meta": b"{}", "ids": array("I", ids).tobytes()})
+
+    f = SectionFile(path, b"EXAMPLE\\0", 1, kind="example")
+    ids = f.view("ids", "I")
+"""
+from __future__ import annotations
+
+import mmap
+import os
+import struct
+import sys
+from pathlib import Path
+from typing import Dict, Iterable, Tuple
+
+_HEADER = struct.Struct("<8sII")
+_ENTRY = struct.Struct("<16sQQ")
+
+if sys.byteorder != "little":  # arrays are written / mapped in host order
+    raise ImportError("common.sectionfile needs a little-endian host")
+
+
+def string_table(items: Iterable[str]) -> bytes:
+    """One section of "\\n"-terminated strings (which must not contain newlines).
+
+    Terminated rather than joined, so an empty string survives: [""] and []
+    encode differently.
+    """
+    items = list(items)
+    assert not any("\n" in s for s in items), "newline in a string table entry"
+    return "".join(s + "\n" for s in items).encode("utf-8")
+
+
+def write(path, magic: bytes, version: int, sections: Dict[str, bytes]) -> Path:
+    """Write *sections* (name → payload, in order) to *path* atomically."""
+    path = Path(path)
+    tmp = path.with_name(path.name + ".tmp")
+    pos = _HEADER.size + _ENTRY.size * len(sections)
+    table, blobs = [], []
+    for name, blob in sections.items():
+        pad = -pos % 8
+        blobs.append(b"\0" * pad + blob)
+        pos += pad
+        table.append(_ENTRY.pack(name.encode(), pos, len(blob)))
+        pos += len(blob)
+    with open(tmp, "wb") as f:
+        f.write(_HEADER.pack(magic, version, len(sections)))
+        f.writelines(table)
+        f.writelines(blobs)
+    os.replace(tmp, path)
+    return path
+
+
+class SectionFile:
+    """Read-only, memory-mapped section file."""
+
+    def __init__(self, path, magic: bytes, version: int, kind: str = "section"):
+        self.path = Path(path)
+        with open(self.path, "rb") as f:
+            self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        got_magic, got_version, n = _HEADER.unpack_from(self._mm, 0)
+        if got_magic != magic or got_version != version:
+            self._mm.close()
+            raise ValueError(f"{self.path}: not a version-{version} {kind} file")
+        self.sections: Dict[str, Tuple[int, int]] = {}
+        for i in range(n):
+            name, off, length = _ENTRY.unpack_from(self._mm, _HEADER.size + i * _ENTRY.size)
+            self.sections[name.rstrip(b"\0").decode()] = (off, length)
+
+    def raw(self, name: str) -> memoryview:
+        off, length = self.sections[name]
+        return memoryview(self._mm)[off:off + length]
+
+    def view(self, name: str, fmt: str) -> memoryview:
+        """Section *name* as a typed view (struct format char, e.g. "I")."""
+        return self.raw(name).cast(fmt)
+
+    def strings(self, name: str) -> list[str]:
+        """A string-table section, decoded."""
+        return bytes(self.raw(name)).decode("utf-8").split("\n")[:-1]
+
+    def close(self) -> None:
+        try:
+            self._mm.close()
+        except BufferError:  # a caller still holds a view
+            pass
@@ -0,0 +1,154 @@
+"""
+Staged, thread-pipelined executor with bounded queues.
+
+    source ──q──▶ stage 1 ──q──▶ stage 2 ──q──▶ … ──▶ sink
+
+Every stage runs in its own thread and maps one item to one item; queues
+between stages hold at most `maxsize` items, so a slow stage applies
+back-pressure instead of letting memory grow.  Threads pay off here because
+the heavy steps (gzip, fast-tokenizer batches, torch forward) release the GIL.
+
+Each stage records where its wall-clock went:
+  • busy    – inside its own function
+  • idle    – waiting for input from upstream   (upstream is the bottleneck)
+  • blocked – waiting for room downstream       (downstream is the bottleneck)
+
+Usage
+-----
+    ex = StagedExecutor(read_batches(path),
+                        [("tokenize", tok), ("model", fwd)],
+                        sink=("write", write))
+    ex.run()
+    print(ex.report())
+"""
+from __future__ import annotations
+
+import queue
+import threading
+import time
+from typing import Callable, Iterable, List, Tuple
+
+_DONE = object()
+
+
+class StageStats:
+    def __init__(self, name: str):
+        self.name = name
+        self.items = 0
+        self.busy = 0.0
+        self.idle = 0.0
+        self.blocked = 0.0
+
+
+class StagedExecutor:
+    def __init__(self, source: Iterable, stages: List[Tuple[str, Callable]],
+                 sink: Tuple[str, Callable], source_name: str = "read",
+                 maxsize: int = 4):
+        self.source = source
+        self.stages = stages
+        self.sink = sink
+        self.maxsize = maxsize
+        self.stats = [StageStats(source_name)] + \
+            [StageStats(name) for name, _ in stages] + [StageStats(sink[0])]
+        self.wall = 0.0
+        self._stop = threading.Event()
+        self._error: BaseException | None = None
+
+    # ------------------------------------------------------------------ #
+    def _put(self, q: queue.Queue, item, st: StageStats) -> bool:
+        t0 = time.perf_counter()
+        while not self._stop.is_set():
+            try:
+                q.put(item, timeout=0.1)
+                st.blocked += time.perf_counter() - t0
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def _get(self, q: queue.Queue, st: StageStats):
+        t0 = time.perf_counter()
+        while not self._stop.is_set():
+            try:
+                item = q.get(timeout=0.1)
+                st.idle += time.perf_counter() - t0
+                return item
+            except queue.Empty:
+                continue
+        return _DONE
+
+    def _fail(self, exc: BaseException) -> None:
+        if self._error is None:
+            self._error = exc
+        self._stop.set()
+
+    # ------------------------------------------------------------------ #
+    def _run_source(self, out_q: queue.Queue, st: StageStats) -> None:
+        try:
+            it = iter(self.source)
+            while True:
+                t0 = time.perf_counter()
+                try:
+                    item = next(it)
+                except StopIteration:
+                    break
+                finally:
+                    st.busy += time.perf_counter() - t0
+                st.items += 1
+                if not self._put(out_q, item, st):
+                    return
+            self._put(out_q, _DONE, st)
+        except BaseException as exc:  # propagate to run()
+            self._fail(exc)
+
+    def _run_stage(self, fn: Callable, in_q: queue.Queue,
+                   out_q: queue.Queue | None, st: StageStats) -> None:
+        try:
+            while True:
+                item = self._get(in_q, st)
+                if item is _DONE:
+                    break
+                t0 = time.perf_counter()
+                result = fn(item)
+                st.busy += time.perf_counter() - t0
+                st.items += 1
+                if out_q is not None and not self._put(out_q, result, st):
+                    return
+            if out_q is not None:
+                self._put(out_q, _DONE, st)
+        except BaseException as exc:
+            self._fail(exc)
+
+    def run(self) -> None:
+        """Run all stages to completion; re-raises the first stage error."""
+        fns = [fn for _, fn in self.stages] + [self.sink[1]]
+        queues = [queue.Queue(self.maxsize) for _ in fns]
+        threads = [threading.Thread(target=self._run_source,
+                                    args=(queues[0], self.stats[0]),
+                                    name=self.stats[0].name, daemon=True)]
+        for i, fn in enumerate(fns):
+            out_q = queues[i + 1] if i + 1 < len(queues) else None
+            threads.append(threading.Thread(
+                target=self._run_stage, args=(fn, queues[i], out_q, self.stats[i + 1]),
+                name=self.stats[i + 1].name, daemon=True))
+
+        t0 = time.perf_counter()
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        self.wall = time.perf_counter() - t0
+        if self._error is not None:
+            raise self._error
+
+    def report(self) -> str:
+        """Per-stage busy / idle / blocked seconds; the busiest stage is the bottleneck."""
+        lines = [f"{'stage':<10}{'items':>8}{'busy s':>9}{'idle s':>9}"
+                 f"{'blocked s':>11}{'busy %':>8}"]
+        for st in self.stats:
+            pct = st.busy / self.wall if self.wall else 0.0
+            lines.append(f"{st.name:<10}{st.items:>8}{st.busy:>9.1f}{st.idle:>9.1f}"
+                         f"{st.blocked:>11.1f}{pct:>8.0%}")
+        bottleneck = max(self.stats, key=lambda s: s.busy)
+        lines.append(f"wall {self.wall:.1f} s — bottleneck: {bottleneck.name}")
+        return "\n".join(lines)
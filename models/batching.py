@@ -0,0 +1,56 @@
+"""
+Batch planners for FinBERT inference.
+
+A planner takes the tokenized length of every sentence and returns a list
+of batches, each batch being a list of indices into the original sentence
+list.  Callers run the model batch by batch and scatter the predictions
+back to those indices, so article order is never disturbed.
+
+  • fixed_batches        – consecutive chunks of `batch_size` (legacy path)
+  • token_budget_batches – sort by length, then fill each batch while
+                           rows × longest-row stays under `max_tokens`
+"""
+from typing import List, Sequence, Tuple
+
+
+def fixed_batches(n: int, batch_size: int) -> List[List[int]]:
+    """Split range(n) into consecutive chunks of *batch_size*."""
+    return [list(range(i, min(i + batch_size, n)))
+            for i in range(0, n, batch_size)]
+
+
+def token_budget_batches(lengths: Sequence[int],
+                         max_tokens: int,
+                         max_batch_size: int = 256) -> List[List[int]]:
+    """
+    Length-bucketed batches under a padded-token budget.
+
+    Sentences are visited shortest-first; a batch is closed as soon as
+    adding the next sentence would make `len(batch) * longest` exceed
+    *max_tokens* (or the batch reaches *max_batch_size*).  A single
+    sentence longer than the budget still gets a batch of its own.
+    """
+    order = sorted(range(len(lengths)), key=lambda i: lengths[i])
+    batches: List[List[int]] = []
+    batch: List[int] = []
+    for i in order:
+        # ascending order ⇒ the newcomer is always the longest row
+        if batch and ((len(batch) + 1) * lengths[i] > max_tokens
+                      or len(batch) >= max_batch_size):
+            batches.append(batch)
+            batch = []
+        batch.append(i)
+    if batch:
+        batches.append(batch)
+    return batches
+
+
+def padding_stats(lengths: Sequence[int],
+                  batches: Sequence[Sequence[int]]) -> Tuple[int, int]:
+    """Return (padded_tokens, real_tokens) for a batch plan."""
+    padded = real = 0
+    for batch in batches:
+        lens = [lengths[i] for i in batch]
+        padded += len(lens) * max(lens)
+        real += sum(lens)
+    return padded, real
@@ -0,0 +1,53 @@
+#!/usr/bin/env python3
+"""
+export_onnx.py
+--------------
+Export ProsusAI/finbert to an ONNX graph for the "onnx" FinBERT backend.
+Runs fully offline from the local Hugging Face cache (no hub requests),
+so it works on air-gapped production boxes once the model was pulled once.
+
+Usage
+-----
+    python -m models.export_onnx                          # → models/onnx/finbert.onnx
+    python -m models.export_onnx --out /tmp/finbert.onnx --opset 17
+"""
+import argparse
+import pathlib
+
+import torch
+from transformers import AutoTokenizer, AutoModelForSequenceClassification
+
+from models.finbert import MODEL_ID, ONNX_PATH
+
+
+def export(out_path: pathlib.Path, opset: int = 14) -> None:
+    tokenizer = AutoTokenizer.from_pretrained(MODEL_ID, local_files_only=True)
+    model = AutoModelForSequenceClassification.from_pretrained(
+        MODEL_ID, local_files_only=True).eval()
+
+    dummy = tokenizer(["Shares of ACME rose 3% on Tuesday."],
+                      return_tensors="pt")
+    names = ["input_ids", "attention_mask", "token_type_ids"]
+    dynamic = {n: {0: "batch", 1: "seq"} for n in names}
+    dynamic["logits"] = {0: "batch"}
+
+    out_path.parent.mkdir(parents=True, exist_ok=True)
+    with torch.no_grad():
+        torch.onnx.export(
+            model,
+            tuple(dummy[n] for n in names),
+            str(out_path),
+            input_names=names,
+            output_names=["logits"],
+            dynamic_axes=dynamic,
+            opset_version=opset,
+        )
+    print(f"✅ Exported {MODEL_ID} → {out_path}")
+
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--out", type=pathlib.Path, default=pathlib.Path(ONNX_PATH))
+    ap.add_argument("--opset", type=int, default=14)
+    args = ap.parse_args()
+    export(args.out, args.opset)
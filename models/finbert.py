@@ -1,49 +1,125 @@
-# models/finbert.py
 """
 FinBERT wrapper: loads the ProsusAI/finbert model and tokenizer,
 provides a .predict(text_list) method returning label + confidence for each.
+
+Backends (all share the same predict() contract):
+  • "torch" – fp32 PyTorch eager mode (default, CPU or GPU)
+  • "int8"  – PyTorch dynamic int8 quantisation of the Linear layers (CPU)
+  • "onnx"  – ONNX Runtime session over a graph exported with
+              `python -m models.export_onnx` (CPU)
 """
+import numpy as np
 import torch
 from transformers import AutoTokenizer, AutoModelForSequenceClassification
 
 
+MODEL_ID = "ProsusAI/finbert"
+ONNX_PATH = "models/onnx/finbert.onnx"
+BACKENDS = ("torch", "int8", "onnx")
+
+
+def percent(top):
+    """
+    Top-class probabilities → confidences in percent, rounded to 2 decimals
+    (float64).  The one rounding rule behind every output form: dicts,
+    arrays, compact lists and cached predictions.
+    """
+    return np.round(np.asarray(top, dtype=np.float64) * 100, 2)
+
+
 class FinBERT:
-    def __init__(self, device=None):
-        # Select device: GPU if available, else CPU
-        self.device = device or (
-            "cuda" if torch.cuda.is_available() else "cpu")
+    def __init__(self, device=None, backend="torch", onnx_path=ONNX_PATH):
+        if backend not in BACKENDS:
+            raise ValueError(f"unknown backend {backend!r}; pick one of {BACKENDS}")
+        self.backend = backend
+        # Select device: GPU if available, else CPU (quantised backends are CPU-only)
+        if backend == "torch":
+            self.device = device or (
+                "cuda" if torch.cuda.is_available() else "cpu")
+        else:
+            self.device = "cpu"
+        # Cache key: int8 / onnx outputs differ slightly from fp32
+        self.model_id = MODEL_ID if backend == "torch" else f"{MODEL_ID}:{backend}"
         # Load tokenizer and model
-        self.tokenizer = AutoTokenizer.from_pretrained("ProsusAI/finbert")
-        self.model = AutoModelForSequenceClassification.from_pretrained(
-            "ProsusAI/finbert")
-        # Move model to device
-        self.model.to(self.device).eval()
+        self.tokenizer = AutoTokenizer.from_pretrained(MODEL_ID)
+        if backend == "onnx":
+            import onnxruntime as ort
+
+            self.session = ort.InferenceSession(
+                onnx_path, providers=["CPUExecutionProvider"])
+            self.input_names = {i.name for i in self.session.get_inputs()}
+        else:
+            self.model = AutoModelForSequenceClassification.from_pretrained(
+                MODEL_ID)
+            if backend == "int8":
+                self.model = torch.quantization.quantize_dynamic(
+                    self.model, {torch.nn.Linear}, dtype=torch.qint8)
+            # Move model to device
+            self.model.to(self.device).eval()
         # Mapping from model outputs to labels
         self.id2label = {0: "NEG", 1: "NEU", 2: "POS"}
+        self.label2id = {v: k for k, v in self.id2label.items()}
 
-    @torch.inference_mode()
-    def predict(self, texts):
-        """
-        Predict sentiment for a list of texts.
-        Returns a list of dicts: [{"label": str, "confidence": float}, ...]
-        """
+    def encode(self, texts):
+        """Tokenize a batch into backend-ready padded tensors."""
+        if self.backend == "onnx":
+            enc = self.tokenizer(texts, padding=True, truncation=True,
+                                 return_tensors="np")
+            return {k: v.astype(np.int64) for k, v in enc.items()
+                    if k in self.input_names}
         # Tokenize inputs
-        enc = self.tokenizer(
+        return self.tokenizer(
             texts,
             padding=True,
             truncation=True,
             return_tensors="pt"
         ).to(self.device)
+
+    @torch.inference_mode()
+    def forward(self, enc):
+        """Softmax probabilities for an encode() batch, as a (n, 3) NumPy array."""
+        if self.backend == "onnx":
+            logits = self.session.run(["logits"], enc)[0]
+            logits = logits - logits.max(axis=-1, keepdims=True)
+            exp = np.exp(logits)
+            return exp / exp.sum(axis=-1, keepdims=True)
         # Forward pass
         outputs = self.model(**enc)
         logits = outputs.logits
         # Softmax to probabilities
-        probs = torch.softmax(logits, dim=-1).cpu().tolist()
-        results = []
-        for prob in probs:
-            # find index of max probability
-            idx = int(max(range(len(prob)), key=lambda i: prob[i]))
-            label = self.id2label[idx]
-            confidence = round(prob[idx] * 100, 2)
-            results.append({"label": label, "confidence": confidence})
-        return results
+        return torch.softmax(logits, dim=-1).cpu().numpy()
+
+    def to_dicts(self, probs):
+        """Turn a forward() probability array into prediction dicts."""
+        ids = probs.argmax(axis=-1).tolist()
+        conf = percent(probs.max(axis=-1)).tolist()
+        return [{"label": self.id2label[i], "confidence": c}
+                for i, c in zip(ids, conf)]
+
+    def predict_arrays(self, texts, return_probs=False):
+        """
+        Array form of predict(), without a dict per sentence.
+        Returns (label_ids int8[n], confidences float64[n] in percent, rounded
+        as in predict()) and, with *return_probs*, the full float32[n, 3]
+        probability matrix.
+        Label ids follow id2label (0 NEG, 1 NEU, 2 POS).
+        """
+        probs = self.forward(self.encode(texts))
+        ids = probs.argmax(axis=-1).astype(np.int8)
+        conf = percent(probs.max(axis=-1))
+        return (ids, conf, probs) if return_probs else (ids, conf)
+
+    def predict(self, texts):
+        """
+        Predict sentiment for a list of texts.
+        Returns a list of dicts: [{"label": str, "confidence": float}, ...]
+        """
+        return self.to_dicts(self.forward(self.encode(texts)))
+
+    def token_lengths(self, texts):
+        """
+        Number of tokens each text occupies after truncation (special
+        tokens included), i.e. its row width before padding.
+        """
+        enc = self.tokenizer(texts, truncation=True)
+        return [len(ids) for ids in enc["input_ids"]]
@@ -0,0 +1,59 @@
+"""
+Persistent sentence-level sentiment cache (SQLite, LRU-evicted).
+
+Keys are content addresses: blake2b(normalised sentence ‖ model id), so the
+same boilerplate sentence scored by the same model is looked up instead of
+re-scored, across runs and across corpora.  Values are the usual
+{"label": str, "confidence": float} prediction dicts.  Storage, eviction and
+hit counting are common.kvcache's; this class only maps sentences to keys.
+
+Usage
+-----
+    cache = SentimentCache("cache/sentiment.db", model_id=model.model_id)
+    hits = cache.get_many(sents)           # {sentence: prediction}
+    cache.put_many(new_preds)              # {sentence: prediction}
+    print(cache.stats())
+"""
+import hashlib
+import re
+from typing import Dict, Iterable
+
+from common.kvcache import KVCache
+
+_WS = re.compile(r"\s+")
+
+
+def normalise(text: str) -> str:
+    """Whitespace-insensitive form of a sentence used for hashing."""
+    return _WS.sub(" ", text).strip()
+
+
+class SentimentCache(KVCache):
+    def __init__(self, path="cache/sentiment.db", model_id="ProsusAI/finbert",
+                 max_entries=5_000_000):
+        super().__init__(path, max_entries=max_entries)
+        self.model_id = model_id
+
+    # ------------------------------------------------------------------ #
+    def key(self, text: str) -> bytes:
+        h = hashlib.blake2b(digest_size=16)
+        h.update(normalise(text).encode("utf-8"))
+        h.update(b"\0")
+        h.update(self.model_id.encode("utf-8"))
+        return h.digest()
+
+    def get_many(self, texts: Iterable[str]) -> Dict[str, dict]:
+        """Bulk lookup; returns only the sentences found in the cache."""
+        texts = list(texts)
+        keys = [self.key(t) for t in texts]
+        hits = super().get_many(keys)
+        found: Dict[str, dict] = {}
+        for t, k in zip(texts, keys):
+            p = hits.get(k)
+            if p is not None and t not in found:
+                found[t] = dict(p)
+        return found
+
+    def put_many(self, preds: Dict[str, dict]) -> None:
+        """Insert predictions, then evict least-recently-used overflow."""
+        super().put_many({self.key(t): p for t, p in preds.items()})
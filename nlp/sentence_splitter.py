@@ -0,0 +1,106 @@
+"""
+Pluggable sentence splitters for `scripts/segment.py`.
+
+Every splitter is a function text → list of sentences, registered in
+SPLITTERS under the name `segment.py --splitter` takes:
+
+  • punkt (default) – NLTK's pre-trained English punkt model, the
+                      reference (accurate, slow)
+  • rules           – one regex pass for sentence-final punctuation
+                      followed by a capitalised word, digit or quote,
+                      vetoed after the abbreviations of financial news:
+                      company suffixes ("Inc.", "Corp.", "Co."), titles,
+                      months, multi-dot acronyms ("U.S.", "e.g.") and
+                      single initials.  Decimals ("3.5%"), tickers
+                      ("$AAPL") and "Q4.2" never match, since a boundary
+                      needs whitespace after the punctuation.
+
+scripts/bench_splitter.py reports throughput and boundary agreement with
+punkt.
+
+Usage
+-----
+    from nlp.sentence_splitter import SPLITTERS
+
+    SPLITTERS["rules"]("Apple Inc. rose 3.5% in Q4. Shares of MSFT fell.")
+    # → ["Apple Inc. rose 3.5% in Q4.", "Shares of MSFT fell."]
+"""
+from __future__ import annotations
+
+import re
+from typing import Callable, Dict, List
+
+from common.resources import resource
+
+
+# ---------------------------------------------------------------------------
+# punkt (reference)
+# ---------------------------------------------------------------------------
+@resource
+def punkt():
+    """NLTK punkt sentence tokenizer, loaded on first use."""
+    import nltk
+
+    return nltk.data.load('tokenizers/punkt/english.pickle')
+
+
+def punkt_split(text: str) -> List[str]:
+    return punkt().tokenize(text)
+
+
+# ---------------------------------------------------------------------------
+# rules (fast)
+# ---------------------------------------------------------------------------
+ABBREVIATIONS = frozenset("""
+    inc corp co cos ltd llc plc lp llp bros hldgs hldg grp intl assn dept
+    mr mrs ms dr prof sr jr st mt gov sen rep gen col lt capt sgt adm rev hon
+    jan feb mar apr jun jul aug sep sept oct nov dec
+    mon tue tues wed thu thur thurs fri sat sun
+    vs approx est ft yr yrs mo mos wk min max avg pct
+    etc al cf ca ave blvd rd
+""".split())
+# abbreviations only when a number follows: "No. 2", "Vol. 3", but "said no."
+NUMERIC_ABBREVIATIONS = frozenset("no nos vol fig figs p pp".split())
+
+# sentence-final punctuation (plus closing quotes / brackets), then
+# whitespace and something that can start a sentence
+_BOUNDARY = re.compile(r"""[.!?]+["'’”)\]]*(?=\s+["'‘“(\[]?([A-Z0-9$]))""")
+_ACRONYM = re.compile(r"(?:[A-Za-z]\.)+[A-Za-z]")  # U.S / e.g / N.Y (final "." dropped)
+_LEADING = "\"'‘“([{"
+
+
+def _is_abbreviation(text: str, dot: int, nxt: str) -> bool:
+    """
+    Is the "." at *dot* the end of an abbreviation rather than a sentence?
+    *nxt* is the first character of the following word.
+    """
+    word = text[text.rfind(" ", 0, dot) + 1:dot].lstrip(_LEADING)
+    if not word:
+        return False
+    lower = word.lower()
+    return (lower in ABBREVIATIONS
+            or (lower in NUMERIC_ABBREVIATIONS and nxt.isdigit())
+            or (len(word) == 1 and word.isupper())       # initial: "J. Smith"
+            or _ACRONYM.fullmatch(word) is not None)     # "U.S.", "e.g."
+
+
+def rule_split(text: str) -> List[str]:
+    sents, start = [], 0
+    for m in _BOUNDARY.finditer(text):
+        if text[m.start()] == "." and m.group().count(".") == 1 \
+                and _is_abbreviation(text, m.start(), m.group(1)):
+            continue
+        sent = text[start:m.end()].strip()
+        if sent:
+            sents.append(sent)
+        start = m.end()
+    tail = text[start:].strip()
+    if tail:
+        sents.append(tail)
+    return sents
+
+
+SPLITTERS: Dict[str, Callable[[str], List[str]]] = {
+    "punkt": punkt_split,
+    "rules": rule_split,
+}
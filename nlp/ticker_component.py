@@ -6,49 +6,121 @@ Custom spaCy pipeline component that tags any token which:
 
 as a `TICKER` named‑entity.
 
+The component is a registered factory ("ticker_component"), so it can be
+added by name, saved / loaded with the pipeline (`nlp.to_disk` stores its
+whitelist next to the other components) and pickled into
+`nlp.pipe(n_process=...)` workers.
+
+Per doc the work is one pass over the tokens:
+
+  • the whitelist is pre-filtered to 1-5 capital letters and kept as the
+    set of lexeme IDs (`token.orth`) of its symbols, so testing a token is
+    a single integer lookup — no regex, no string decode;
+  • tokens already inside an entity are collected in a set, so a ticker
+    never overlaps an existing entity and the check is O(1).
+
+Importing this module imports spaCy (a factory has to be registered before
+a pipeline that uses it is built or loaded).
+
 Usage
 -----
     import spacy
-    from fin_sentiment.nlp.ticker_component import make_ticker_component
+    import nlp.ticker_component  # registers the factory
 
     nlp = spacy.load("en_core_web_lg")
-    nlp.add_pipe(make_ticker_component(nlp, whitelist), last=True)
+    nlp.add_pipe("ticker_component", last=True)   # whitelist: ticker_master.csv,
+                                                  # read on first use
+    nlp.get_pipe("ticker_component").set_whitelist(my_tickers)  # optional
+    nlp.to_disk("models/ner_tickers")
 """
 
-from spacy.matcher import Matcher
-from spacy.tokens import Span
-from typing import Set
+import re
+from pathlib import Path
+from typing import Iterable, Optional
+
+from spacy.language import Language
+from spacy.tokens import Doc, Span
+from spacy.util import ensure_path
+from spacy.vocab import Vocab
+
+from common import resources
+
+# 1‑5 capital letters (no digits, no dots)
+TICKER_SHAPE = re.compile(r"[A-Z]{1,5}")
+WHITELIST_FILE = "whitelist.txt"
 
 
-def make_ticker_component(nlp, whitelist: Set[str], name: str = "ticker_component"):
+class TickerComponent:
+    """Tags whitelisted ticker tokens as entities (see module docstring)."""
+
+    def __init__(self, vocab: Vocab, name: str = "ticker_component",
+                 label: str = "TICKER", whitelist: Optional[Iterable[str]] = None):
+        self.vocab = vocab
+        self.name = name
+        self.label = label
+        # the default whitelist is loaded on first use, so that from_disk /
+        # from_bytes can restore a saved one without reading data/ at all
+        self.whitelist: Optional[list] = None
+        self._orths: frozenset = frozenset()
+        if whitelist is not None:
+            self.set_whitelist(whitelist)
+
+    def _ensure_whitelist(self) -> None:
+        if self.whitelist is None:
+            self.set_whitelist(resources.whitelist())
+
+    def set_whitelist(self, whitelist: Iterable[str]) -> None:
+        self.whitelist = sorted({t for t in whitelist if TICKER_SHAPE.fullmatch(t)})
+        add = self.vocab.strings.add
+        self._orths = frozenset(add(t) for t in self.whitelist)
+
+    def __call__(self, doc: Doc) -> Doc:
+        self._ensure_whitelist()
+        orths = self._orths
+        hits = [tok.i for tok in doc if tok.orth in orths]
+        if not hits:
+            return doc
+        ents = list(doc.ents)
+        taken = {i for e in ents for i in range(e.start, e.end)}
+        label = self.vocab.strings.add(self.label)
+        ents += [Span(doc, i, i + 1, label=label) for i in hits if i not in taken]
+        doc.ents = ents
+        return doc
+
+    def pipe(self, docs: Iterable[Doc], batch_size: int = 128) -> Iterable[Doc]:
+        for doc in docs:
+            yield self(doc)
+
+    # -- serialization ----------------------------------------------------------
+    def to_disk(self, path, *, exclude=tuple()) -> None:
+        path = ensure_path(path)
+        path.mkdir(parents=True, exist_ok=True)
+        self._ensure_whitelist()
+        (path / WHITELIST_FILE).write_text("\n".join(self.whitelist), encoding="utf-8")
+
+    def from_disk(self, path, *, exclude=tuple()) -> "TickerComponent":
+        text = (Path(path) / WHITELIST_FILE).read_text(encoding="utf-8")
+        self.set_whitelist(text.split("\n") if text else [])
+        return self
+
+    def to_bytes(self, *, exclude=tuple()) -> bytes:
+        self._ensure_whitelist()
+        return "\n".join(self.whitelist).encode("utf-8")
+
+    def from_bytes(self, data: bytes, *, exclude=tuple()) -> "TickerComponent":
+        self.set_whitelist(data.decode("utf-8").split("\n") if data else [])
+        return self
+
+
+@Language.factory("ticker_component", default_config={"label": "TICKER"})
+def make_ticker_component(nlp: Language, name: str, label: str) -> TickerComponent:
     """
     Parameters
     ----------
     nlp : spacy.Language
-    whitelist : set[str]
-        A Python set containing all valid ticker strings.
     name : str
         Name used by spaCy in the pipeline registry.
+    label : str
+        Entity label of the tagged tickers.
     """
-
-    matcher = Matcher(nlp.vocab)
-    # 1‑5 capital letters (no digits, no dots)
-    pattern = [{"TEXT": {"REGEX": r"^[A-Z]{1,5}$"}}]
-    matcher.add("TICKER", [pattern])
-
-    def ticker_component(doc):
-        matches = matcher(doc)
-        new_ents = list(doc.ents)
-
-        for _, start, end in matches:
-            span = Span(doc, start, end, label=doc.vocab.strings["TICKER"])
-            if (
-                span.text in whitelist
-                and not any(e.start == span.start for e in new_ents)
-            ):
-                new_ents.append(span)
-
-        doc.ents = new_ents
-        return doc
-
-    return ticker_component
+    return TickerComponent(nlp.vocab, name, label)
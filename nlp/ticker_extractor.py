@@ -1,20 +1,34 @@
 import re
-import spacy
 from typing import List, Set
 
-nlp = spacy.load("en_core_web_sm")
+from common.resources import resource
 
 # Regex for patterns like (NYSE:A) or $AAPL
 TICKER_PATTERN = re.compile(r'\$?[A-Z]{1,5}(?=[\s\W])')
 
 
+@resource
+def load_nlp():
+    """en_core_web_sm, loaded on first use."""
+    import spacy
+
+    return spacy.load("en_core_web_sm")
+
+
+def __getattr__(name: str):
+    # `nlp` was a module-level pipeline; it still is, loaded on first access
+    if name == "nlp":
+        return load_nlp()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
 def extract_regex_tickers(text: str) -> Set[str]:
     matches = TICKER_PATTERN.findall(text)
     return set(m.strip('$') for m in matches if 1 <= len(m.strip('$')) <= 5)
 
 
 def extract_ner_tickers(text: str) -> Set[str]:
-    doc = nlp(text)
+    doc = load_nlp()(text)
     orgs = set(ent.text for ent in doc.ents if ent.label_ == "ORG")
     return orgs
 
@@ -0,0 +1,228 @@
+"""
+spaCy-free company-name matcher for ticker extraction.
+
+`scripts/extract_tickers.py` used to run `en_core_web_sm` over every
+article only to feed a `PhraseMatcher(attr="LOWER")`.  This module does the
+same job with an Aho–Corasick automaton whose alphabet is lower-cased
+word tokens: every company name in `company_dict.json` becomes a token
+sequence, and one left-to-right pass over an article's tokens reports every
+(possibly overlapping) name occurrence.  Working on whole tokens gives the
+word-boundary check for free — "Apple" matches in "Apple's" or "(Apple)"
+but not in "Pineapple".
+
+Tokens are runs of word characters or single punctuation marks.  That
+matches spaCy's tokenizer on plain prose, but not everywhere spaCy keeps
+a string together via its tokenizer exceptions and infix rules:
+
+    text          spaCy                 regex tokens
+    "AT&T"        at&t                  at & t
+    "Inc."        inc.                  inc .
+    "U.S."        u.s.                  u . s .
+    "apple.com"   apple.com             apple . com
+    "Apple's"     apple 's              apple ' s
+    "A   B"       a ␣␣ b                a b
+
+and spaCy tokenizes a name on its own differently from the same words
+in running text ("alphabet inc." → alphabet inc ., "3m" → 3 m).  So a
+name can match here where the PhraseMatcher misses it: "apple" inside
+"apple.com", "at&t" in "AT & T", "alphabet inc." in "Alphabet Inc.",
+"3m" in "3M-made", names across repeated spaces.  Pass
+`tokenizer=spacy_tokenizer()` for token-for-token PhraseMatcher behaviour
+(spaCy's tokenizer, no model) — the extract_tickers default.
+
+As in the PhraseMatcher version, a matched name is looked up in
+`company_dict` by its lower-cased text, so only entries whose key is
+lower-case (or has a lower-case twin) can ever yield a ticker.
+
+Usage
+-----
+    from nlp.ticker_matcher import CompanyMatcher
+
+    matcher = CompanyMatcher(company_dict)
+    matcher.find("Shares of Apple rose …")         # → {"AAPL"}
+    matcher.find_spans("Shares of Apple rose …")   # → [(10, "AAPL")]
+
+    exact = CompanyMatcher(company_dict, tokenizer=spacy_tokenizer())
+"""
+
+from __future__ import annotations
+
+import re
+from bisect import bisect_left
+from typing import (Callable, Dict, Hashable, Iterable, Iterator, List, Sequence, Set,
+                    Tuple)
+
+TOKEN_RGX = re.compile(r"\w+|[^\w\s]")
+
+# text → [(start character, lower-cased token), ...]
+Tokenizer = Callable[[str], List[Tuple[int, str]]]
+
+
+def tokenize(text: str) -> List[str]:
+    """Lower-cased word / punctuation tokens of *text*."""
+    return [tok.lower() for tok in TOKEN_RGX.findall(text)]
+
+
+def regex_tokens(text: str) -> List[Tuple[int, str]]:
+    """The default Tokenizer: TOKEN_RGX, lower-cased."""
+    return [(m.start(), m.group().lower()) for m in TOKEN_RGX.finditer(text)]
+
+
+def spacy_tokenizer(lang: str = "en") -> Tokenizer:
+    """A Tokenizer with spaCy's rules for *lang* (blank pipeline, no model)."""
+    import spacy
+
+    tok = spacy.blank(lang).tokenizer
+    return lambda text: [(t.idx, t.lower_) for t in tok(text)]
+
+
+class AhoCorasick:
+    """
+    Aho–Corasick automaton over sequences of hashable symbols.
+
+    add() every pattern, build() once, then iter() reports
+    (end index, value) for every pattern occurrence in a sequence.
+    """
+
+    def __init__(self):
+        self._goto: List[Dict[Hashable, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._out: List[Tuple] = [()]
+        self._built = False
+
+    def add(self, pattern: Sequence[Hashable], value) -> None:
+        if not pattern:
+            return
+        state = 0
+        for sym in pattern:
+            nxt = self._goto[state].get(sym)
+            if nxt is None:
+                nxt = len(self._goto)
+                self._goto[state][sym] = nxt
+                self._goto.append({})
+                self._fail.append(0)
+                self._out.append(())
+            state = nxt
+        self._out[state] += (value,)
+        self._built = False
+
+    def build(self) -> "AhoCorasick":
+        """Compute failure links (breadth-first) and merge their outputs."""
+        queue = list(self._goto[0].values())
+        for s in queue:
+            self._fail[s] = 0
+        for state in queue:  # grows while iterating: BFS order
+            for sym, nxt in self._goto[state].items():
+                queue.append(nxt)
+                f = self._fail[state]
+                while f and sym not in self._goto[f]:
+                    f = self._fail[f]
+                self._fail[nxt] = self._goto[f].get(sym, 0)
+                self._out[nxt] += self._out[self._fail[nxt]]
+        self._built = True
+        return self
+
+    def __len__(self) -> int:
+        return len(self._goto)
+
+    def iter(self, seq: Iterable[Hashable]) -> Iterator[Tuple[int, object]]:
+        if not self._built:
+            self.build()
+        goto, fail, out = self._goto, self._fail, self._out
+        state = 0
+        for i, sym in enumerate(seq):
+            while state and sym not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(sym, 0)
+            for value in out[state]:
+                yield i, value
+
+    def to_arrays(self, sym_id: Dict[Hashable, int], value_id) -> Dict[str, List[int]]:
+        """
+        Flat (CSR) form for ArrayAutomaton: per-state edges sorted by symbol
+        id, failure links and outputs; *value_id(value)* maps an output to a
+        tuple of ints.
+        """
+        if not self._built:
+            self.build()
+        arrs = {"node": [0], "tok": [], "dst": [], "fail": list(self._fail),
+                "out_off": [0], "out": []}
+        for goto, out in zip(self._goto, self._out):
+            for sym, nxt in sorted(goto.items(), key=lambda kv: sym_id[kv[0]]):
+                arrs["tok"].append(sym_id[sym])
+                arrs["dst"].append(nxt)
+            arrs["node"].append(len(arrs["tok"]))
+            for value in out:
+                arrs["out"].extend(value_id(value))
+            arrs["out_off"].append(len(arrs["out"]))
+        return arrs
+
+
+class ArrayAutomaton:
+    """
+    AhoCorasick.iter() over the flat arrays of to_arrays() — any integer
+    sequences, e.g. memoryviews of a memory-mapped file, so processes can
+    share one copy.  Transitions are binary searches in the state's edges.
+    """
+
+    def __init__(self, symbols: Sequence[Hashable], node, tok, dst, fail,
+                 out_off, out, decode):
+        self.sym_id = {sym: i for i, sym in enumerate(symbols)}
+        self.node, self.tok, self.dst, self.fail = node, tok, dst, fail
+        self.out_off, self.out = out_off, out
+        self.decode = decode  # out[a:b] → output value
+
+    def __len__(self) -> int:
+        return len(self.fail)
+
+    def iter(self, seq: Iterable[Hashable]) -> Iterator[Tuple[int, object]]:
+        sym_id, node, tok, dst, fail = self.sym_id, self.node, self.tok, self.dst, self.fail
+        out_off, out, decode = self.out_off, self.out, self.decode
+        state = 0
+        for i, sym in enumerate(seq):
+            t = sym_id.get(sym)
+            if t is None:  # in no pattern: back to the root
+                state = 0
+                continue
+            while True:
+                a, b = node[state], node[state + 1]
+                j = bisect_left(tok, t, a, b)
+                if j < b and tok[j] == t:
+                    state = dst[j]
+                    break
+                if not state:
+                    break
+                state = fail[state]
+            for k in range(out_off[state], out_off[state + 1], 2):
+                yield i, decode(out[k:k + 2])
+
+
+class CompanyMatcher:
+    """Company name → ticker lookup over free text (case-insensitive)."""
+
+    def __init__(self, company_dict: Dict[str, str] | None = None, automaton=None,
+                 tokenizer: Tokenizer | None = None):
+        """
+        Compile *company_dict*, or wrap a prebuilt (e.g. ArrayAutomaton)
+        *automaton* built with the same *tokenizer* (default regex_tokens).
+        """
+        self.tokenizer = tokenizer or regex_tokens
+        if automaton is None:
+            automaton = AhoCorasick()
+            for name in company_dict:
+                ticker = company_dict.get(name.lower())
+                toks = [t for _, t in self.tokenizer(name)]
+                if ticker and toks:
+                    automaton.add(toks, (ticker, len(toks)))
+            automaton.build()
+        self.automaton = automaton
+
+    def find(self, text: str) -> Set[str]:
+        toks = (t for _, t in self.tokenizer(text))
+        return {tk for _, (tk, _) in self.automaton.iter(toks)}
+
+    def find_spans(self, text: str) -> List[Tuple[int, str]]:
+        """(start character, ticker) of every company-name occurrence."""
+        toks = self.tokenizer(text)
+        return [(toks[end - n + 1][0], tk)
+                for end, (tk, n) in self.automaton.iter(t for _, t in toks)]
@@ -5,15 +5,21 @@ aggregate_sentiment.py
 Collapse sentence-level FinBERT predictions + sector weights
 into the final article-level JSON schema.
 
-INPUT  : JSONL(.gz) from `sentiment_inference.py`
+INPUT  : JSONL(.gz) / Parquet / Arrow from `sentiment_inference.py`
          Each record has keys
            • date, headline, sentences
            • tickers
+           • ticker_mentions : [[sentence idx, ticker idx], ...]
+                               (from `extract_tickers.py`; optional)
            • sectors    : {"Technology": 0.58, ...}         (weights ≈ 1)
            • sentiments : [ {"label":"NEG","confidence":82}, ... ]
+             or, from `sentiment_inference.py --compact`,
+           • sentiment_ids  : [0, 1, 2, ...]   (index into LABEL_ORDER)
+           • sentiment_conf : [82.0, 55.1, ...]
 
-OUTPUT : JSONL.GZ 1-line-per-article, keys
+OUTPUT : JSONL.GZ (or .parquet / .arrow) 1-line-per-article, keys
            {
+             "id": "3f0c…",                     (content ID, see common.incremental)
              "date": "2023-12-16",
              "headline_summary": "Interesting …",
              "overall": { "label":"NEG", "confidence":82.3 },
@@ -31,27 +37,50 @@ Scoring rules
 • Overall conf = mean conf of the majority-label sentences.
 • Per-sector label = majority vote *restricted to sentences whose
   confidence ≥ 60 and that mention at least one ticker mapped to that
-  sector*; if none, fall back to overall label.
+  sector*; if none, fall back to overall label.  Mentions come from the
+  extracted `ticker_mentions`; older inputs without it fall back to the
+  first "(TICKER)" in each sentence.
 • Per-sector confidence = mean of that sector’s winning sentences,
   else overall_conf.
+
+Engines
+-------
+• batch (default) – articles are aggregated 1 000 at a time: labels as
+  small ints, confidences and (sentence, sector) votes as flat NumPy
+  arrays with per-article offsets, votes / tie-breaks / means computed
+  with segment-wise bincount (aggregate_batch).  Reading the input dicts
+  and building the output records stay per-article Python, which bounds
+  the gain at about 2× (scripts/bench_aggregate.py).
+• python – the article-at-a-time reference (aggregate_article).
+Both give identical output (tests/test_aggregate.py).
 """
 
 from __future__ import annotations
 
 import argparse
-import gzip
-import json
 import logging
 import re
 import sys
 from collections import Counter, defaultdict
 from pathlib import Path
 from statistics import mean
-from typing import Dict, List
+from typing import Dict, List, Mapping, Tuple
+
+import numpy as np
+
+from common import checkpoint, parallel, resources
+from common.checkpoint import Checkpoint
+from common.refdata import parse_ticker_sector
+from common.records import read_records
 
 logging.basicConfig(level=logging.INFO, format="%(levelname)s: %(message)s")
 
 LABEL_ORDER = ["NEG", "NEU", "POS"]  # preference when counts tie
+LABEL_ID = {lbl: i for i, lbl in enumerate(LABEL_ORDER)}
+N_LABELS = len(LABEL_ORDER)
+MIN_SECTOR_CONF = 60
+ENGINES = ("batch", "python")
+BATCH_SIZE = 1000
 TICKER_RE = re.compile(r"\(([A-Z]{1,5})\)")  # crude “(AAPL)” etc.
 
 
@@ -72,22 +101,42 @@ def sector_from_sent(
     return ticker2sector.get(m.group(1), fallback)
 
 
+def sentence_sectors(
+    art: dict, ticker2sector: Dict[str, str], fallback: str = "Other"
+) -> List[Tuple[str, ...]]:
+    """Sectors each sentence votes for, from its extracted ticker mentions."""
+    if "ticker_mentions" not in art:
+        return [(sector_from_sent(s, ticker2sector, fallback),)
+                for s in art["sentences"]]
+    tickers = art["tickers"]
+    secs = [set() for _ in art["sentences"]]
+    for s, t in art["ticker_mentions"]:
+        sec = ticker2sector.get(tickers[t])
+        if sec:
+            secs[s].add(sec)
+    return [tuple(sorted(ss)) or (fallback,) for ss in secs]
+
+
 # ---------------------------------------------------------------------------#
 def aggregate_article(art: dict, ticker2sector: Dict[str, str]) -> dict:
     # ---------- overall -------------------------------------------------- #
-    labels = [s["label"] for s in art["sentiments"]]
-    confs = [s["confidence"] for s in art["sentiments"]]
+    if "sentiments" in art:
+        labels = [s["label"] for s in art["sentiments"]]
+        confs = [s["confidence"] for s in art["sentiments"]]
+    else:  # compact arrays
+        labels = [LABEL_ORDER[i] for i in art["sentiment_ids"]]
+        confs = art["sentiment_conf"]
 
     overall_lbl = majority_label(labels)
     overall_conf = round(mean(c for l, c in zip(labels, confs) if l == overall_lbl), 2)
 
     # ---------- per-sector vote ----------------------------------------- #
     sector_votes: Dict[str, List[float]] = defaultdict(list)
-    for sent, sdict in zip(art["sentences"], art["sentiments"]):
-        if sdict["confidence"] < 60:
+    for secs, lbl, conf in zip(sentence_sectors(art, ticker2sector), labels, confs):
+        if conf < MIN_SECTOR_CONF:
             continue  # ignore low-confidence lines
-        sec = sector_from_sent(sent, ticker2sector)
-        sector_votes[sec].append((sdict["label"], sdict["confidence"]))
+        for sec in secs:
+            sector_votes[sec].append((lbl, conf))
 
     sectors_summary: Dict[str, dict] = {}
     for sec, weight in art["sectors"].items():
@@ -106,6 +155,7 @@ def aggregate_article(art: dict, ticker2sector: Dict[str, str]) -> dict:
     headline_summary = art["sentences"][0].replace(" <HEADLINE>", "")
 
     return {
+        "id": art.get("id"),  # stamped by segment.py
         "date": art.get("date"),
         "headline_summary": headline_summary,
         "overall": {"label": overall_lbl, "confidence": overall_conf},
@@ -115,36 +165,205 @@ def aggregate_article(art: dict, ticker2sector: Dict[str, str]) -> dict:
 
 
 # ---------------------------------------------------------------------------#
-def run(inp: Path, outp: Path, ticker_map: Path):
+# Batch engine
+# ---------------------------------------------------------------------------#
+def _exact_mean(vals: List[float]) -> float:
+    """statistics.mean of floats (exact sum, one correct rounding), faster."""
+    ratios = [v.as_integer_ratio() for v in vals]
+    d = max(q for _, q in ratios)  # powers of two: the largest is a multiple of all
+    return sum(p * (d // q) for p, q in ratios) / (d * len(vals))
+
+
+def _segment_vote(group: np.ndarray, labels: np.ndarray, confs: np.ndarray,
+                  n_groups: int) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Majority label (ties → LABEL_ORDER), its mean confidence and the number
+    of votes per group, for votes (group, label, confidence).
+    """
+    counts = np.bincount(group * N_LABELS + labels,
+                         minlength=n_groups * N_LABELS).reshape(n_groups, N_LABELS)
+    win = counts.argmax(axis=1)  # first maximum = preferred label
+    won = labels == win[group]
+    n_won = counts[np.arange(n_groups), win]
+    sums = np.bincount(group[won], weights=confs[won], minlength=n_groups)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        means = sums / n_won
+
+    # Means within float noise of a round(…, 2) half-way point (common with
+    # 2-decimal confidences) could round the other way than the exact
+    # statistics.mean of the reference; recompute those exactly.
+    near = np.flatnonzero(np.abs(means * 100 % 1 - 0.5) < 1e-6)
+    if near.size:
+        g, c = group[won], confs[won]
+        order = np.argsort(g, kind="stable")
+        g, c = g[order], c[order]
+        lo, hi = np.searchsorted(g, near, "left"), np.searchsorted(g, near, "right")
+        for k, a, b in zip(near.tolist(), lo.tolist(), hi.tolist()):
+            means[k] = _exact_mean(c[a:b].tolist())
+    return win, means, counts.sum(axis=1)
+
+
+def aggregate_batch(arts: List[dict], ticker2sector: Dict[str, str]) -> List[dict]:
+    """aggregate_article() over *arts*, vectorized across the whole batch."""
+    sector_id: Dict[str, int] = {}
+    sid = sector_id.setdefault
+    fallback = sid("Other", 0)
+
+    labels, confs, n_sents = [], [], []
+    vote_sent, vote_sec = [], []   # (global sentence index, sector id) pairs
+    votable = []                   # (first sentence, n voting sentences) per article
+    exact = []                     # articles left to the reference path
+    base = 0
+    for a, art in enumerate(arts):
+        if "sentiments" in art:
+            lbls = [LABEL_ID[s["label"]] for s in art["sentiments"]]
+            cf = [s["confidence"] for s in art["sentiments"]]
+        else:
+            lbls, cf = art["sentiment_ids"], art["sentiment_conf"]
+        if not lbls or len(cf) != len(lbls) or set(map(type, cf)) != {float}:
+            # nothing to vote on, ragged input, or int confidences
+            # (statistics.mean keeps ints): leave it to aggregate_article
+            exact.append(a)
+            lbls, cf = [], []
+        n = len(lbls)
+        labels += lbls
+        confs += cf
+        n_sents.append(n)
+
+        n_vote = min(n, len(art["sentences"]))  # zip() in aggregate_article
+        votable.append((base, n_vote))
+        if "ticker_mentions" in art:
+            tsec = [sid(ticker2sector[t], len(sector_id)) if ticker2sector.get(t) else -1
+                    for t in art["tickers"]]
+            for s, t in art["ticker_mentions"]:
+                if s >= len(art["sentences"]):  # as aggregate_article fails
+                    raise IndexError(f"ticker mention of sentence {s} in an article "
+                                     f"with {len(art['sentences'])} sentences")
+                if s < n_vote and tsec[t] >= 0:
+                    vote_sent.append(base + s)
+                    vote_sec.append(tsec[t])
+        else:
+            for s, sent in enumerate(art["sentences"][:n_vote]):
+                m = TICKER_RE.search(sent)
+                sec = ticker2sector.get(m.group(1), "Other") if m else "Other"
+                vote_sent.append(base + s)
+                vote_sec.append(sid(sec, len(sector_id)))
+        base += n
+
+    n_arts = len(arts)
+    labels = np.asarray(labels, dtype=np.int64)
+    confs = np.asarray(confs, dtype=np.float64)
+    sent_art = np.repeat(np.arange(n_arts), n_sents)
+
+    # ---------- overall -------------------------------------------------- #
+    win, means, _ = _segment_vote(sent_art, labels, confs, n_arts)
+
+    # ---------- per-sector vote ----------------------------------------- #
+    # one vote per (sentence, sector); voting sentences without a mapped
+    # ticker vote for the fallback sector
+    n_sec = len(sector_id)
+    first, n_vote = (np.asarray(c, dtype=np.int64).reshape(-1) for c in
+                     (zip(*votable) if votable else ((), ())))
+    in_vote = np.zeros(len(labels) + 1, dtype=np.int64)
+    np.add.at(in_vote, first, 1)
+    np.add.at(in_vote, first + n_vote, -1)
+    has_vote = np.zeros(len(labels), dtype=bool)
+    vote_sent = np.asarray(vote_sent, dtype=np.int64)
+    has_vote[vote_sent] = True
+    orphan = np.flatnonzero(np.cumsum(in_vote[:-1]).astype(bool) & ~has_vote)
+    key = np.unique(np.concatenate([
+        vote_sent * n_sec + np.asarray(vote_sec, dtype=np.int64),
+        orphan * n_sec + fallback]))
+    vote_sent, vote_sec = key // n_sec, key % n_sec
+    keep = confs[vote_sent] >= MIN_SECTOR_CONF
+    vote_sent, vote_sec = vote_sent[keep], vote_sec[keep]
+    group = sent_art[vote_sent] * n_sec + vote_sec
+    sec_win, sec_means, sec_votes = _segment_vote(
+        group, labels[vote_sent], confs[vote_sent], n_arts * n_sec)
+    sec_win = sec_win.reshape(n_arts, n_sec)
+    sec_means = sec_means.reshape(n_arts, n_sec)
+    sec_votes = sec_votes.reshape(n_arts, n_sec)
+
+    # ---------- records -------------------------------------------------- #
+    out = []
+    win, means = win.tolist(), means.tolist()
+    exact = set(exact)
+    for a, art in enumerate(arts):
+        if a in exact:
+            out.append(aggregate_article(art, ticker2sector))
+            continue
+        overall_lbl, overall_conf = LABEL_ORDER[win[a]], round(means[a], 2)
+        sectors_summary: Dict[str, dict] = {}
+        for sec, weight in art["sectors"].items():
+            j = sector_id.get(sec)
+            if j is not None and sec_votes[a, j]:
+                sec_lbl = LABEL_ORDER[sec_win[a, j]]
+                sec_conf = round(float(sec_means[a, j]), 2)
+            else:
+                sec_lbl, sec_conf = overall_lbl, overall_conf
+            sectors_summary[sec] = {
+                "weight": round(weight, 4),
+                "label": sec_lbl,
+                "confidence": sec_conf,
+            }
+        out.append({
+            "id": art.get("id"),  # stamped by segment.py
+            "date": art.get("date"),
+            "headline_summary": art["sentences"][0].replace(" <HEADLINE>", ""),
+            "overall": {"label": overall_lbl, "confidence": overall_conf},
+            "tickers": art.get("tickers", []),
+            "sectors_summary": sectors_summary,
+        })
+    return out
+
+
+# ---------------------------------------------------------------------------#
+def load_ticker_map(ticker_map: Path | None = None) -> Mapping[str, str]:
+    """Ticker → sector; empty / Unknown sectors are dropped, as in enrich."""
+    if ticker_map is None:
+        return resources.ticker_sector()
+    return parse_ticker_sector(ticker_map)
+
+
+def run(inp: Path, outp: Path, ticker_map: Path | None = None, resume: bool = False,
+        every: int = checkpoint.DEFAULT_EVERY, incremental: bool = False,
+        engine: str = "batch"):
     # load ticker → sector map once
-    t2s = {}
-    with open(ticker_map, encoding="utf-8") as f:
-        for line in f:
-            t, s = line.strip().split(",")
-            if t != "ticker":
-                t2s[t] = s
-
-    opener = gzip.open if inp.suffix == ".gz" else open
-    with opener(inp, "rt", encoding="utf-8") as fin, gzip.open(
-        outp, "wt", encoding="utf-8"
-    ) as fout:
-        for line in fin:
-            art = json.loads(line)
-            fout.write(json.dumps(aggregate_article(art, t2s), ensure_ascii=False) + "\n")
+    t2s = load_ticker_map(ticker_map)
+
+    with Checkpoint(inp, outp, resume, every, incremental=incremental) as fout:
+        arts = read_records(inp, start=fout.start)
+        if engine == "python":
+            for art in arts:
+                if not fout.seen(art):
+                    fout.write(aggregate_article(art, t2s))
+                fout.advance()
+        else:
+            for consumed, batch in parallel.iter_batches(arts, fout, BATCH_SIZE):
+                for rec in aggregate_batch(batch, t2s):
+                    fout.write(rec)
+                fout.advance(consumed)
     logging.info("✅ Aggregated sentiment → %s", outp)
 
 
 # ---------------------------------------------------------------------------#
 if __name__ == "__main__":
     p = argparse.ArgumentParser()
-    p.add_argument("input", type=Path, help="news_sentiment_*.jsonl(.gz)")
-    p.add_argument("output", type=Path, help="news_final_*.jsonl.gz")
+    p.add_argument("input", type=Path,
+                   help="news_sentiment_*.jsonl(.gz) / .parquet / .arrow")
+    p.add_argument("output", type=Path,
+                   help="news_final_*.jsonl.gz / .parquet / .arrow")
     p.add_argument(
         "--map",
-        default="data/ticker2sector.csv",
-        help="CSV file produced by build_ticker2sector.py",
+        default=None,
+        help="CSV file produced by build_ticker2sector.py "
+             "(default: shared reference data, data/refdata.bin if built)",
     )
+    p.add_argument("--engine", choices=ENGINES, default="batch",
+                   help="batch (vectorized, default) or python (reference)")
+    checkpoint.add_arguments(p)
     args = p.parse_args()
     if not Path(args.input).exists():
         sys.exit(f"❌ {args.input} not found")
-    run(args.input, args.output, Path(args.map))
+    run(args.input, args.output, args.map and Path(args.map), args.resume,
+        args.checkpoint_every, args.incremental, args.engine)
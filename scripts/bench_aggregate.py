@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+"""
+bench_aggregate.py
+------------------
+Golden check and timing of the two aggregate_sentiment engines:
+
+  • python – aggregate_article, one article at a time (the reference)
+  • batch  – aggregate_batch, vectorized over BATCH_SIZE articles
+
+Both run over the same articles — a sentiment file if one is given, else a
+synthetic set built to hit the scoring rules' corners: label ties,
+sentences below the confidence cut, sectors without votes, multi-sector
+sentences, inputs without `ticker_mentions` (regex fallback), compact
+`sentiment_ids` / `sentiment_conf` arrays, integer confidences and means
+that land exactly on a rounding half-way point.  Every output record must
+serialize to the same JSON; the script exits non-zero otherwise (the same
+check runs under pytest in tests/test_aggregate.py).
+
+Usage
+-----
+    python -m scripts.bench_aggregate [data/news_sentiment_10k.jsonl.gz] \
+        [--articles 20000]
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import random
+import sys
+import time
+from itertools import islice
+
+from common.records import read_records
+from scripts.aggregate_sentiment import (BATCH_SIZE, LABEL_ORDER, aggregate_article,
+                                         aggregate_batch, load_ticker_map)
+
+SECTORS = ["Technology", "Healthcare", "Finance", "Energy", "Industrials", "Other"]
+
+
+def synth_articles(n: int, t2s: dict) -> list[dict]:
+    rng = random.Random(0)
+    tickers = sorted(t2s)[:200] + ["ZZZZ", "QQQQ"]  # two without a sector
+    arts = []
+    for i in range(n):
+        n_sent = rng.choice([1, 2, 3, 4, 8, 20, 40])
+        tks = rng.sample(tickers, rng.randint(0, 4))
+        ids = [rng.choice((0, 1, 2)) for _ in range(n_sent)]
+        if rng.random() < 0.1:       # confidences on a .xx5 half-way point
+            conf = [rng.choice((60.005, 82.345, 99.995, 70.125)) for _ in ids]
+        else:
+            conf = [round(rng.uniform(35, 100), 2) for _ in ids]
+        if rng.random() < 0.02:      # integer confidences
+            conf = [int(c) for c in conf]
+        sents = [f"Headline {i} <HEADLINE>"] + [
+            f"Sentence {j} about ({rng.choice(tks)})." if tks and rng.random() < 0.5
+            else f"Sentence {j}." for j in range(1, n_sent)]
+        art = {"date": "2024-01-02", "sentences": sents, "tickers": tks,
+               "sectors": {s: rng.random() for s in rng.sample(SECTORS, rng.randint(1, 4))}}
+        if rng.random() < 0.9:
+            art["ticker_mentions"] = sorted(
+                {(rng.randrange(n_sent), rng.randrange(len(tks)))
+                 for _ in range(rng.randint(0, 6))} if tks else set())
+            art["ticker_mentions"] = [list(m) for m in art["ticker_mentions"]]
+        if rng.random() < 0.5:
+            art["sentiment_ids"], art["sentiment_conf"] = ids, conf
+        else:
+            art["sentiments"] = [{"label": LABEL_ORDER[k], "confidence": c}
+                                 for k, c in zip(ids, conf)]
+        arts.append(art)
+    return arts
+
+
+def main(path: str | None, n_articles: int) -> int:
+    t2s = load_ticker_map()
+    if path:
+        arts = list(islice(read_records(path), n_articles))
+        print(f"{len(arts):,} articles from {path}")
+    else:
+        arts = synth_articles(n_articles, t2s)
+        print(f"{len(arts):,} synthetic articles")
+
+    t0 = time.perf_counter()
+    ref = [aggregate_article(art, t2s) for art in arts]
+    t_ref = time.perf_counter() - t0
+    t0 = time.perf_counter()
+    got = [rec for i in range(0, len(arts), BATCH_SIZE)
+           for rec in aggregate_batch(arts[i:i + BATCH_SIZE], t2s)]
+    t_new = time.perf_counter() - t0
+
+    print(f"{'engine':<8}{'seconds':>9}{'art/s':>11}")
+    print(f"{'python':<8}{t_ref:>9.2f}{len(arts) / t_ref:>11.0f}")
+    print(f"{'batch':<8}{t_new:>9.2f}{len(arts) / t_new:>11.0f}")
+    print(f"speed-up: {t_ref / t_new:.1f}×")
+
+    bad = [i for i, (a, b) in enumerate(zip(ref, got)) if json.dumps(a) != json.dumps(b)]
+    for i in bad[:3]:
+        print(f"  article {i}:\n    python {json.dumps(ref[i])}\n    batch  {json.dumps(got[i])}")
+    if bad or len(ref) != len(got):
+        print(f"❌ {len(bad)} / {len(arts)} records differ")
+        return 1
+    print("✅ batch output identical to the reference")
+    return 0
+
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser()
+    ap.add_argument("input", nargs="?", default=None,
+                    help="sentiment records (default: synthetic corner cases)")
+    ap.add_argument("--articles", type=int, default=20_000)
+    args = ap.parse_args()
+    sys.exit(main(args.input, args.articles))
@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+"""
+bench_backends.py
+-----------------
+Throughput and parity check for the FinBERT CPU backends.
+
+For every backend the script reports sentences/sec and, against the fp32
+"torch" reference, the share of sentences whose label changed and the
+largest confidence drift.  Exits non-zero if any backend disagrees with
+fp32 on more than --max-disagreement of the sentences, so it doubles as
+the parity gate before switching production to a quantised backend.
+tests/test_backends.py runs the same comparison on a fixed sentence set.
+
+Usage
+-----
+    python -m models.export_onnx                      # once, for "onnx"
+    python -m scripts.bench_backends data/news_segmented_10k.jsonl.gz \
+        --articles 300 --backends torch int8 onnx
+"""
+from __future__ import annotations
+
+import argparse
+import sys
+import time
+
+import torch
+
+from models.finbert import BACKENDS, FinBERT
+from scripts.bench_batching import load_sentences
+from scripts.sentiment_inference import score_sentences
+
+
+def main(path: str, n_articles: int, backends: list[str],
+         max_disagreement: float, threads: int | None) -> int:
+    if threads:
+        torch.set_num_threads(threads)
+    sents = load_sentences(path, n_articles)
+    print(f"{len(sents):,} sentences from {n_articles:,} articles")
+
+    reference = None
+    failed = False
+    print(f"{'backend':<8}{'sent/s':>10}{'label diff':>12}{'max Δconf':>11}")
+    # fp32 always runs first: it is the parity reference
+    for name in ["torch"] + [b for b in backends if b != "torch"]:
+        model = FinBERT(device="cpu", backend=name)
+        model.predict(sents[:8])  # warm-up
+        t0 = time.perf_counter()
+        preds = score_sentences(sents, model)
+        rate = len(sents) / (time.perf_counter() - t0)
+
+        if reference is None:
+            reference = preds
+            print(f"{name:<8}{rate:>10.1f}{'—':>12}{'—':>11}")
+            continue
+        diff = sum(p["label"] != r["label"] for p, r in zip(preds, reference))
+        drift = max(abs(p["confidence"] - r["confidence"])
+                    for p, r in zip(preds, reference))
+        ratio = diff / len(sents)
+        failed |= ratio > max_disagreement
+        print(f"{name:<8}{rate:>10.1f}{ratio:>12.2%}{drift:>11.2f}")
+
+    if failed:
+        print(f"❌ label disagreement above {max_disagreement:.2%}", file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser()
+    ap.add_argument("input", help="segmented JSONL.gz with a `sentences` list")
+    ap.add_argument("--articles", type=int, default=300)
+    ap.add_argument("--backends", nargs="+", choices=BACKENDS,
+                    default=list(BACKENDS))
+    ap.add_argument("--max-disagreement", type=float, default=0.02,
+                    help="allowed share of label flips vs fp32 (default 2%%)")
+    ap.add_argument("--threads", type=int, default=None)
+    args = ap.parse_args()
+    sys.exit(main(args.input, args.articles, args.backends,
+                  args.max_disagreement, args.threads))
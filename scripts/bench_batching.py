@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+"""
+bench_batching.py
+-----------------
+Compare the fixed-size sub-batching path of `sentiment_inference.py`
+against length-bucketed, token-budget batching on CPU.
+
+Reports, per mode:
+  • sentences/sec   (tokenisation + forward pass, wall-clock)
+  • padding waste   (padded tokens that carry no text / all padded tokens)
+
+Usage
+-----
+    python -m scripts.bench_batching data/news_segmented_10k.jsonl.gz \
+        --articles 500 --max-tokens 4096
+"""
+from __future__ import annotations
+
+import argparse
+import time
+from itertools import islice
+
+import torch
+
+from common.records import read_records
+from models.batching import fixed_batches, padding_stats, token_budget_batches
+from models.finbert import FinBERT
+from scripts.sentiment_inference import SUB_BATCH_SIZE, score_sentences
+
+
+def load_sentences(path: str, n_articles: int) -> list[str]:
+    return [s for art in islice(read_records(path, columns=["sentences"]), n_articles)
+            for s in art["sentences"]]
+
+
+def bench(model: FinBERT, sents: list[str], max_tokens: int | None) -> float:
+    t0 = time.perf_counter()
+    score_sentences(sents, model, max_tokens)
+    return len(sents) / (time.perf_counter() - t0)
+
+
+def main(path: str, n_articles: int, max_tokens: int, threads: int | None):
+    if threads:
+        torch.set_num_threads(threads)
+    model = FinBERT(device="cpu")
+    sents = load_sentences(path, n_articles)
+    lengths = model.token_lengths(sents)
+    print(f"{len(sents):,} sentences from {n_articles:,} articles, "
+          f"mean length {sum(lengths) / len(lengths):.1f} tokens")
+
+    plans = {
+        f"fixed[{SUB_BATCH_SIZE}]": (fixed_batches(len(sents), SUB_BATCH_SIZE), None),
+        f"bucketed[{max_tokens} tok]": (token_budget_batches(lengths, max_tokens), max_tokens),
+    }
+    # warm-up so the first timed mode does not pay for lazy init
+    model.predict(sents[:SUB_BATCH_SIZE])
+
+    print(f"{'mode':<22}{'batches':>9}{'sent/s':>10}{'pad waste':>11}")
+    for name, (plan, budget) in plans.items():
+        padded, real = padding_stats(lengths, plan)
+        rate = bench(model, sents, budget)
+        print(f"{name:<22}{len(plan):>9}{rate:>10.1f}"
+              f"{(padded - real) / padded:>10.1%}")
+
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser()
+    ap.add_argument("input", help="segmented JSONL.gz with a `sentences` list")
+    ap.add_argument("--articles", type=int, default=500)
+    ap.add_argument("--max-tokens", type=int, default=4096)
+    ap.add_argument("--threads", type=int, default=None,
+                    help="torch intra-op threads (default: torch's choice)")
+    args = ap.parse_args()
+    main(args.input, args.articles, args.max_tokens, args.threads)
@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+"""
+bench_extract.py
+----------------
+Agreement check and throughput comparison of the ticker-extraction
+engines of `extract_tickers.py`:
+
+  • spacy     – en_core_web_sm + PhraseMatcher (the reference)
+  • aho       – Aho–Corasick automaton over spaCy tokens (the default)
+  • aho-regex – the same automaton over regex tokens
+
+Every article is run through the reference and --compare (default aho);
+articles whose ticker sets (or per-sentence mentions) differ are
+counted (a few are printed) and the script exits non-zero when there are
+more than --max-mismatch of them, so it can gate changes to the matcher.
+The committed data/company_dict.json is empty, so on it only the regex
+half is compared; tests/test_extract_engines.py checks the engines on a
+fixture with company names.
+
+With --scaling N it also prints the --n-process scaling curve, 1…N
+processes, for --engine (worker start-up excluded; 1 = in-process).
+
+Usage
+-----
+    python -m scripts.bench_extract data/news_segmented_10k.jsonl.gz \
+        [--articles 10000] [--max-mismatch 0] [--compare aho-regex]
+        [--scaling 8 --engine aho]
+"""
+from __future__ import annotations
+
+import argparse
+import sys
+import time
+from itertools import islice
+
+from common.records import read_records
+from scripts.extract_tickers import (ENGINES, extract_batch, extract_ordered,
+                                     spacy_pipeline, worker_pool)
+
+BATCH_SIZE = 200  # as in extract_tickers.run
+
+
+def timed_extract(arts: list[dict], engine: str) -> tuple[list[tuple], float]:
+    """(tickers, ticker_mentions) per article, and the elapsed seconds."""
+    arts = [{"sentences": art["sentences"]} for art in arts]
+    t0 = time.perf_counter()
+    for i in range(0, len(arts), BATCH_SIZE):
+        extract_batch(arts[i:i + BATCH_SIZE], engine)
+    return ([(art["tickers"], art["ticker_mentions"]) for art in arts],
+            time.perf_counter() - t0)
+
+
+def scaling(arts: list[dict], max_n: int, engine: str) -> None:
+    batches = [(len(b), b) for b in
+               ([{"sentences": art["sentences"]} for art in arts[i:i + BATCH_SIZE]]
+                for i in range(0, len(arts), BATCH_SIZE))]
+    print(f"{'procs':<7}{'art/s':>10}{'speed-up':>10}{'efficiency':>12}")
+    base = None
+    for n in range(1, max_n + 1):
+        if n == 1:
+            t0 = time.perf_counter()
+            for _, b in batches:
+                extract_batch(b, engine)
+            elapsed = time.perf_counter() - t0
+        else:
+            with worker_pool(n, engine) as pool:
+                pool.starmap(extract_batch, [([], engine)] * n)  # wait for start-up
+                t0 = time.perf_counter()
+                for _ in extract_ordered(pool, n, batches, engine):
+                    pass
+                elapsed = time.perf_counter() - t0
+        rate = len(arts) / elapsed
+        base = base or rate
+        print(f"{n:<7}{rate:>10.1f}{rate / base:>9.2f}×{rate / base / n:>11.0%}")
+
+
+def main(path: str, n_articles: int | None, max_mismatch: int,
+         max_n: int = 0, engine: str = "aho", compare: str = "aho") -> int:
+    arts = list(islice(read_records(path, columns=["sentences"]), n_articles))
+    print(f"{len(arts):,} articles from {path}")
+    if max_n:
+        print(f"--n-process scaling ({engine}):")
+        scaling(arts, max_n, engine)
+
+    spacy_pipeline()  # model load is not part of the timing
+    ref, t_spacy = timed_extract(arts, "spacy")
+    got, t_fast = timed_extract(arts, compare)
+
+    print(f"{'engine':<11}{'seconds':>9}{'art/s':>10}")
+    print(f"{'spacy':<11}{t_spacy:>9.2f}{len(arts) / t_spacy:>10.1f}")
+    print(f"{compare:<11}{t_fast:>9.2f}{len(arts) / t_fast:>10.1f}")
+    print(f"speed-up: {t_spacy / t_fast:.1f}×")
+
+    mismatches = [i for i, (a, b) in enumerate(zip(ref, got)) if a != b]
+    for i in mismatches[:5]:
+        print(f"  article {i}: spacy {ref[i]}  {compare} {got[i]}")
+    print(f"{len(mismatches)} / {len(arts)} articles differ")
+    if len(mismatches) > max_mismatch:
+        print(f"❌ more than {max_mismatch} mismatches")
+        return 1
+    print("✅ ticker sets match")
+    return 0
+
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser()
+    ap.add_argument("input", nargs="?", default="data/news_segmented_10k.jsonl.gz")
+    ap.add_argument("--articles", type=int, default=None,
+                    help="only the first N articles (default: all)")
+    ap.add_argument("--max-mismatch", type=int, default=0,
+                    help="tolerated articles with differing ticker sets")
+    ap.add_argument("--scaling", type=int, default=0, metavar="N",
+                    help="also print throughput for 1…N processes")
+    ap.add_argument("--engine", choices=ENGINES, default="aho",
+                    help="engine for the scaling curve")
+    ap.add_argument("--compare", choices=[e for e in ENGINES if e != "spacy"],
+                    default="aho", help="engine checked against spacy (default aho)")
+    args = ap.parse_args()
+    sys.exit(main(args.input, args.articles, args.max_mismatch, args.scaling,
+                  args.engine, args.compare))
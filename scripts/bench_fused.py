@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+"""
+bench_fused.py
+--------------
+End-to-end wall-clock and CPU time of the staged pipeline (the per-stage
+commands `make pipeline` runs, minus the network-bound `sectors` refresh)
+versus `scripts.fused_pipeline` on the same input.
+
+CPU time is the children's user+sys time from getrusage, so model threads
+and every stage process are included on both sides.  The two outputs are
+then compared record by record and the script exits non-zero on any
+difference (tests/test_fused.py holds the same on a small fixture).
+
+Usage
+-----
+    python -m scripts.bench_fused data/news_segmented_10k.jsonl.gz
+"""
+from __future__ import annotations
+
+import argparse
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from itertools import zip_longest
+from pathlib import Path
+
+from common.records import read_records
+
+
+def timed(cmds: list[list[str]]) -> tuple[float, float]:
+    before = resource.getrusage(resource.RUSAGE_CHILDREN)
+    t0 = time.perf_counter()
+    for cmd in cmds:
+        subprocess.run(cmd, check=True, stdout=subprocess.DEVNULL)
+    wall = time.perf_counter() - t0
+    after = resource.getrusage(resource.RUSAGE_CHILDREN)
+    cpu = (after.ru_utime - before.ru_utime) + (after.ru_stime - before.ru_stime)
+    return wall, cpu
+
+
+def differences(staged: str, fused: str) -> list[int]:
+    """Indexes of the records that differ (or exist on one side only)."""
+    return [i for i, (a, b) in enumerate(zip_longest(read_records(staged),
+                                                     read_records(fused)))
+            if a != b]
+
+
+def main(inp: str) -> int:
+    py = sys.executable
+    with tempfile.TemporaryDirectory() as tmp:
+        t = Path(tmp)
+        # --no-cache on both sides: measure the work, not the sentence cache
+        staged = [
+            [py, "-m", "scripts.extract_tickers", inp, str(t / "tickers.jsonl.gz")],
+            [py, "-m", "scripts.enrich_articles", str(t / "tickers.jsonl.gz"),
+             str(t / "sector.jsonl.gz")],
+            [py, "-m", "scripts.sentiment_inference", str(t / "sector.jsonl.gz"),
+             str(t / "sentiment.jsonl.gz"), "--no-cache"],
+            [py, "-m", "scripts.aggregate_sentiment", str(t / "sentiment.jsonl.gz"),
+             str(t / "final_staged.jsonl.gz")],
+        ]
+        fused = [[py, "-m", "scripts.fused_pipeline", inp,
+                  str(t / "final_fused.jsonl.gz"), "--no-cache"]]
+
+        s_wall, s_cpu = timed(staged)
+        f_wall, f_cpu = timed(fused)
+        diff = differences(str(t / "final_staged.jsonl.gz"), str(t / "final_fused.jsonl.gz"))
+
+    print(f"{'':<8}{'wall s':>9}{'CPU s':>9}")
+    print(f"{'staged':<8}{s_wall:>9.1f}{s_cpu:>9.1f}")
+    print(f"{'fused':<8}{f_wall:>9.1f}{f_cpu:>9.1f}")
+    print(f"saving: wall {1 - f_wall / s_wall:.1%}, CPU {1 - f_cpu / s_cpu:.1%}")
+    if diff:
+        print(f"❌ {len(diff)} records differ, first at index {diff[0]}")
+        return 1
+    print("✅ fused output matches the staged output")
+    return 0
+
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser()
+    ap.add_argument("input", nargs="?", default="data/news_segmented_10k.jsonl.gz")
+    args = ap.parse_args()
+    sys.exit(main(args.input))
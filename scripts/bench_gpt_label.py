@@ -0,0 +1,165 @@
+#!/usr/bin/env python3
+"""
+bench_gpt_label.py
+------------------
+Offline check and timing of gpt_label_dev.py against a local mock
+OpenAI-compatible server (POST /v1/chat/completions; no network, no key).
+
+The mock answers after --latency-ms with a deterministic label JSON and
+rejects a share of first requests with 429, so the back-off path runs.
+On --articles synthetic records the script checks
+
+  1. --concurrency 1 vs --concurrency N: same labels, written in input
+     order (two articles share a headline; both are labelled), and the
+     speed-up;
+  2. resume: an output cut off mid-line (a crash) is completed, each
+     article exactly once, requesting only the missing ones;
+  3. cache: labelling again into a new file makes no requests.
+
+Exits non-zero on any deviation; tests/test_gpt_label.py runs the same
+checks on a small scale.
+
+Usage
+-----
+    python -m scripts.bench_gpt_label [--articles 200] [--concurrency 16] \
+        [--latency-ms 200]
+"""
+from __future__ import annotations
+
+import argparse
+import hashlib
+import json
+import random
+import sys
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+from common.records import JsonlWriter, read_records
+from scripts import gpt_label_dev
+
+LABELS = ("NEG", "NEU", "POS")
+
+
+def mock_server(latency: float, fail_share: float, fail_status: int = 429):
+    """
+    (server, stats) of an OpenAI-compatible chat-completions mock that
+    answers a *fail_share* of first requests per prompt with *fail_status*.
+    """
+    stats = {"requests": 0}
+    seen = set()
+    lock = threading.Lock()
+    rng = random.Random(1)
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_POST(self):
+            req = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+            prompt = req["messages"][-1]["content"]
+            time.sleep(latency)
+            with lock:
+                stats["requests"] += 1
+                fail = prompt not in seen and rng.random() < fail_share
+                seen.add(prompt)
+            if fail:
+                return self.reply(fail_status, {"error": {"message": "mock failure"}})
+            headline = prompt.split("\n", 1)[0].removeprefix("HEADLINE: ")
+            h = hashlib.sha256(prompt.encode()).digest()
+            content = json.dumps({
+                "date": None, "published": None, "headline_summary": headline,
+                "overall": {"label": LABELS[h[0] % 3], "confidence": 50 + h[1] % 50},
+                "tickers": [], "sectors_summary": {}})
+            self.reply(200, {
+                "id": "chatcmpl-mock", "object": "chat.completion", "created": 0,
+                "model": req["model"],
+                "choices": [{"index": 0, "finish_reason": "stop",
+                             "message": {"role": "assistant", "content": content}}]})
+
+        def reply(self, code: int, obj: dict):
+            body = json.dumps(obj).encode()
+            self.send_response(code)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, stats
+
+
+def labels(path: Path) -> dict:
+    return {r["id"]: r["overall"] for r in read_records(path)}
+
+
+def main(n_articles: int, concurrency: int, latency_ms: float) -> int:
+    server, stats = mock_server(latency_ms / 1000, fail_share=0.05)
+    base_url = f"http://127.0.0.1:{server.server_port}/v1"
+    ok = True
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp = Path(tmp)
+        inp = tmp / "dev_sample.jsonl"
+        with JsonlWriter(inp) as fout:
+            for i in range(n_articles):
+                head = f"Headline {i % (n_articles - 1)}"   # last repeats the first
+                fout.write({"headline": head,
+                            "sentences": [f"{head} <HEADLINE>", f"Body of article {i}."],
+                            "date": "2024-01-02"})
+        order = [gpt_label_dev.article_id(r) for r in read_records(inp)]
+
+        def run(out, conc, cache=None):
+            before = stats["requests"]
+            t0 = time.perf_counter()
+            rc = gpt_label_dev.main(inp, out, concurrency=conc, base_url=base_url,
+                                    cache_path=cache and str(tmp / cache))
+            return rc, time.perf_counter() - t0, stats["requests"] - before
+
+        rc1, t_seq, _ = run(tmp / "seq.jsonl", 1)
+        rc2, t_par, _ = run(tmp / "par.jsonl", concurrency, "labels.db")
+        ref = labels(tmp / "seq.jsonl")
+        if rc1 or rc2 or len(ref) != n_articles or labels(tmp / "par.jsonl") != ref:
+            print("❌ sequential and concurrent labels differ")
+            ok = False
+        if list(labels(tmp / "par.jsonl")) != order:
+            print("❌ concurrent output is not in input order")
+            ok = False
+
+        # crash mid-write: keep 40 % of the lines and half of the next one
+        lines = (tmp / "par.jsonl").read_bytes().splitlines(keepends=True)
+        keep = int(len(lines) * 0.4)
+        (tmp / "resumed.jsonl").write_bytes(b"".join(lines[:keep]) + lines[keep][:20])
+        rc3, t_res, n_res = run(tmp / "resumed.jsonl", concurrency)
+        ids = [r["id"] for r in read_records(tmp / "resumed.jsonl")]
+        if rc3 or ids != order:
+            print("❌ resumed output is incomplete or has duplicates")
+            ok = False
+        if n_res < n_articles - keep or n_res > (n_articles - keep) * 1.5:
+            print(f"❌ resume sent {n_res} requests for {n_articles - keep} articles")
+            ok = False
+
+        rc4, t_warm, n_warm = run(tmp / "warm.jsonl", concurrency, "labels.db")
+        if rc4 or n_warm or labels(tmp / "warm.jsonl") != ref:
+            print(f"❌ warm-cache run sent {n_warm} requests")
+            ok = False
+    server.shutdown()
+
+    print(f"\n{n_articles} articles, {latency_ms:.0f} ms per request")
+    print(f"{'concurrency 1':<24}{t_seq:>8.2f} s")
+    print(f"{f'concurrency {concurrency}':<24}{t_par:>8.2f} s  ({t_seq / t_par:.1f}× faster)")
+    print(f"{f'resume ({n_articles - keep} left)':<24}{t_res:>8.2f} s  {n_res} requests")
+    print(f"{'warm cache':<24}{t_warm:>8.2f} s  {n_warm} requests")
+    print("✅ labeller matches the mock" if ok else "❌ labeller check failed")
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--articles", type=int, default=200)
+    ap.add_argument("--concurrency", type=int, default=16)
+    ap.add_argument("--latency-ms", type=float, default=200)
+    args = ap.parse_args()
+    sys.exit(main(args.articles, args.concurrency, args.latency_ms))
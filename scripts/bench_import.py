@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+"""
+bench_import.py
+---------------
+Import-time report and start-up budget for the pipeline modules.
+
+Each module is imported in a fresh interpreter under `python -X importtime`
+(best of --repeat runs).  The report gives its cumulative import time and
+the slowest imports it pulls in (by self time), so a module that starts
+loading a model or data file at import shows up immediately.
+
+Heavy resources are meant to load on first use (common.resources), so no
+module here should take more than --budget-ms to import; the script exits
+non-zero when one does.  Modules that import torch at the top
+(sentiment_inference, models.finbert) are not listed: torch alone is over
+any sensible budget and is needed the moment they run; the same goes for
+spaCy in nlp.ticker_component, which must register its factory on import.
+
+Usage
+-----
+    python -m scripts.bench_import [--budget-ms 300] [--repeat 3] [--top 3]
+"""
+from __future__ import annotations
+
+import argparse
+import subprocess
+import sys
+
+MODULES = [
+    "common.records",
+    "common.blockgz",
+    "common.checkpoint",
+    "common.incremental",
+    "common.resources",
+    "common.sectionfile",
+    "common.refdata",
+    "common.rollup",
+    "common.postings",
+    "common.stages",
+    "nlp.ticker_matcher",
+    "nlp.sentence_splitter",
+    "nlp.ticker_extractor",
+    "scripts.segment",
+    "scripts.extract_tickers",
+    "scripts.enrich_articles",
+    "scripts.aggregate_sentiment",
+    "scripts.gpt_label_dev",
+]
+BUDGET_MS = 300
+
+
+def import_profile(module: str) -> dict[str, tuple[int, int]]:
+    """{imported name: (self µs, cumulative µs)} for `import module`."""
+    proc = subprocess.run([sys.executable, "-X", "importtime", "-c", f"import {module}"],
+                          capture_output=True, text=True)
+    if proc.returncode:
+        raise ImportError(proc.stderr.strip().splitlines()[-1])
+    prof = {}
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cum_us, name = line[len("import time:"):].split("|")
+        prof[name.strip()] = (int(self_us), int(cum_us))
+    return prof
+
+
+def main(modules: list[str], budget_ms: float, repeat: int, top: int) -> int:
+    over = []
+    print(f"{'module':<30}{'import ms':>10}  slowest imports (self ms)")
+    for mod in modules:
+        try:
+            runs = [import_profile(mod) for _ in range(repeat)]
+        except ImportError as e:
+            print(f"{mod:<30}{'error':>10}  {e}")
+            over.append(mod)
+            continue
+        prof = min(runs, key=lambda p: p[mod][1])
+        total = prof[mod][1] / 1000
+        slowest = sorted(prof.items(), key=lambda kv: -kv[1][0])[:top]
+        print(f"{mod:<30}{total:>10.1f}  "
+              + ", ".join(f"{n} {s / 1000:.1f}" for n, (s, _) in slowest))
+        if total > budget_ms:
+            over.append(mod)
+
+    if over:
+        print(f"❌ over the {budget_ms:.0f} ms import budget: {', '.join(over)}")
+        return 1
+    print(f"✅ all {len(modules)} modules import in under {budget_ms:.0f} ms")
+    return 0
+
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser()
+    ap.add_argument("modules", nargs="*", default=MODULES)
+    ap.add_argument("--budget-ms", type=float, default=BUDGET_MS)
+    ap.add_argument("--repeat", type=int, default=3)
+    ap.add_argument("--top", type=int, default=3,
+                    help="slowest dependencies listed per module")
+    args = ap.parse_args()
+    sys.exit(main(args.modules, args.budget_ms, args.repeat, args.top))
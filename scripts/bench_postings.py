@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+"""
+bench_postings.py
+-----------------
+Correctness and timing of the postings index (common.postings) on
+synthetic final-schema records, written both as block-gzip and as plain
+JSONL.
+
+For --queries random combinations of ticker, sector, label, date range
+and minimum confidence, ArticleIndex.query() must return exactly the
+records a full decompress-and-parse scan selects, in file order.  The
+script then times the indexed query against the scan for a selective
+query ("NEG, NVDA, one quarter, confidence ≥ 80") and a broad one
+(one sector, one month).
+
+Exits non-zero on any deviation.
+
+Usage
+-----
+    python -m scripts.bench_postings [--articles 100000] [--queries 100]
+"""
+from __future__ import annotations
+
+import argparse
+import datetime as dt
+import random
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from common.postings import ArticleIndex, build
+from common.records import JsonlWriter, read_records
+from scripts.bench_rollup import SECTORS, synth_records
+
+LABELS = ("NEG", "NEU", "POS")
+DAY0 = dt.date(2024, 1, 1)  # first day of synth_records
+
+
+def matches(rec: dict, q: dict) -> bool:
+    """The scan-side reading of a query (see common.postings)."""
+    date = (rec.get("date") or "")[:10]
+    return ((q.get("ticker") is None or q["ticker"] in rec["tickers"])
+            and (q.get("sector") is None or q["sector"] in rec["sectors_summary"])
+            and (q.get("label") is None or rec["overall"]["label"] == q["label"])
+            and (q.get("start") is None or (date and date >= q["start"]))
+            and (q.get("end") is None or (date and date <= q["end"]))
+            and (q.get("min_conf") is None or rec["overall"]["confidence"] >= q["min_conf"]))
+
+
+def scan(path: Path, q: dict) -> list[dict]:
+    return [r for r in read_records(path) if matches(r, q)]
+
+
+def random_query(rng: random.Random) -> dict:
+    q = {}
+    if rng.random() < 0.6:
+        q["ticker"] = rng.choice(["AAPL", "NVDA", "T001", "T150", "NONE"])
+    if rng.random() < 0.3:
+        q["sector"] = rng.choice(SECTORS)
+    if rng.random() < 0.5:
+        q["label"] = rng.choice(LABELS)
+    if rng.random() < 0.6:
+        a, b = sorted(rng.sample(range(365), 2))
+        q["start"] = (DAY0 + dt.timedelta(days=a)).isoformat()
+        q["end"] = (DAY0 + dt.timedelta(days=b)).isoformat()
+        if rng.random() < 0.2:
+            del q[rng.choice(["start", "end"])]
+    if rng.random() < 0.4:
+        q["min_conf"] = rng.choice([50, 80, 90.5])
+    return q
+
+
+def main(n_articles: int, n_queries: int) -> int:
+    recs = synth_records(n_articles, 365)
+    rng = random.Random(2)
+    queries = [random_query(rng) for _ in range(n_queries)]
+    wanted = [[r["id"] for r in recs if matches(r, q)] for q in queries]
+    ok = True
+    with tempfile.TemporaryDirectory() as tmp:
+        paths = [Path(tmp) / "news_final.jsonl.gz", Path(tmp) / "news_final.jsonl"]
+        for path in paths:
+            with JsonlWriter(path) as fout:
+                for r in recs:
+                    fout.write(r)
+            t0 = time.perf_counter()
+            build(path)
+            print(f"{path.name:<22} indexed in {time.perf_counter() - t0:.2f} s")
+
+            with ArticleIndex(path) as idx:
+                for q, want in zip(queries, wanted):
+                    got = [r["id"] for r in idx.query(**q)]
+                    if got != want:
+                        print(f"❌ {path.name} {q}: {len(got)} vs {len(want)} records")
+                        ok = False
+                        break
+
+        gz = paths[0]
+        timed = [("selective", {"ticker": "NVDA", "label": "NEG", "start": "2024-01-01",
+                                "end": "2024-03-31", "min_conf": 80}),
+                 ("broad", {"sector": "Energy", "start": "2024-06-01", "end": "2024-06-30"})]
+        print(f"\n{n_articles:,} articles")
+        print(f"{'query':<12}{'matches':>8}{'index ms':>10}{'scan ms':>10}{'speed-up':>10}")
+        with ArticleIndex(gz) as idx:
+            for name, q in timed:
+                t0 = time.perf_counter()
+                hits = idx.query(**q)
+                t_idx = time.perf_counter() - t0
+                t0 = time.perf_counter()
+                ref = scan(gz, q)
+                t_scan = time.perf_counter() - t0
+                if [r["id"] for r in hits] != [r["id"] for r in ref]:
+                    print(f"❌ {name}: index and scan disagree")
+                    ok = False
+                print(f"{name:<12}{len(hits):>8}"
+                      f"{t_idx * 1000:>10.1f}{t_scan * 1000:>10.0f}{t_scan / t_idx:>9.0f}×")
+
+    print(f"✅ {n_queries} random queries match the scan" if ok
+          else "❌ postings check failed")
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--articles", type=int, default=100_000)
+    ap.add_argument("--queries", type=int, default=100)
+    args = ap.parse_args()
+    sys.exit(main(args.articles, args.queries))
@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+"""
+bench_records.py
+----------------
+Micro-benchmark of common.records: write and read throughput (MB/s of
+uncompressed JSON) for every available codec × compression combination,
+plus the legacy `gzip.open` + `json.dumps` path at level 9 for reference.
+
+Articles are synthetic (or the first --articles of a real file), so the
+numbers are comparable across machines.
+
+Usage
+-----
+    python -m scripts.bench_records
+    python -m scripts.bench_records --input data/news_sentiment_10k.jsonl.gz
+"""
+from __future__ import annotations
+
+import argparse
+import gzip
+import json
+import os
+import random
+import tempfile
+import time
+from itertools import islice
+from pathlib import Path
+
+from common.records import get_codec, open_writer, read_records
+
+WORDS = ("shares rose fell percent quarter revenue guidance analyst "
+         "earnings company said market investors stock").split()
+
+
+def synthetic(n: int, seed: int = 0) -> list[dict]:
+    rnd = random.Random(seed)
+    sent = lambda: " ".join(rnd.choices(WORDS, k=rnd.randint(8, 30))) + "."
+    return [{
+        "date": f"2023-{rnd.randint(1, 12):02d}-{rnd.randint(1, 28):02d}",
+        "headline": sent(),
+        "sentences": [sent() for _ in range(rnd.randint(5, 40))],
+        "tickers": rnd.sample(["AAPL", "MSFT", "NVDA", "JPM", "XOM"], 2),
+        "sectors": {"Information Technology": 0.5, "Financials": 0.5},
+        "sentiments": [{"label": rnd.choice(["NEG", "NEU", "POS"]),
+                        "confidence": round(rnd.uniform(40, 99), 2)}
+                       for _ in range(5)],
+    } for _ in range(n)]
+
+
+def legacy(recs, path):
+    t0 = time.perf_counter()
+    with gzip.open(path, "wt", encoding="utf-8") as f:
+        for r in recs:
+            f.write(json.dumps(r, ensure_ascii=False) + "\n")
+    w = time.perf_counter() - t0
+    t0 = time.perf_counter()
+    with gzip.open(path, "rt", encoding="utf-8") as f:
+        for line in f:
+            json.loads(line)
+    return w, time.perf_counter() - t0
+
+
+def current(recs, path, codec, level):
+    t0 = time.perf_counter()
+    with open_writer(path, codec=codec, level=level) as w:
+        for r in recs:
+            w.write(r)
+    w = time.perf_counter() - t0
+    t0 = time.perf_counter()
+    for _ in read_records(path, codec=codec):
+        pass
+    return w, time.perf_counter() - t0
+
+
+def main(n: int, input_path: str | None) -> None:
+    recs = (list(islice(read_records(input_path), n)) if input_path
+            else synthetic(n))
+    mb = sum(len(json.dumps(r, ensure_ascii=False).encode()) + 1 for r in recs) / 1e6
+    print(f"{len(recs):,} records, {mb:.1f} MB of JSON")
+
+    codecs = []
+    for name in ("json", "orjson", "msgspec"):
+        try:
+            get_codec(name)
+            codecs.append(name)
+        except ImportError:
+            print(f"  (skipping {name}: not installed)")
+    comps = [(".jsonl", None), (".jsonl.gz", 1), (".jsonl.gz", 3), (".jsonl.gz", 6)]
+    try:
+        import zstandard  # noqa: F401
+        comps += [(".jsonl.zst", 1), (".jsonl.zst", 3)]
+    except ImportError:
+        print("  (skipping zstd: zstandard not installed)")
+
+    print(f"{'codec':<9}{'format':<14}{'write MB/s':>11}{'read MB/s':>11}{'size MB':>9}")
+    with tempfile.TemporaryDirectory() as tmp:
+        p = Path(tmp) / "legacy.jsonl.gz"
+        w, r = legacy(recs, p)
+        print(f"{'legacy':<9}{'gzip-9':<14}{mb / w:>11.1f}{mb / r:>11.1f}"
+              f"{os.path.getsize(p) / 1e6:>9.2f}")
+        for codec in codecs:
+            for suffix, level in comps:
+                p = Path(tmp) / f"x{suffix}"
+                w, r = current(recs, p, codec, level)
+                fmt = suffix.split(".")[-1] + (f"-{level}" if level else "")
+                print(f"{codec:<9}{fmt:<14}{mb / w:>11.1f}{mb / r:>11.1f}"
+                      f"{os.path.getsize(p) / 1e6:>9.2f}")
+
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--articles", type=int, default=20_000)
+    ap.add_argument("--input", default=None,
+                    help="benchmark on real records instead of synthetic ones")
+    args = ap.parse_args()
+    main(args.articles, args.input)
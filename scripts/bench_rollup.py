@@ -0,0 +1,176 @@
+#!/usr/bin/env python3
+"""
+bench_rollup.py
+---------------
+Correctness and timing of the daily sentiment index (common.rollup) on
+synthetic final-schema records spread over --days days.
+
+  1. one ingest of the whole history vs. one ingest per day (shuffled
+     within the day) — the `daily` tables must be identical;
+  2. ingesting the full file again must add nothing;
+  3. series() / summary() for sample tickers and sectors must equal a
+     brute-force scan of the records;
+  4. timing: a 90-day range query vs. rescanning the .jsonl.gz output.
+
+Exits non-zero on any deviation.
+
+Usage
+-----
+    python -m scripts.bench_rollup [--articles 50000] [--days 365]
+"""
+from __future__ import annotations
+
+import argparse
+import datetime as dt
+import random
+import sys
+import tempfile
+import time
+from collections import defaultdict
+from pathlib import Path
+
+from common.records import JsonlWriter, read_records
+from common.rollup import LABELS, SIGN, SentimentIndex
+
+SECTORS = ["Technology", "Healthcare", "Financial Services", "Energy", "Industrials"]
+
+
+def synth_records(n: int, days: int) -> list[dict]:
+    rng = random.Random(0)
+    tickers = [f"T{i:03d}" for i in range(300)] + ["AAPL", "NVDA"]
+    day0 = dt.date(2024, 1, 1)
+    recs = []
+    for i in range(n):
+        date = (day0 + dt.timedelta(days=rng.randrange(days))).isoformat()
+        secs = rng.sample(SECTORS, rng.randint(0, 3))
+        ws = [rng.random() for _ in secs]
+        recs.append({
+            "id": f"{i:032x}",
+            "date": date if rng.random() > 0.01 else None,
+            "headline_summary": f"Headline {i}",
+            "overall": {"label": rng.choice(LABELS),
+                        "confidence": round(rng.uniform(35, 100), 2)},
+            "tickers": rng.sample(tickers, rng.randint(0, 3)),
+            "sectors_summary": {s: {"weight": round(w / sum(ws), 4),
+                                    "label": rng.choice(LABELS),
+                                    "confidence": round(rng.uniform(35, 100), 2)}
+                                for s, w in zip(secs, ws)},
+        })
+    return recs
+
+
+def brute_force(recs, kind: str, key: str, start: str, end: str) -> dict:
+    """Range totals by scanning *recs* — the reference for summary()."""
+    counts = defaultdict(int)
+    conf = defaultdict(float)
+    articles = 0
+    weight = score = 0.0
+    for r in recs:
+        if not r.get("date") or not start <= r["date"][:10] <= end:
+            continue
+        if kind == "ticker":
+            if key not in r["tickers"]:
+                continue
+            lbl, c, w = r["overall"]["label"], r["overall"]["confidence"], 1.0
+        else:
+            if key not in r["sectors_summary"]:
+                continue
+            s = r["sectors_summary"][key]
+            lbl, c, w = s["label"], s["confidence"], s["weight"]
+        articles += 1
+        counts[lbl] += 1
+        conf[lbl] += c
+        weight += w
+        score += w * SIGN[lbl] * c / 100
+    return {"articles": articles, "counts": {l: counts[l] for l in LABELS},
+            "confidence": {l: round(conf[l] / counts[l], 2) if counts[l] else None
+                           for l in LABELS},
+            "net": round(score / weight, 4) if weight else None}
+
+
+def dump(path: Path) -> list:
+    with SentimentIndex(str(path), readonly=True) as idx:
+        return idx.db.execute("SELECT * FROM daily ORDER BY kind, key, date").fetchall()
+
+
+def main(n_articles: int, n_days: int) -> int:
+    recs = synth_records(n_articles, n_days)
+    ok = True
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp = Path(tmp)
+        final = tmp / "news_final.jsonl.gz"
+        with JsonlWriter(final) as fout:
+            for r in recs:
+                fout.write(r)
+
+        t0 = time.perf_counter()
+        with SentimentIndex(str(tmp / "full.db")) as idx:
+            added, _ = idx.ingest(read_records(final))
+        t_full = time.perf_counter() - t0
+
+        by_day = defaultdict(list)
+        for r in recs:
+            by_day[r["date"] or ""].append(r)
+        rng = random.Random(1)
+        t0 = time.perf_counter()
+        for day in sorted(by_day):
+            rng.shuffle(by_day[day])
+            with SentimentIndex(str(tmp / "daily.db")) as idx:
+                idx.ingest(by_day[day])
+        t_daily = (time.perf_counter() - t0) / len(by_day)
+        if dump(tmp / "full.db") != dump(tmp / "daily.db"):
+            print("❌ day-by-day index differs from the one-pass index")
+            ok = False
+
+        with SentimentIndex(str(tmp / "daily.db")) as idx:
+            again, skipped = idx.ingest(read_records(final))
+        if again or skipped != n_articles or added != n_articles:
+            print(f"❌ re-ingest added {again} articles")
+            ok = False
+
+        with SentimentIndex(str(tmp / "full.db"), readonly=True) as idx:
+            start, end = idx.resolve_range(days=90)
+            cases = [("ticker", "AAPL"), ("ticker", "T007"), ("ticker", "NONE"),
+                     ("sector", "Technology"), ("sector", "Energy")]
+            for kind, key in cases:
+                want = brute_force(recs, kind, key, start, end)
+                got = idx.summary(kind, key, start, end)
+                got = {k: got[k] for k in want}
+                days = idx.series(kind, key, start, end)
+                if got != want or sum(d["articles"] for d in days) != want["articles"]:
+                    print(f"❌ {kind} {key}: index {got} vs scan {want}")
+                    ok = False
+
+            t0 = time.perf_counter()
+            reps = 200
+            for i in range(reps):
+                kind, key = cases[i % len(cases)]
+                idx.series(kind, key, start, end)
+                idx.summary(kind, key, start, end)
+            t_query = (time.perf_counter() - t0) / reps
+            t0 = time.perf_counter()
+            idx.top("ticker", start, end)
+            t_top = time.perf_counter() - t0
+
+        t0 = time.perf_counter()
+        scanned = list(read_records(final))
+        brute_force(scanned, "ticker", "AAPL", start, end)
+        t_scan = time.perf_counter() - t0
+
+    print(f"{n_articles:,} articles over {n_days} days, range {start} – {end}")
+    print(f"{'ingest, one pass':<26}{t_full:>9.3f} s")
+    print(f"{'ingest, one day':<26}{t_daily * 1000:>9.1f} ms (mean)")
+    print(f"{'series + summary':<26}{t_query * 1000:>9.2f} ms")
+    print(f"{'top tickers':<26}{t_top * 1000:>9.2f} ms")
+    print(f"{'rescan of the output':<26}{t_scan * 1000:>9.0f} ms "
+          f"({t_scan / t_query:,.0f}× slower)")
+    print("✅ index matches the records" if ok else "❌ rollup check failed")
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--articles", type=int, default=50_000)
+    ap.add_argument("--days", type=int, default=365)
+    args = ap.parse_args()
+    sys.exit(main(args.articles, args.days))
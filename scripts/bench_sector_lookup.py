@@ -0,0 +1,180 @@
+#!/usr/bin/env python3
+"""
+bench_sector_lookup.py
+----------------------
+Offline check and timing of the sector resolver in build_ticker2sector.py
+against a local stand-in HTTP server (no network).
+
+The server answers the `json` provider (GET /<T> → {"sector": ...}, 404 for
+unknown tickers), the `wikipedia` provider (an infobox page under
+/wiki/<T>_(ticker_symbol)) and the `yfinance` provider's quoteSummary
+endpoint after --latency-ms, and fails a share of first requests with 503.
+The script resolves --tickers symbols
+
+  1. sequentially (1 worker, no cache) and concurrently (--workers) —
+     both must give the expected mapping except for tickers that hit an
+     injected error, which must come back on the retry run;
+  2. again with the warm cache — must make no requests at all;
+  3. with every entry expired — must refetch everything.
+
+Exits non-zero on any deviation; tests/test_sector_resolver.py runs the
+same checks on a small scale.
+
+Usage
+-----
+    python -m scripts.bench_sector_lookup [--tickers 400] [--workers 32] \
+        [--latency-ms 100]
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import random
+import sys
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from urllib.parse import unquote
+
+from common.kvcache import KVCache
+from scripts.build_ticker2sector import (JsonProvider, SectorResolver,
+                                         WikipediaProvider)
+
+SECTORS = ["Technology", "Healthcare", "Financial Services", "Energy", "Industrials"]
+QUOTE_SUMMARY = "/v10/finance/quoteSummary/"
+
+
+def stand_in_server(truth: dict, wiki: dict, latency: float, fail_share: float,
+                    yahoo: dict | None = None):
+    """(server, request counter) serving *truth* (json), *wiki* (html), *yahoo*."""
+    stats = {"requests": 0}
+    failed = set()
+    lock = threading.Lock()
+    rng = random.Random(1)
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            time.sleep(latency)
+            with lock:
+                stats["requests"] += 1
+                fail = self.path not in failed and rng.random() < fail_share
+                if fail:
+                    failed.add(self.path)
+            if fail:
+                return self.send_error(503)
+            path = unquote(self.path.split("?", 1)[0])
+            if path.startswith(QUOTE_SUMMARY):
+                tk = path[len(QUOTE_SUMMARY):]
+                if tk not in (yahoo or {}):
+                    return self.send_error(404)
+                body = json.dumps({"quoteSummary": {"result": [
+                    {"assetProfile": {"sector": yahoo[tk]}}], "error": None}}).encode()
+                ctype = "application/json"
+            elif path.startswith("/wiki/"):
+                tk = path[len("/wiki/"):].removesuffix("_(ticker_symbol)")
+                if tk not in wiki:
+                    return self.send_error(404)
+                body = (f"<table class='infobox'><tr><td>Sector: {wiki[tk]}"
+                        "</td></tr></table>").encode()
+                ctype = "text/html"
+            else:
+                tk = path.lstrip("/")
+                if tk not in truth:
+                    return self.send_error(404)
+                body = json.dumps({"sector": truth[tk]}).encode()
+                ctype = "application/json"
+            self.send_response(200)
+            self.send_header("Content-Type", ctype)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, stats
+
+
+def main(n_tickers: int, workers: int, latency_ms: float) -> int:
+    rng = random.Random(0)
+    tickers = [f"T{i:04d}" for i in range(n_tickers)]
+    truth = {t: rng.choice(SECTORS) for t in tickers if rng.random() < 0.8}
+    wiki = {t: rng.choice(SECTORS) for t in tickers if t not in truth and rng.random() < 0.5}
+    expected = {t: truth.get(t) or wiki.get(t) for t in tickers}
+    server, stats = stand_in_server(truth, wiki, latency_ms / 1000, fail_share=0.02)
+    base = f"http://127.0.0.1:{server.server_port}"
+    try:
+        import bs4  # noqa: F401
+        providers = [JsonProvider(base), WikipediaProvider(base + "/wiki")]
+    except ImportError:  # wikipedia provider needs BeautifulSoup
+        providers = [JsonProvider(base)]
+        expected = {t: truth.get(t) for t in tickers}
+    rates = {p.name: 0 for p in providers}  # no rate limit against localhost
+
+    ok = True
+    with tempfile.TemporaryDirectory() as tmp:
+        def run(n_workers, cache_name, refresh=False):
+            cache = KVCache(str(Path(tmp) / cache_name))
+            res = SectorResolver(providers, cache, n_workers, rates=rates)
+            before = stats["requests"]
+            t0 = time.perf_counter()
+            got = res.resolve(tickers, refresh=refresh, progress=False)
+            elapsed = time.perf_counter() - t0
+            cache.close()
+            return got, elapsed, stats["requests"] - before, res.errors
+
+        def check(label, got, errors):
+            nonlocal ok
+            wrong = [t for t in tickers if got[t] != expected[t]]
+            if len(wrong) > errors:
+                print(f"❌ {label}: {len(wrong)} wrong sectors, e.g. {wrong[:3]}")
+                ok = False
+
+        print(f"{n_tickers} tickers, {latency_ms:.0f} ms per request, "
+              f"providers: {', '.join(p.name for p in providers)}")
+        got, t_seq, n_seq, err = run(1, "seq.db")
+        check("sequential", got, err)
+        print(f"{'sequential':<22}{t_seq:>8.2f} s {n_seq:>6} requests")
+
+        got, t_par, n_par, err = run(workers, "par.db")
+        check(f"{workers} workers", got, err)
+        print(f"{f'{workers} workers':<22}{t_par:>8.2f} s {n_par:>6} requests "
+              f"({t_seq / t_par:.1f}× faster)")
+
+        got, t_retry, n_retry, err = run(workers, "par.db")
+        check("retry run", got, 0)
+        print(f"{'retry (errors only)':<22}{t_retry:>8.2f} s {n_retry:>6} requests")
+
+        got, t_warm, n_warm, _ = run(workers, "par.db")
+        check("warm cache", got, 0)
+        print(f"{'warm cache':<22}{t_warm:>8.2f} s {n_warm:>6} requests")
+        if n_warm:
+            print("❌ warm-cache run made requests")
+            ok = False
+
+        db = KVCache(str(Path(tmp) / "par.db"))
+        db.db.execute("UPDATE entries SET expires = 0")
+        db.close()
+        got, t_exp, n_exp, err = run(workers, "par.db")
+        check("expired cache", got, err)
+        print(f"{'expired cache':<22}{t_exp:>8.2f} s {n_exp:>6} requests")
+        if n_exp < n_tickers:
+            print("❌ expired entries were not refetched")
+            ok = False
+    server.shutdown()
+
+    print("✅ resolver matches the stand-in data" if ok else "❌ resolver check failed")
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--tickers", type=int, default=400)
+    ap.add_argument("--workers", type=int, default=32)
+    ap.add_argument("--latency-ms", type=float, default=100)
+    args = ap.parse_args()
+    sys.exit(main(args.tickers, args.workers, args.latency_ms))
@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+"""
+bench_segment.py
+----------------
+Throughput of `segment.py` on a synthetic raw corpus (headline / body /
+date records: mostly clean ASCII, some with HTML entities, curly quotes,
+non-breaking spaces and ragged whitespace).
+
+  1. `tidy` against the previous always-unescape-and-normalize version,
+     on every headline, body and sentence of the corpus; the results must
+     be identical.
+  2. `segment_file` with --n-process 1…N (worker start-up included, as
+     in a real run); every output must equal the single-process one.
+
+Exits non-zero on any difference.
+
+Usage
+-----
+    python -m scripts.bench_segment [--articles 20000] [--n-process 4]
+"""
+from __future__ import annotations
+
+import argparse
+import html
+import json
+import random
+import re
+import sys
+import tempfile
+import time
+import unicodedata
+from pathlib import Path
+
+from common.records import JsonlWriter, read_lines
+from nlp.sentence_splitter import punkt_split
+from scripts.segment import segment_file, tidy
+
+WORDS = ("the company said revenue rose percent in the quarter while analysts "
+         "expected shares to fall after guidance was cut by management on "
+         "Tuesday and investors sold stock").split()
+NOISE = ["&amp;", "&#39;", "&quot;", "’", "“", " ", "–", "ﬁ", "  \n\t"]
+
+
+def tidy_reference(txt: str) -> str:
+    """tidy() before the ASCII fast path."""
+    txt = html.unescape(txt)
+    txt = re.sub(r'\s+', ' ', txt)
+    return unicodedata.normalize('NFKC', txt).strip()
+
+
+def synth_text(rng: random.Random, n_words: int, dirty: bool) -> str:
+    out = []
+    for i in range(n_words):
+        out.append(rng.choice(WORDS).capitalize() if i == 0 or out[-1].endswith(".")
+                   else rng.choice(WORDS))
+        if rng.random() < 0.08:
+            out[-1] += "."
+        if dirty and rng.random() < 0.05:
+            out.append(rng.choice(NOISE))
+    return " ".join(out) + "."
+
+
+def synth_corpus(path: Path, n: int, dirty_share: float = 0.2) -> None:
+    rng = random.Random(0)
+    with JsonlWriter(path) as fout:
+        for i in range(n):
+            dirty = rng.random() < dirty_share
+            fout.write({"headline": synth_text(rng, 10, dirty),
+                        "body": synth_text(rng, rng.randint(80, 600), dirty),
+                        "date": f"2024-01-{i % 28 + 1:02d}"})
+
+
+def bench_tidy(texts: list[str]) -> bool:
+    t0 = time.perf_counter()
+    ref = [tidy_reference(t) for t in texts]
+    t_ref = time.perf_counter() - t0
+    t0 = time.perf_counter()
+    got = [tidy(t) for t in texts]
+    t_new = time.perf_counter() - t0
+    print(f"tidy on {len(texts):,} strings: {t_ref:.2f} s → {t_new:.2f} s "
+          f"({t_ref / t_new:.1f}×)")
+    bad = [i for i, (a, b) in enumerate(zip(ref, got)) if a != b]
+    for i in bad[:3]:
+        print(f"  {texts[i][:60]!r}: {ref[i][:60]!r} vs {got[i][:60]!r}")
+    return not bad
+
+
+def main(n_articles: int, max_n: int) -> int:
+    with tempfile.TemporaryDirectory() as tmp:
+        raw = Path(tmp) / "raw.jsonl.gz"
+        synth_corpus(raw, n_articles)
+        print(f"{n_articles:,} synthetic raw articles")
+
+        # every string tidy() sees in a real run
+        texts = []
+        for line in read_lines(raw):
+            art = json.loads(line)
+            texts += [art["headline"], art["body"]]
+            texts += punkt_split(tidy_reference(art["body"]))
+        ok = bench_tidy(texts)
+
+        print(f"{'procs':<7}{'art/s':>10}{'speed-up':>10}")
+        ref = base = None
+        for n in range(1, max_n + 1):
+            out = Path(tmp) / f"seg_{n}.jsonl.gz"
+            t0 = time.perf_counter()
+            segment_file(raw, out, n_process=n)
+            rate = n_articles / (time.perf_counter() - t0)
+            base = base or rate
+            print(f"{n:<7}{rate:>10.1f}{rate / base:>9.2f}×")
+            lines = list(read_lines(out))
+            if ref is None:
+                ref = lines
+            elif lines != ref:
+                print(f"❌ --n-process {n} output differs from --n-process 1")
+                ok = False
+
+    print("✅ identical output" if ok else "❌ output differs")
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--articles", type=int, default=20_000)
+    ap.add_argument("--n-process", type=int, default=4,
+                    help="largest process count in the scaling run")
+    args = ap.parse_args()
+    sys.exit(main(args.articles, args.n_process))
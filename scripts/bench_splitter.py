@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+"""
+bench_splitter.py
+-----------------
+Speed and accuracy of the sentence splitters in nlp/sentence_splitter.py,
+with punkt as the reference.
+
+Every article body is tidied as in `segment.py` and split by each
+splitter.  The report gives articles/s per splitter and, against punkt,
+boundary precision / recall / F1 (a boundary is the character offset where
+a sentence ends) plus the share of articles split identically.  Exits
+non-zero when a splitter's F1 is below --min-f1.
+
+Articles without a `body` (e.g. an already segmented sample that dropped
+it) use their body sentences, `sentences[1:]`, joined by spaces.
+
+Usage
+-----
+    python -m scripts.bench_splitter data/news_segmented_10k.jsonl.gz \
+        [--articles 10000] [--min-f1 0.9] [--show 5]
+"""
+from __future__ import annotations
+
+import argparse
+import sys
+import time
+from itertools import islice
+
+from common.records import read_records
+from nlp.sentence_splitter import SPLITTERS
+from scripts.segment import tidy
+
+
+def boundaries(text: str, sents: list[str]) -> set[int]:
+    """End offsets of *sents* in *text* (the last one, end of text, excluded)."""
+    ends, pos = set(), 0
+    for s in sents:
+        i = text.find(s, pos)
+        if i < 0:
+            continue
+        pos = i + len(s)
+        ends.add(pos)
+    ends.discard(len(text.rstrip()))
+    return ends
+
+
+def body_text(art: dict) -> str:
+    if art.get("body"):
+        return tidy(art["body"])
+    return " ".join(art.get("sentences", [])[1:])
+
+
+def main(path: str, n_articles: int | None, min_f1: float, show: int) -> int:
+    texts = [body_text(art) for art in islice(read_records(path), n_articles)]
+    print(f"{len(texts):,} articles from {path}")
+    SPLITTERS["punkt"]("")  # model load is not part of the timing
+
+    splits, f1s = {}, {}
+    print(f"{'splitter':<10}{'art/s':>10}{'precision':>11}{'recall':>8}"
+          f"{'F1':>7}{'same':>8}")
+    for name, split in SPLITTERS.items():
+        t0 = time.perf_counter()
+        splits[name] = [split(t) for t in texts]
+        rate = len(texts) / (time.perf_counter() - t0)
+        tp = fp = fn = same = 0
+        for text, ref, got in zip(texts, splits["punkt"], splits[name]):
+            b_ref, b_got = boundaries(text, ref), boundaries(text, got)
+            tp += len(b_ref & b_got)
+            fp += len(b_got - b_ref)
+            fn += len(b_ref - b_got)
+            same += b_ref == b_got
+        prec = tp / (tp + fp) if tp + fp else 1.0
+        rec = tp / (tp + fn) if tp + fn else 1.0
+        f1 = 2 * prec * rec / (prec + rec) if prec + rec else 0.0
+        print(f"{name:<10}{rate:>10.1f}{prec:>11.3f}{rec:>8.3f}{f1:>7.3f}"
+              f"{same / max(len(texts), 1):>8.1%}")
+        f1s[name] = f1
+
+    shown = 0
+    for text, ref, got in zip(texts, splits["punkt"], splits["rules"]):
+        if shown >= show:
+            break
+        diff = boundaries(text, ref) ^ boundaries(text, got)
+        if diff:
+            pos = min(diff)
+            print(f"  …{text[max(0, pos - 50):pos]}|{text[pos:pos + 30]}…  "
+                  f"({'punkt' if pos in boundaries(text, ref) else 'rules'} only)")
+            shown += 1
+
+    worst = [n for n, f1 in f1s.items() if f1 < min_f1]
+    if worst:
+        print(f"❌ boundary F1 below {min_f1}: {', '.join(worst)}")
+        return 1
+    print(f"✅ every splitter within F1 ≥ {min_f1} of punkt")
+    return 0
+
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser()
+    ap.add_argument("input", nargs="?", default="data/news_segmented_10k.jsonl.gz")
+    ap.add_argument("--articles", type=int, default=None,
+                    help="only the first N articles (default: all)")
+    ap.add_argument("--min-f1", type=float, default=0.9,
+                    help="lowest acceptable boundary F1 against punkt")
+    ap.add_argument("--show", type=int, default=5,
+                    help="disagreements printed (rules vs punkt)")
+    args = ap.parse_args()
+    sys.exit(main(args.input, args.articles, args.min_f1, args.show))
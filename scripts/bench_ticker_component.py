@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+"""
+bench_ticker_component.py
+-------------------------
+docs/sec of the registered `ticker_component` (nlp/ticker_component.py)
+against the closure it replaced (REGEX Matcher + a linear scan of the
+entities for every match), on long articles.
+
+Articles are built by joining the sentences of --per-doc consecutive
+records of the input, or synthesized (filler words with whitelisted
+tickers every few tokens) when no input is given.  Both components run in
+a blank English pipeline, timed on pre-tokenized docs, and must tag the
+same entities; the pipeline is also saved with `Language.to_disk`, loaded back
+and (with --n-process) run through `Language.pipe(n_process=...)`, which must
+give the same result again.  The script exits non-zero on any difference.
+
+Usage
+-----
+    python -m scripts.bench_ticker_component [data/news_segmented_10k.jsonl.gz] \
+        [--docs 200] [--per-doc 50] [--n-process 2]
+"""
+from __future__ import annotations
+
+import argparse
+import random
+import sys
+import tempfile
+import time
+from itertools import islice
+
+import spacy
+from spacy.matcher import Matcher
+from spacy.tokens import Span
+
+import nlp.ticker_component  # noqa: F401  (registers the factory)
+from common import resources
+from common.records import read_records
+
+FILLER = ("shares of rose fell after the company said on Monday that its "
+          "quarterly revenue beat estimates while analysts at the bank "
+          "remained cautious about margins in the second half").split()
+
+
+def legacy_component(pipe, whitelist):
+    """The pre-factory implementation, kept here as the reference."""
+    matcher = Matcher(pipe.vocab)
+    matcher.add("TICKER", [[{"TEXT": {"REGEX": r"^[A-Z]{1,5}$"}}]])
+
+    def ticker_component(doc):
+        new_ents = list(doc.ents)
+        for _, start, end in matcher(doc):
+            span = Span(doc, start, end, label=doc.vocab.strings["TICKER"])
+            if span.text in whitelist and not any(e.start == span.start for e in new_ents):
+                new_ents.append(span)
+        doc.ents = new_ents
+        return doc
+
+    return ticker_component
+
+
+def load_texts(path: str | None, n_docs: int, per_doc: int) -> list[str]:
+    if path:
+        recs = read_records(path, columns=["sentences"])
+        texts = []
+        while len(texts) < n_docs:
+            chunk = list(islice(recs, per_doc))
+            if not chunk:
+                break
+            texts.append(" ".join(s for r in chunk for s in r["sentences"]))
+        return texts
+    rng = random.Random(0)
+    tickers = sorted(t for t in resources.whitelist() if t.isalpha() and len(t) <= 5)
+    return [" ".join(rng.choice(tickers) if rng.random() < 0.08 else rng.choice(FILLER)
+                     for _ in range(per_doc * 25))
+            for _ in range(n_docs)]
+
+
+def ents(docs) -> list[list[tuple]]:
+    return [[(e.start, e.end, e.label_) for e in doc.ents] for doc in docs]
+
+
+def timed(fn, docs) -> tuple[list, float]:
+    t0 = time.perf_counter()
+    out = [fn(doc) for doc in docs]
+    return out, time.perf_counter() - t0
+
+
+def main(path: str | None, n_docs: int, per_doc: int, n_process: int) -> int:
+    texts = load_texts(path, n_docs, per_doc)
+    pipe = spacy.blank("en")
+    component = pipe.add_pipe("ticker_component")
+    legacy = legacy_component(pipe, resources.whitelist())
+    n_tok = sum(len(pipe.make_doc(t)) for t in texts)
+    print(f"{len(texts):,} docs, {n_tok / len(texts):,.0f} tokens/doc on average")
+
+    ref, t_old = timed(legacy, [pipe.make_doc(t) for t in texts])
+    got, t_new = timed(component, [pipe.make_doc(t) for t in texts])
+    print(f"{'component':<12}{'seconds':>9}{'docs/s':>10}")
+    print(f"{'legacy':<12}{t_old:>9.2f}{len(texts) / t_old:>10.1f}")
+    print(f"{'factory':<12}{t_new:>9.2f}{len(texts) / t_new:>10.1f}")
+    print(f"speed-up: {t_old / t_new:.1f}×")
+
+    ok = ents(ref) == ents(got)
+    if not ok:
+        print("❌ entities differ from the legacy component")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        pipe.to_disk(tmp)
+        loaded = spacy.load(tmp)
+        if ents(loaded.pipe(texts, n_process=n_process)) != ents(got):
+            print(f"❌ to_disk / from_disk (n_process={n_process}) changed the output")
+            ok = False
+    if ok:
+        print(f"✅ same entities, also after to_disk/from_disk and n_process={n_process}")
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser()
+    ap.add_argument("input", nargs="?", default=None,
+                    help="segmented articles (default: synthetic text)")
+    ap.add_argument("--docs", type=int, default=200)
+    ap.add_argument("--per-doc", type=int, default=50,
+                    help="records joined per long doc (synthetic: ×25 tokens)")
+    ap.add_argument("--n-process", type=int, default=2)
+    args = ap.parse_args()
+    sys.exit(main(args.input, args.docs, args.per_doc, args.n_process))
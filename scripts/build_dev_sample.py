@@ -8,19 +8,20 @@ GPT-4o self-labelling (dev-gold).
 
 Usage
 -----
-    python scripts/build_dev_sample.py             # k = 200
-    python scripts/build_dev_sample.py --k 300     # different size
+    python -m scripts.build_dev_sample             # k = 200
+    python -m scripts.build_dev_sample --k 300     # different size
 """
 
 from __future__ import annotations
 
 import argparse
-import gzip
-import json
 import pathlib
 import random
 from typing import List, Dict, Any
 
+from common.blockgz import BlockGzipFile, is_indexed
+from common.records import get_codec, open_writer, read_records
+
 # ---------------------------------------------------------------------------
 
 # <- contains "sentences"
@@ -31,8 +32,7 @@ OUT = pathlib.Path("data/dev_sample_200.jsonl")
 
 
 def load_jsonl_gz(path: pathlib.Path) -> List[Dict[str, Any]]:
-    with gzip.open(path, "rt", encoding="utf-8") as f:
-        return [json.loads(line) for line in f]
+    return list(read_records(path))
 
 
 def main(k: int = 200, seed: int = 42) -> None:
@@ -40,16 +40,24 @@ def main(k: int = 200, seed: int = 42) -> None:
         raise SystemExit(f"❌ Source file not found: {SRC}")
 
     random.seed(seed)
-    records = load_jsonl_gz(SRC)
-    if k > len(records):
-        raise SystemExit(f"❌ k={k} larger than dataset ({len(records)})")
-
-    sample = random.sample(records, k)
-
-    OUT.parent.mkdir(parents=True, exist_ok=True)
-    with OUT.open("w", encoding="utf-8") as fout:
+    if is_indexed(SRC):
+        # random.sample picks positions only, so sampling record numbers and
+        # fetching them gives the same rows without loading the whole file
+        loads, _ = get_codec()
+        with BlockGzipFile(SRC) as bg:
+            n = bg.count()
+            if k > n:
+                raise SystemExit(f"❌ k={k} larger than dataset ({n})")
+            sample = [loads(l) for l in bg.get_many(random.sample(range(n), k))]
+    else:
+        records = load_jsonl_gz(SRC)
+        if k > len(records):
+            raise SystemExit(f"❌ k={k} larger than dataset ({len(records)})")
+        sample = random.sample(records, k)
+
+    with open_writer(OUT) as fout:
         for rec in sample:
-            fout.write(json.dumps(rec, ensure_ascii=False) + "\n")
+            fout.write(rec)
 
     print(f"✅ wrote {k} rows → {OUT}")
 
@@ -1,80 +1,281 @@
-import gzip
-import json
+#!/usr/bin/env python3
+"""
+build_ticker2sector.py
+----------------------
+Resolve the sector of every ticker found in the extracted news and write
+`data/ticker2sector.csv` (ticker,sector; "Unknown" when no provider knows).
+
+Sectors come from a chain of pluggable providers, tried in order until
+one answers:
+
+  • yfinance  – `yf.Ticker(t).info["sector"]`; with a --base-url other
+                than Yahoo's, its quoteSummary endpoint is queried directly
+  • wikipedia – the "Sector" row of the `<T>_(ticker_symbol)` infobox
+  • json      – GET <base-url>/<T> → {"sector": ...}  (an internal
+                service, or a local stand-in server for tests)
+
+Lookups run on a thread pool (--workers) with a rate limit per host
+(--rate), and every provider answer — including "no sector" — goes into a
+persistent cache with expiry (common.kvcache, --cache).  A refresh therefore
+only hits the network for tickers that are new or whose entries have expired
+(--ttl-days, --miss-ttl-days); errors (timeouts, 5xx) are not cached and
+are retried on the next run.
+
+Usage
+-----
+    python -m scripts.build_ticker2sector [data/news_tickers_10k.jsonl.gz] \
+        [data/ticker2sector.csv] [--providers yfinance,wikipedia] \
+        [--workers 16] [--rate yfinance=2] [--base-url json=http://127.0.0.1:8000]
+"""
+from __future__ import annotations
+
+import argparse
 import csv
 import os
-import yfinance as yf
-import requests
-from bs4 import BeautifulSoup
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Iterable, List, Optional
+from urllib.parse import quote, urlparse
+
 from tqdm import tqdm
 
+from common.records import read_records
+from common.kvcache import KVCache
+
 INPUT_PATH = "data/news_tickers_10k.jsonl.gz"
 OUTPUT_PATH = "data/ticker2sector.csv"
+CACHE_PATH = "cache/sectors.db"
+DAY = 86400
 
-# -- Utility: Get sector from yfinance
 
+# ---------------------------------------------------------------------------
+# Providers
+# ---------------------------------------------------------------------------
+class Provider:
+    """
+    One sector source.  fetch() returns the sector, or None when the source
+    has no sector for the ticker (cached), and raises on transient failures
+    (not cached).
+    """
+    name = "provider"
+    base_url = ""
+    rate = 5.0  # requests / s per host
+
+    def __init__(self, base_url: Optional[str] = None, timeout: float = 5.0):
+        self.base_url = (base_url or self.base_url).rstrip("/")
+        self.timeout = timeout
+        self._local = threading.local()
+
+    @property
+    def host(self) -> str:
+        return urlparse(self.base_url).netloc or self.name
+
+    def session(self):
+        """One keep-alive requests.Session per thread."""
+        if not hasattr(self._local, "session"):
+            import requests
+
+            self._local.session = requests.Session()
+        return self._local.session
+
+    def get(self, url: str, **params):
+        """GET *url*; None on 404, raises on other errors."""
+        resp = self.session().get(url, params=params or None, timeout=self.timeout)
+        if resp.status_code == 404:
+            return None
+        resp.raise_for_status()
+        return resp
+
+    def fetch(self, ticker: str) -> Optional[str]:
+        raise NotImplementedError
+
+
+class YFinanceProvider(Provider):
+    name = "yfinance"
+    base_url = "https://query2.finance.yahoo.com"
+    rate = 2.0
+
+    def fetch(self, ticker: str) -> Optional[str]:
+        if self.base_url != YFinanceProvider.base_url:  # a proxy or stand-in
+            return self.quote_summary(ticker)
+        import yfinance as yf
+
+        try:
+            return yf.Ticker(ticker).info.get("sector") or None
+        except Exception as e:
+            response = getattr(e, "response", None)
+            if getattr(response, "status_code", None) == 404:  # unknown / delisted
+                return None
+            raise
+
+    def quote_summary(self, ticker: str) -> Optional[str]:
+        """The sector from <base-url>/v10/finance/quoteSummary, as yfinance reads it."""
+        resp = self.get(f"{self.base_url}/v10/finance/quoteSummary/{quote(ticker)}",
+                        modules="assetProfile")
+        if resp is None:
+            return None
+        result = (resp.json().get("quoteSummary") or {}).get("result") or [{}]
+        return (result[0].get("assetProfile") or {}).get("sector") or None
 
-def get_sector_yfinance(ticker):
-    try:
-        info = yf.Ticker(ticker).info
-        return info.get("sector", None)
-    except Exception:
-        return None
 
-# -- Utility: Get sector from Wikipedia fallback
+class WikipediaProvider(Provider):
+    name = "wikipedia"
+    base_url = "https://en.wikipedia.org/wiki"
+    rate = 10.0
 
+    def fetch(self, ticker: str) -> Optional[str]:
+        from bs4 import BeautifulSoup
 
-def get_sector_wikipedia(ticker):
-    try:
-        url = f"https://en.wikipedia.org/wiki/{ticker}_(ticker_symbol)"
-        resp = requests.get(url, timeout=5)
-        if resp.status_code != 200:
+        resp = self.get(f"{self.base_url}/{quote(ticker)}_(ticker_symbol)")
+        if resp is None:
             return None
         soup = BeautifulSoup(resp.text, "html.parser")
         for row in soup.select("table.infobox tr"):
             if "Sector" in row.text:
-                return row.text.split(":")[-1].strip()
-    except Exception:
+                return row.text.split(":")[-1].strip() or None
         return None
 
-# -- Step 1: Load all unique tickers
 
+class JsonProvider(Provider):
+    name = "json"
+    base_url = "http://127.0.0.1:8000"
+    rate = 50.0
+
+    def fetch(self, ticker: str) -> Optional[str]:
+        resp = self.get(f"{self.base_url}/{quote(ticker)}")
+        return None if resp is None else resp.json().get("sector") or None
+
+
+PROVIDERS = {p.name: p for p in (YFinanceProvider, WikipediaProvider, JsonProvider)}
+
+
+class RateLimiter:
+    """At most *rate* acquisitions per second, spaced evenly, across threads."""
+
+    def __init__(self, rate: float):
+        self.interval = 1.0 / rate if rate > 0 else 0.0
+        self._next = 0.0
+        self._lock = threading.Lock()
+
+    def wait(self) -> None:
+        with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._next)
+            self._next = slot + self.interval
+        if slot > now:
+            time.sleep(slot - now)
 
-def load_unique_tickers(path):
-    unique = set()
-    with gzip.open(path, "rt", encoding="utf-8") as f:
-        for line in f:
-            data = json.loads(line)
-            for ticker in data.get("tickers", []):
-                unique.add(ticker)
-    return sorted(unique)
 
-# -- Step 2: Build mapping
+# ---------------------------------------------------------------------------
+# Resolver
+# ---------------------------------------------------------------------------
+class SectorResolver:
+    """Concurrent, cached provider chain (see module docstring)."""
 
+    _MISSING = object()
 
-def build_ticker2sector(tickers):
-    mapping = {}
-    for ticker in tqdm(tickers, desc="Mapping tickers to sectors"):
-        sector = get_sector_yfinance(ticker)
-        if not sector:
-            sector = get_sector_wikipedia(ticker)
-        mapping[ticker] = sector if sector else "Unknown"
-    return mapping
+    def __init__(self, providers: List[Provider], cache: KVCache, workers: int = 16,
+                 ttl: float = 30 * DAY, miss_ttl: float = 3 * DAY,
+                 rates: Optional[Dict[str, float]] = None):
+        self.providers = providers
+        self.cache = cache
+        self.workers = workers
+        self.ttl, self.miss_ttl = ttl, miss_ttl
+        rates = rates or {}
+        self.limiters: Dict[str, RateLimiter] = {}
+        for p in providers:  # providers on one host share its limit
+            self.limiters.setdefault(p.host, RateLimiter(rates.get(p.name, p.rate)))
+        self.fetched = 0
+        self.errors = 0
+        self._count = threading.Lock()
 
-# -- Step 3: Save to CSV
+    def _lookup(self, ticker: str, cached: dict) -> Optional[str]:
+        for p in self.providers:
+            key = f"{p.name}:{ticker}"
+            sector = cached.get(key, self._MISSING)
+            if sector is self._MISSING:
+                self.limiters[p.host].wait()
+                try:
+                    sector = p.fetch(ticker)
+                except Exception:
+                    with self._count:
+                        self.errors += 1
+                    continue
+                with self._count:
+                    self.fetched += 1
+                self.cache.put(key, sector, self.ttl if sector else self.miss_ttl)
+            if sector:
+                return sector
+        return None
+
+    def resolve(self, tickers: Iterable[str], refresh: bool = False,
+                progress: bool = True) -> Dict[str, Optional[str]]:
+        """ticker → sector (None if no provider has one), in input order."""
+        tickers = list(tickers)
+        keys = [f"{p.name}:{t}" for t in tickers for p in self.providers]
+        cached = {} if refresh else self.cache.get_many(keys)
+        with ThreadPoolExecutor(self.workers) as pool:
+            sectors = pool.map(lambda t: self._lookup(t, cached), tickers)
+            return dict(zip(tickers, tqdm(sectors, total=len(tickers),
+                                          desc="Mapping tickers to sectors",
+                                          disable=not progress)))
+
+
+# ---------------------------------------------------------------------------
+# I/O
+# ---------------------------------------------------------------------------
+def load_unique_tickers(path):
+    unique = set()
+    for data in read_records(path, columns=["tickers"]):
+        for ticker in data.get("tickers") or []:
+            unique.add(ticker)
+    return sorted(unique)
 
 
 def save_to_csv(mapping, out_path):
-    os.makedirs(os.path.dirname(out_path), exist_ok=True)
+    os.makedirs(os.path.dirname(out_path) or ".", exist_ok=True)
     with open(out_path, "w", newline="", encoding="utf-8") as f:
         writer = csv.writer(f)
         writer.writerow(["ticker", "sector"])
         for ticker, sector in mapping.items():
-            writer.writerow([ticker, sector])
+            writer.writerow([ticker, sector or "Unknown"])
+
+
+def make_providers(names: str, base_urls: List[str], timeout: float) -> List[Provider]:
+    urls = dict(kv.split("=", 1) for kv in base_urls)
+    return [PROVIDERS[n](urls.get(n), timeout) for n in names.split(",")]
 
 
 # -- Main
 if __name__ == "__main__":
-    tickers = load_unique_tickers(INPUT_PATH)
-    mapping = build_ticker2sector(tickers)
-    save_to_csv(mapping, OUTPUT_PATH)
-    print(f"✅ Saved {len(mapping)} entries to {OUTPUT_PATH}")
+    ap = argparse.ArgumentParser()
+    ap.add_argument("input", nargs="?", default=INPUT_PATH)
+    ap.add_argument("output", nargs="?", default=OUTPUT_PATH)
+    ap.add_argument("--providers", default="yfinance,wikipedia",
+                    help=f"comma-separated chain, from {sorted(PROVIDERS)}")
+    ap.add_argument("--base-url", action="append", default=[], metavar="NAME=URL",
+                    help="override a provider's base URL (repeatable)")
+    ap.add_argument("--rate", action="append", default=[], metavar="NAME=REQ_PER_S",
+                    help="per-host request rate for a provider (repeatable)")
+    ap.add_argument("--workers", type=int, default=16)
+    ap.add_argument("--timeout", type=float, default=5.0)
+    ap.add_argument("--cache", default=CACHE_PATH)
+    ap.add_argument("--ttl-days", type=float, default=30)
+    ap.add_argument("--miss-ttl-days", type=float, default=3,
+                    help="how long a 'no sector' answer is trusted")
+    ap.add_argument("--refresh", action="store_true",
+                    help="ignore cached answers (they are still overwritten)")
+    args = ap.parse_args()
+
+    cache = KVCache(args.cache)
+    resolver = SectorResolver(
+        make_providers(args.providers, args.base_url, args.timeout), cache,
+        workers=args.workers, ttl=args.ttl_days * DAY, miss_ttl=args.miss_ttl_days * DAY,
+        rates={n: float(r) for n, r in (kv.split("=", 1) for kv in args.rate)})
+    tickers = load_unique_tickers(args.input)
+    mapping = resolver.resolve(tickers, refresh=args.refresh)
+    save_to_csv(mapping, args.output)
+    print(f"📦 {cache.stats()}; {resolver.fetched:,} fetched, {resolver.errors:,} errors")
+    cache.close()
+    print(f"✅ Saved {len(mapping)} entries to {args.output}")
@@ -5,61 +5,64 @@ enrich_articles.py
 Attach sector weights to each article based on a ticker→sector CSV.
 The script passes through `date` and `tickers` so later stages can
 use them, and writes a new JSONL(.gz) with an added `sectors` dict.
+Parquet / Arrow inputs and outputs are picked by file extension.
 
 Usage:
-    python scripts/enrich_articles.py \
+    python -m scripts.enrich_articles \
         data/news_tickers_10k.jsonl.gz \
         data/news_tickers_10k_sector.jsonl.gz
 """
-import gzip
-import json
-import csv
+import argparse
 import sys
 from collections import Counter
-from pathlib import Path
 from tqdm.auto import tqdm
+from common import checkpoint, resources
+from common.checkpoint import Checkpoint
+from common.records import read_records
 
 # ---------------------------------------------------------------------------
-# Load ticker→sector map   (skip rows with Unknown)
+# Main   (ticker→sector map, Unknown skipped: common.resources.ticker_sector)
 # ---------------------------------------------------------------------------
-TICKER_SECTOR = {}
-with open("data/ticker2sector.csv", newline="", encoding="utf-8") as f:
-    for row in csv.DictReader(f):
-        sec = row["sector"].strip()
-        if sec and sec.lower() != "unknown":
-            TICKER_SECTOR[row["ticker"]] = sec
 
-# ---------------------------------------------------------------------------
-# Main
-# ---------------------------------------------------------------------------
 
+def enrich_article(art: dict) -> dict:
+    """Map tickers → sectors and normalise to weights."""
+    ticker_sector = resources.ticker_sector()
+    secs = [ticker_sector.get(tk) for tk in art.get("tickers", [])]
+    secs = [s for s in secs if s]
+    cnt = Counter(secs)
+    tot = sum(cnt.values()) or 1
+
+    return {
+        "id": art.get("id"),  # stamped by segment.py
+        "date": art.get("date"),
+        "headline": art.get("headline"),
+        "sentences": art["sentences"],
+        "tickers": art.get("tickers", []),
+        **({"ticker_mentions": art["ticker_mentions"]}
+           if "ticker_mentions" in art else {}),
+        "sectors": {s: cnt[s] / tot for s in cnt}
+    }
 
-def main(inp: str, out: str) -> None:
+
+def main(inp: str, out: str, resume: bool = False,
+         every: int = checkpoint.DEFAULT_EVERY, incremental: bool = False) -> None:
     skipped = 0
-    with gzip.open(inp, "rt", encoding="utf-8") as fin, \
-            gzip.open(out, "wt", encoding="utf-8") as fout:
-        for i, line in enumerate(tqdm(fin, desc="Enriching with sectors"), 1):
-            try:
-                art = json.loads(line)
-            except json.JSONDecodeError as e:
-                print(f"[warn] bad JSON line {i}: {e}", file=sys.stderr)
-                skipped += 1
-                continue
 
-            # Map tickers → sectors and normalise to weights
-            secs = [TICKER_SECTOR.get(tk) for tk in art.get("tickers", [])]
-            secs = [s for s in secs if s]
-            cnt = Counter(secs)
-            tot = sum(cnt.values()) or 1
+    with Checkpoint(inp, out, resume, every, incremental=incremental) as fout:
+
+        def bad_line(i, e):
+            nonlocal skipped
+            print(f"[warn] bad JSON line {i}: {e}", file=sys.stderr)
+            skipped += 1
 
-            enriched = {
-                "date": art.get("date"),
-                "headline": art.get("headline"),
-                "sentences": art["sentences"],
-                "tickers": art.get("tickers", []),
-                "sectors": {s: cnt[s] / tot for s in cnt}
-            }
-            fout.write(json.dumps(enriched, ensure_ascii=False) + "\n")
+        # malformed lines are consumed input all the same: advance by position
+        records = read_records(inp, on_error=bad_line, start=fout.start)
+        for art in tqdm(records, desc="Enriching with sectors", initial=fout.start):
+            if not fout.seen(art):
+                fout.write(enrich_article(art))
+            fout.advance(records.position - fout.records_in)
+        fout.advance(records.position - fout.records_in)
 
     if skipped:
         print(f"⚠️  skipped {skipped} malformed lines", file=sys.stderr)
@@ -67,7 +70,12 @@ def main(inp: str, out: str) -> None:
 
 
 if __name__ == "__main__":
-    if len(sys.argv) != 3:
-        print("Usage: enrich_articles.py <in.jsonl.gz> <out.jsonl.gz>")
-        sys.exit(1)
-    main(sys.argv[1], sys.argv[2])
+    ap = argparse.ArgumentParser(
+        usage="python -m scripts.enrich_articles <in> <out>  "
+              "(.jsonl[.gz] / .parquet / .arrow)")
+    ap.add_argument("input")
+    ap.add_argument("output")
+    checkpoint.add_arguments(ap)
+    args = ap.parse_args()
+    main(args.input, args.output, args.resume, args.checkpoint_every,
+         args.incremental)
@@ -11,7 +11,7 @@ and save:
 
 Usage
 -----
-    python scripts/evaluate.py \
+    python -m scripts.evaluate \
         data/news_final_10k.jsonl.gz \
         data/dev_gold_200.jsonl
 """
@@ -19,8 +19,6 @@ Usage
 from __future__ import annotations
 
 import argparse
-import gzip
-import json
 import pathlib
 from collections import defaultdict
 from typing import Dict, Iterator, List
@@ -31,6 +29,8 @@ import pandas as pd
 import seaborn as sns
 from sklearn.metrics import classification_report, confusion_matrix
 
+from common.records import read_records
+
 LABELS = ["NEG", "NEU", "POS"]
 OUTDIR = pathlib.Path("results")
 OUTDIR.mkdir(exist_ok=True)
@@ -39,10 +39,7 @@ OUTDIR.mkdir(exist_ok=True)
 
 
 def load(path: pathlib.Path) -> Iterator[Dict]:
-    opener = gzip.open if path.suffix == ".gz" else open
-    with opener(path, "rt", encoding="utf-8") as f:
-        for line in f:
-            yield json.loads(line)
+    return read_records(path)
 
 
 def expected_calibration_error(
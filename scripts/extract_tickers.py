@@ -1,92 +1,236 @@
 #!/usr/bin/env python3
-import sys
-import gzip
-import json
+import argparse
 import re
+from bisect import bisect_right
+from contextlib import ExitStack
+from itertools import accumulate
 
-import spacy
-from spacy.matcher import PhraseMatcher
 from tqdm import tqdm
 
+from common import checkpoint, parallel, resources
+from common.checkpoint import Checkpoint
+from common.records import read_records
+from common.resources import resource
+from nlp.ticker_matcher import CompanyMatcher, spacy_tokenizer
+
 """
-Streaming hybrid ticker extractor (regex + PhraseMatcher).
-Overwrites your previous version with batching and no multiprocessing.
+Streaming hybrid ticker extractor (regex + company-name dictionary).
+
+Articles are processed in batches of 200; with --n-process N the batches
+are farmed out to N spawned workers, each building the whitelist, automaton
+(or spaCy pipeline) once at start-up, and written back in input order.
+Resources load on first use (common.resources), so importing this module
+for one helper is cheap.
+
+Besides the article-level `tickers` list, every article gets
+`ticker_mentions`: [sentence index, index into `tickers`] pairs saying
+which sentence mentions which ticker, used by aggregate_sentiment.py for
+per-sector voting.
+
+Three engines for the company-name half:
+  • aho       (default) – Aho–Corasick automaton (nlp.ticker_matcher) over
+                          spaCy's English tokens: a blank tokenizer, no
+                          model, same results as the reference
+  • aho-regex           – the same automaton over regex word tokens, no
+                          spaCy at all; differs from the reference where
+                          spaCy's tokenizer exceptions split a company name
+                          differently ("AT&T", "Inc.", "U.S.", URLs; see
+                          nlp.ticker_matcher)
+  • spacy               – en_core_web_sm + PhraseMatcher(attr="LOWER"),
+                          the reference (hybrid_extract)
+
+tests/test_extract_engines.py holds aho to the reference;
+scripts/bench_extract.py compares them on real data.
 """
 
-# 1) Minimal spaCy pipeline
-nlp = spacy.load(
-    "en_core_web_sm",
-    disable=["parser", "tagger", "lemmatizer", "attribute_ruler"]
-)
-
-# 2) Load resources
-company_dict = json.load(open("data/company_dict.json", encoding="utf-8"))
-with open("data/ticker_master.csv", encoding="utf-8") as f:
-    next(f)  # skip header
-    WHITELIST = set(line.strip() for line in f)
+ENGINES = ("aho", "aho-regex", "spacy")
+SPACY_MODEL = "en_core_web_sm"
 
-# 3) Regex for $TICKER or bare TICKER
+# 1) Regex for $TICKER or bare TICKER
 TICKER_RGX = re.compile(r"\$?([A-Z]{1,5})\b")
 
-# 4) Build PhraseMatcher for company names
-matcher = PhraseMatcher(nlp.vocab, attr="LOWER")
-patterns = [nlp.make_doc(name) for name in company_dict.keys()]
-matcher.add("COMPANY", patterns)
+
+# 2) Company-name automata (whitelist and company_dict: common.resources)
+@resource
+def company_matcher() -> CompanyMatcher:
+    """Over spaCy tokens (--engine aho)."""
+    rd = resources.refdata()  # precompiled, memory-mapped automaton if built
+    if rd:
+        return rd.company_matcher()
+    return CompanyMatcher(resources.company_dict(), tokenizer=spacy_tokenizer())
+
+
+@resource
+def regex_company_matcher() -> CompanyMatcher:
+    """Over regex tokens (--engine aho-regex)."""
+    return CompanyMatcher(resources.company_dict())
+
+
+# 3) spaCy pipeline + PhraseMatcher, loaded only for --engine spacy
+@resource
+def spacy_pipeline():
+    import spacy
+    from spacy.matcher import PhraseMatcher
+
+    nlp = spacy.load(
+        SPACY_MODEL,
+        disable=["parser", "tagger", "lemmatizer", "attribute_ruler"]
+    )
+    matcher = PhraseMatcher(nlp.vocab, attr="LOWER")
+    matcher.add("COMPANY", [nlp.make_doc(name) for name in resources.company_dict()])
+    return nlp, matcher
+
+
+def regex_spans(text: str):
+    whitelist = resources.whitelist()
+    return [(m.start(1), m.group(1)) for m in TICKER_RGX.finditer(text)
+            if m.group(1) in whitelist]
 
 
 def regex_extract(text: str):
-    return {m for m in TICKER_RGX.findall(text) if m in WHITELIST}
+    whitelist = resources.whitelist()
+    return {m for m in TICKER_RGX.findall(text) if m in whitelist}
 
 
-def phrase_extract(doc):
-    syms = set()
+def phrase_spans(doc):
+    _, matcher = spacy_pipeline()
+    company_dict = resources.company_dict()
+    spans = []
     for _, start, end in matcher(doc):
         name = doc[start:end].text.lower()
         tk = company_dict.get(name)
         if tk:
-            syms.add(tk)
-    return syms
+            spans.append((doc[start].idx, tk))
+    return spans
+
+
+def phrase_extract(doc):
+    return {tk for _, tk in phrase_spans(doc)}
+
+
+def hybrid_spans(text: str, doc=None):
+    """(start character, ticker) of every mention — reference (spaCy) engine."""
+    if doc is None:
+        doc = spacy_pipeline()[0](text)
+    return regex_spans(text) + phrase_spans(doc)
 
 
 def hybrid_extract(text: str, doc=None):
+    """Reference (spaCy) extraction."""
     syms = regex_extract(text)
     if doc is None:
-        doc = nlp(text)
+        doc = spacy_pipeline()[0](text)
     syms |= phrase_extract(doc)
     return sorted(syms)
 
 
-def run(input_path: str, output_path: str, batch_size: int = 200):
-    with gzip.open(input_path, "rt", encoding="utf-8") as fin, \
-            gzip.open(output_path, "wt", encoding="utf-8") as fout:
-
-        batch_texts = []
-        batch_arts = []
-
-        for line in tqdm(fin, desc="Extracting tickers"):
-            art = json.loads(line)
-            text = " ".join(art.get("sentences", []))
-            batch_texts.append(text)
-            batch_arts.append(art)
-
-            if len(batch_texts) >= batch_size:
-                docs = list(nlp.pipe(batch_texts))
-                for art, doc, txt in zip(batch_arts, docs, batch_texts):
-                    art["tickers"] = hybrid_extract(txt, doc)
-                    fout.write(json.dumps(art, ensure_ascii=False) + "\n")
-                batch_texts.clear()
-                batch_arts.clear()
-
-        # process any remainder
-        if batch_texts:
-            docs = list(nlp.pipe(batch_texts))
-            for art, doc, txt in zip(batch_arts, docs, batch_texts):
-                art["tickers"] = hybrid_extract(txt, doc)
-                fout.write(json.dumps(art, ensure_ascii=False) + "\n")
+def _automaton(engine: str) -> CompanyMatcher:
+    return regex_company_matcher() if engine == "aho-regex" else company_matcher()
+
+
+def fast_spans(text: str, engine: str = "aho"):
+    """(start character, ticker) of every mention, without the spaCy model."""
+    return regex_spans(text) + _automaton(engine).find_spans(text)
+
+
+def fast_extract(text: str, engine: str = "aho"):
+    """hybrid_extract() without the spaCy model (aho-regex caveats: nlp.ticker_matcher)."""
+    return sorted(regex_extract(text) | _automaton(engine).find(text))
+
+
+def index_mentions(spans, sentences):
+    """
+    Article `tickers` (sorted) and `ticker_mentions`: sorted, de-duplicated
+    [sentence index, index into tickers] pairs, from mention *spans* over
+    " ".join(sentences).
+    """
+    starts = list(accumulate((len(s) + 1 for s in sentences[:-1]), initial=0))
+    tickers = sorted({tk for _, tk in spans})
+    tid = {tk: i for i, tk in enumerate(tickers)}
+    mentions = sorted({(bisect_right(starts, pos) - 1, tid[tk]) for pos, tk in spans})
+    return tickers, [list(m) for m in mentions]
+
+
+def extract_batch(arts, engine: str = "aho"):
+    """
+    Set `tickers` and `ticker_mentions` on every article of *arts*
+    (one nlp.pipe call for spaCy).
+    """
+    sents = [art.get("sentences", []) for art in arts]
+    texts = [" ".join(ss) for ss in sents]
+    if engine == "spacy":
+        nlp, _ = spacy_pipeline()
+        spans = (hybrid_spans(txt, doc) for txt, doc in zip(texts, nlp.pipe(texts)))
+    else:
+        matcher = _automaton(engine)
+        spans = (regex_spans(txt) + matcher.find_spans(txt) for txt in texts)
+    for art, ss, sp in zip(arts, sents, spans):
+        art["tickers"], art["ticker_mentions"] = index_mentions(sp, ss)
+    return arts
+
+
+# ---------------------------------------------------------------------------
+# Multi-process mode
+# ---------------------------------------------------------------------------
+def _init_worker(engine: str) -> None:
+    """Pool initializer: build this worker's resources once, up front."""
+    resources.whitelist()
+    if engine == "spacy":
+        spacy_pipeline()
+    else:
+        _automaton(engine)
+
+
+def worker_pool(n_process: int, engine: str = "aho"):
+    return parallel.spawn_pool(n_process, _init_worker, (engine,))
+
+
+def extract_ordered(pool, n_process: int, batches, engine: str = "aho"):
+    """
+    extract_batch() over (consumed, articles) *batches* on *pool*, yielding
+    them back in input order with at most 2·n_process batches in flight.
+    """
+    return parallel.ordered_map(pool, n_process, extract_batch, batches, engine)
+
+
+# ---------------------------------------------------------------------------
+# Main
+# ---------------------------------------------------------------------------
+def run(input_path: str, output_path: str, batch_size: int = 200,
+        resume: bool = False, every: int = checkpoint.DEFAULT_EVERY,
+        incremental: bool = False, engine: str = "aho", n_process: int = 1):
+    with Checkpoint(input_path, output_path, resume, every,
+                    incremental=incremental) as fout, ExitStack() as stack:
+
+        batches = parallel.iter_batches(
+            tqdm(read_records(input_path, start=fout.start),
+                 desc="Extracting tickers" + (f" ×{n_process}" if n_process > 1 else ""),
+                 initial=fout.start),
+            fout, batch_size)
+        if n_process > 1:
+            pool = stack.enter_context(worker_pool(n_process, engine))
+            results = extract_ordered(pool, n_process, batches, engine)
+        else:
+            results = ((consumed, extract_batch(arts, engine))
+                       for consumed, arts in batches)
+
+        for consumed, arts in results:
+            for art in arts:
+                fout.write(art)
+            fout.advance(consumed)
 
 
 if __name__ == "__main__":
-    if len(sys.argv) != 3:
-        print("Usage: extract_tickers.py <in.jsonl.gz> <out.jsonl.gz>")
-        sys.exit(1)
-    run(sys.argv[1], sys.argv[2])
+    ap = argparse.ArgumentParser(
+        usage="python -m scripts.extract_tickers <in> <out>  "
+              "(.jsonl[.gz] / .parquet / .arrow)")
+    ap.add_argument("input")
+    ap.add_argument("output")
+    ap.add_argument("--engine", choices=ENGINES, default="aho",
+                    help="company-name matcher (default: aho, spaCy tokenizer only)")
+    ap.add_argument("--n-process", type=int, default=1,
+                    help="extraction processes (default 1: in-process)")
+    checkpoint.add_arguments(ap)
+    args = ap.parse_args()
+    run(args.input, args.output, resume=args.resume, every=args.checkpoint_every,
+        incremental=args.incremental, engine=args.engine, n_process=args.n_process)
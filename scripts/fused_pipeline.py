@@ -0,0 +1,138 @@
+#!/usr/bin/env python3
+"""
+fused_pipeline.py
+-----------------
+Single-process, streaming version of `make pipeline`:
+
+    segment → extract → enrich → sentiment → aggregate
+
+Every stage is a generator over the previous one, reusing the stage
+functions of the standalone scripts, so each record is decoded once on the
+way in and encoded once on the way out instead of being gzip-written and
+re-read between every step.  Records that already carry `sentences` (e.g.
+the 10 k sample) skip segmentation.
+
+Intermediate files are optional debug taps (--tap-dir): each stage's stream
+is then also written to <dir>/<stage>.jsonl.gz.
+
+Usage
+-----
+    python -m scripts.fused_pipeline data/news_segmented_10k.jsonl.gz \
+        data/news_final_10k_fused.jsonl.gz [--tap-dir data/taps]
+"""
+from __future__ import annotations
+
+import argparse
+import time
+from contextlib import ExitStack
+from itertools import islice
+from pathlib import Path
+from typing import Iterable, Iterator
+
+from tqdm.auto import tqdm
+
+from common.records import open_writer, read_records
+from models.finbert import BACKENDS, FinBERT
+from models.sentiment_cache import SentimentCache
+from scripts.aggregate_sentiment import aggregate_article, load_ticker_map
+from scripts.enrich_articles import enrich_article
+from scripts.extract_tickers import extract_batch
+from scripts.segment import segment_article
+from scripts.sentiment_inference import ARTICLE_BATCH_SIZE, score_articles
+
+
+# ---------------------------------------------------------------------------
+# Generator stages
+# ---------------------------------------------------------------------------
+def batched(it: Iterable[dict], n: int) -> Iterator[list[dict]]:
+    it = iter(it)
+    while batch := list(islice(it, n)):
+        yield batch
+
+
+def segment(arts):
+    for art in arts:
+        yield art if "sentences" in art else segment_article(art)
+
+
+def extract(arts, batch_size: int = 200):
+    for batch in batched(arts, batch_size):
+        yield from extract_batch(batch)
+
+
+def enrich(arts):
+    return map(enrich_article, arts)
+
+
+def sentiment(arts, model, max_tokens=None, cache=None):
+    for batch in batched(arts, ARTICLE_BATCH_SIZE):
+        yield from score_articles(batch, model, max_tokens, cache)
+
+
+def aggregate(arts, t2s):
+    for art in arts:
+        yield aggregate_article(art, t2s)
+
+
+def tap(arts, fout):
+    """Pass records through unchanged, copying each one to *fout*."""
+    for art in arts:
+        fout.write(art)
+        yield art
+
+
+# ---------------------------------------------------------------------------
+# Main
+# ---------------------------------------------------------------------------
+def main(inp: Path, outp: Path, tap_dir: Path | None = None,
+         ticker_map: Path | None = None,
+         max_tokens: int | None = None, cache_path: str | None = None,
+         backend: str = "torch") -> None:
+    wall0, cpu0 = time.perf_counter(), time.process_time()
+    model = FinBERT(backend=backend)
+    cache = SentimentCache(cache_path, model.model_id) if cache_path else None
+    t2s = load_ticker_map(ticker_map)
+
+    with ExitStack() as stack:
+        def tapped(stream, name):
+            if tap_dir is None:
+                return stream
+            tap_dir.mkdir(parents=True, exist_ok=True)
+            fout = stack.enter_context(open_writer(tap_dir / f"{name}.jsonl.gz"))
+            return tap(stream, fout)
+
+        stream = tapped(segment(read_records(inp)), "segmented")
+        stream = tapped(extract(stream), "tickers")
+        stream = tapped(enrich(stream), "sector")
+        stream = tapped(sentiment(stream, model, max_tokens, cache), "sentiment")
+        stream = aggregate(stream, t2s)
+
+        fout = stack.enter_context(open_writer(outp))
+        for rec in tqdm(stream, desc="Fused pipeline"):
+            fout.write(rec)
+
+    if cache:
+        print(f"📦 {cache.stats()}")
+        cache.close()
+    print(f"⏱  wall {time.perf_counter() - wall0:.1f} s, "
+          f"CPU {time.process_time() - cpu0:.1f} s")
+    print(f"✅ Fused pipeline → {outp}")
+
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser()
+    ap.add_argument("input", type=Path,
+                    help="raw or segmented articles (.jsonl.gz / .parquet / .arrow)")
+    ap.add_argument("output", type=Path,
+                    help="news_final_* (.jsonl.gz / .parquet / .arrow)")
+    ap.add_argument("--tap-dir", type=Path, default=None,
+                    help="also write every intermediate stage here (debug)")
+    ap.add_argument("--map", type=Path, default=None,
+                    help="ticker→sector CSV (default: shared reference data)")
+    ap.add_argument("--max-tokens", type=int, default=None)
+    ap.add_argument("--cache", default="cache/sentiment.db")
+    ap.add_argument("--no-cache", action="store_true")
+    ap.add_argument("--backend", choices=BACKENDS, default="torch")
+    args = ap.parse_args()
+    main(args.input, args.output, args.tap_dir, args.map, args.max_tokens,
+         None if args.no_cache else args.cache, args.backend)
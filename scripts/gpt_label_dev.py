@@ -8,27 +8,45 @@ produce article-level labels in **our final JSON schema**.
 ✦ Input  : data/dev_sample_200.jsonl
 ✦ Output : data/dev_gold_200.jsonl
 ✦ Cost   : ≈ 150 tokens × 200 ≈ $0.15 with gpt-4o-mini
+
+Requests run concurrently (--concurrency); rate limits (429), server
+errors (5xx) and timeouts are retried with exponential back-off plus
+jitter, while auth / other 4xx errors and unparsable answers fail the
+article at once.  Every answer is cached on disk under the hash of
+(model, system prompt, user prompt) (--cache), and each label is appended
+to the output as soon as it arrives, tagged with the article's content
+`id`: after a crash, re-running skips the articles already in the output
+(and answers already paid for come from the cache).  An output without
+`id`s (written by an older version) is refused; --fresh relabels from
+scratch.
+
+--base-url points the client at any OpenAI-compatible endpoint, e.g. a
+local mock server (scripts/bench_gpt_label.py).
+
+Usage
+-----
+    python -m scripts.gpt_label_dev [data/dev_sample_200.jsonl] \
+        [data/dev_gold_200.jsonl] [--concurrency 8] [--base-url URL] [--fresh]
 """
 
 from __future__ import annotations
+import argparse
+import asyncio
+import hashlib
+import json
 import os
+import random
 import sys
-import time
-import json
 from pathlib import Path
-from typing import Dict
+from typing import Dict, Set, Tuple
 from tqdm.auto import tqdm
-import openai
 
-# ────────────────────────────────────────────────────────────
-#  1.  API key
-# ────────────────────────────────────────────────────────────
-openai.api_key = os.getenv("OPENAI_API_KEY") or sys.exit(
-    "❌ OPENAI_API_KEY env var not set"
-)
+from common.incremental import content_id
+from common.records import JsonlWriter, read_records
+from common.kvcache import KVCache
 
 # ────────────────────────────────────────────────────────────
-#  2.  System prompt (note: headline_summary == ORIGINAL headline)
+#  1.  System prompt (note: headline_summary == ORIGINAL headline)
 # ────────────────────────────────────────────────────────────
 SYSTEM_MSG = (
     "You are «FinSent-Inspector», a senior equity-research editor.\n\n"
@@ -58,7 +76,7 @@ SYSTEM_MSG = (
 )
 
 # ────────────────────────────────────────────────────────────
-#  3.  Helpers
+#  2.  Helpers
 # ────────────────────────────────────────────────────────────
 MAX_SENT = 40  # context budget
 
@@ -68,43 +86,196 @@ def get_headline(rec: dict) -> str:
     return rec.get("headline") or rec.get("headline_summary") or "UNKNOWN"
 
 
+def article_id(art: dict) -> str:
+    """
+    The article's content `id`; sampled records with neither `id` nor raw
+    `body` get a hash of headline, date and sentences instead.
+    """
+    if art.get("id") or art.get("body") is not None:
+        return content_id(art)
+    key = json.dumps([get_headline(art), art.get("date"), art.get("sentences", [])])
+    return hashlib.blake2b(key.encode("utf-8"), digest_size=16).hexdigest()
+
+
 def build_prompt(article: Dict) -> str:
     body = "\n".join(article.get("sentences", [])[:MAX_SENT])
     return f"HEADLINE: {get_headline(article)}\nARTICLE:\n{body}"
 
 
 # ────────────────────────────────────────────────────────────
-#  4.  I/O paths
+#  3.  I/O paths and settings
 # ────────────────────────────────────────────────────────────
 INP = Path("data/dev_sample_200.jsonl")
 OUT = Path("data/dev_gold_200.jsonl")
+CACHE = "cache/gpt_labels.db"
+MODEL = "gpt-4o-mini"
+
+
+def prompt_key(model: str, prompt: str) -> str:
+    """Cache key: hash of everything that determines the answer."""
+    h = hashlib.sha256()
+    for part in (model, SYSTEM_MSG, prompt):
+        h.update(part.encode("utf-8"))
+        h.update(b"\0")
+    return h.hexdigest()
+
+
+def scan_output(path: Path) -> Tuple[Set[str], int | None]:
+    """
+    Content IDs already labelled in *path*, and the byte offset after its
+    last complete line (None if there is no file).  A line cut short by a
+    crash is dropped.  Headlines are not keys: two articles may share one.
+    """
+    ids, end = set(), None
+    if path.exists():
+        end = 0
+        with open(path, "rb") as f:
+            for line in f:
+                if not line.endswith(b"\n"):
+                    break
+                try:
+                    rec = json.loads(line)
+                except ValueError:
+                    break
+                ids.add(rec.get("id"))
+                end += len(line)
+    return ids, end
+
+
+def retryable(e: Exception) -> bool:
+    """Worth another attempt: 429, 5xx or a timeout (not auth / 4xx / bad JSON)."""
+    import openai
+
+    if isinstance(e, openai.APIStatusError):
+        return e.status_code == 429 or e.status_code >= 500
+    return isinstance(e, (openai.APITimeoutError, asyncio.TimeoutError))
 
-records = [json.loads(l) for l in INP.open("r", encoding="utf-8")]
 
 # ────────────────────────────────────────────────────────────
-#  5.  Main loop
+#  4.  Async labeller
 # ────────────────────────────────────────────────────────────
-with OUT.open("w", encoding="utf-8") as fout:
-    for art in tqdm(records, desc="GPT-labelling"):
-        for attempt in range(3):
+class Labeller:
+    def __init__(self, client, model: str = MODEL, concurrency: int = 8,
+                 retries: int = 5, backoff: float = 1.0, max_backoff: float = 30.0,
+                 cache: KVCache | None = None):
+        self.client = client
+        self.model = model
+        self.sem = asyncio.Semaphore(concurrency)
+        self.retries = retries
+        self.backoff, self.max_backoff = backoff, max_backoff
+        self.cache = cache
+        self.requests = 0
+
+    async def ask(self, prompt: str) -> dict:
+        """Labels for one prompt (cached), retrying transient errors with back-off + jitter."""
+        key = prompt_key(self.model, prompt)
+        if self.cache is not None:
+            content = self.cache.get(key)
+            if content is not None:
+                return json.loads(content)
+        for attempt in range(self.retries + 1):
+            try:
+                async with self.sem:
+                    self.requests += 1
+                    resp = await self.client.chat.completions.create(
+                        model=self.model,
+                        temperature=0,
+                        messages=[
+                            {"role": "system", "content": SYSTEM_MSG},
+                            {"role": "user",   "content": prompt},
+                        ],
+                    )
+                content = resp.choices[0].message.content
+                labelled = json.loads(content)
+                if self.cache is not None:
+                    self.cache.put(key, content)
+                return labelled
+            except Exception as e:
+                if attempt == self.retries or not retryable(e):
+                    raise
+                print("error:", type(e).__name__, "-", e, file=sys.stderr)
+                # full jitter: uniform in [0, base · 2^attempt], capped
+                await asyncio.sleep(random.uniform(
+                    0, min(self.max_backoff, self.backoff * 2 ** attempt)))
+
+    async def label_all(self, records, fout: JsonlWriter) -> int:
+        """
+        Label *records* concurrently, appending results to *fout* in input
+        order; each is committed once it and all before it are done.
+        """
+        async def one(art):
+            labelled = await self.ask(build_prompt(art))
+            labelled["id"] = article_id(art)
+            return labelled
+
+        failed = 0
+        tasks = [asyncio.ensure_future(one(art)) for art in records]
+        for task in tqdm(tasks, desc="GPT-labelling"):
             try:
-                resp = openai.chat.completions.create(
-                    model="gpt-4o-mini",
-                    temperature=0,
-                    messages=[
-                        {"role": "system", "content": SYSTEM_MSG},
-                        {"role": "user",   "content": build_prompt(art)},
-                    ],
-                    timeout=30,
-                )
-                labelled = json.loads(resp.choices[0].message.content)
-                fout.write(json.dumps(labelled, ensure_ascii=False) + "\n")
-                break  # success
+                fout.write(await task)
+                fout.commit()
             except Exception as e:
-                print("error:", type(e).__name__, "-", e)
-                if attempt == 2:
-                    print("❌ gave up on:",
-                          get_headline(art)[:60], file=sys.stderr)
-                time.sleep(1.5)  # back-off and retry
+                failed += 1
+                print("❌ gave up on an article:", type(e).__name__, "-", e,
+                      file=sys.stderr)
+        return failed
+
+
+# ────────────────────────────────────────────────────────────
+#  5.  Main   (API key, client and input only when run)
+# ────────────────────────────────────────────────────────────
+def main(inp: Path = INP, out: Path = OUT, model: str = MODEL, concurrency: int = 8,
+         retries: int = 5, base_url: str | None = None,
+         cache_path: str | None = CACHE, timeout: float = 30.0,
+         fresh: bool = False) -> int:
+    import openai
+
+    api_key = os.getenv("OPENAI_API_KEY")
+    if not api_key:
+        if base_url is None:
+            sys.exit("❌ OPENAI_API_KEY env var not set")
+        api_key = "unused"  # local / mock endpoint
+    client = openai.AsyncOpenAI(api_key=api_key, base_url=base_url,
+                                timeout=timeout, max_retries=0)
+
+    ids, end = (set(), None) if fresh else scan_output(out)
+    if None in ids:
+        print(f"❌ {out} has labels without an `id` (written before resume support); "
+              "pass --fresh to relabel it from scratch", file=sys.stderr)
+        return 2
+    todo = [art for art in read_records(inp) if article_id(art) not in ids]
+    if end:
+        print(f"↻ {len(ids)} articles already in {out}; {len(todo)} to go")
+
+    cache = KVCache(cache_path) if cache_path else None
+    labeller = Labeller(client, model, concurrency, retries, cache=cache)
+    with JsonlWriter(out, flush_every=1, resume_at=end) as fout:
+        failed = asyncio.run(labeller.label_all(todo, fout))
+    if cache:
+        print(f"📦 {cache.stats()}; {labeller.requests} API requests")
+        cache.close()
+    if failed:
+        print(f"❌ {failed} articles failed; re-run to retry them")
+        return 1
+    print(f"✅ wrote GPT dev gold → {out}")
+    return 0
+
 
-print(f"✅ wrote GPT dev gold → {OUT}")
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser()
+    ap.add_argument("input", nargs="?", type=Path, default=INP)
+    ap.add_argument("output", nargs="?", type=Path, default=OUT)
+    ap.add_argument("--model", default=MODEL)
+    ap.add_argument("--concurrency", type=int, default=8,
+                    help="requests in flight at once")
+    ap.add_argument("--retries", type=int, default=5)
+    ap.add_argument("--base-url", default=os.getenv("OPENAI_BASE_URL"),
+                    help="OpenAI-compatible endpoint (default: api.openai.com)")
+    ap.add_argument("--cache", default=CACHE)
+    ap.add_argument("--no-cache", action="store_true")
+    ap.add_argument("--fresh", action="store_true",
+                    help="overwrite OUTPUT instead of resuming it")
+    args = ap.parse_args()
+    sys.exit(main(args.input, args.output, args.model, args.concurrency, args.retries,
+                  args.base_url, None if args.no_cache else args.cache,
+                  fresh=args.fresh))
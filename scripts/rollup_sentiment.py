@@ -0,0 +1,59 @@
+#!/usr/bin/env python3
+"""
+rollup_sentiment.py
+-------------------
+Merge article-level output into the daily ticker / sector sentiment index
+(common.rollup): per (ticker, date) and (sector, date) label counts,
+confidence sums and weighted scores.
+
+The index only grows: articles already in it (by content ID) are skipped,
+so after a daily `--incremental` run of the pipeline the same command adds
+just the new days, without recomputing history.  Several final files
+(e.g. one per month) can be merged into one index.
+
+Usage
+-----
+    python -m scripts.rollup_sentiment data/news_final_10k.jsonl.gz \
+        [--index data/sentiment_index.db]
+    python -m common.rollup series ticker AAPL --days 90
+"""
+from __future__ import annotations
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+from tqdm import tqdm
+
+from common.records import read_records
+from common.rollup import INDEX_PATH, SentimentIndex
+
+
+def run(inputs, index_path: str = INDEX_PATH) -> tuple:
+    added = skipped = 0
+    with SentimentIndex(index_path) as idx:
+        for path in inputs:
+            with tqdm(desc=f"Rolling up {Path(path).name}", unit="art") as bar:
+                a, s = idx.ingest(read_records(path), progress=bar)
+            added, skipped = added + a, skipped + s
+        stats = idx.stats()
+    return added, skipped, stats
+
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser()
+    ap.add_argument("inputs", nargs="+", type=Path,
+                    help="news_final_*.jsonl(.gz) / .parquet / .arrow")
+    ap.add_argument("--index", default=INDEX_PATH)
+    args = ap.parse_args()
+    for p in args.inputs:
+        if not p.exists():
+            sys.exit(f"❌ {p} not found")
+
+    t0 = time.perf_counter()
+    added, skipped, stats = run(args.inputs, args.index)
+    print(f"↻ {skipped:,} articles already in the index")
+    print(f"⏱ {added:,} articles merged in {time.perf_counter() - t0:.1f} s")
+    print(f"✅ {args.index}: {stats['articles']:,} articles, {stats['tickers']:,} tickers, "
+          f"{stats['sectors']:,} sectors, {stats['first']} – {stats['last']}")
@@ -7,17 +7,33 @@ Create a *deterministic* 10 000-article subset from the full
 seed.  Re-run at any time and you will get **exactly the same 10 000 rows**,
 so the dev-gold set and the evaluation script always match.
 
+If the input is block-gzip with an index (common.blockgz), the reservoir's
+random draws are replayed over record *numbers* and only the k winners are
+decompressed — same rows, without reading the corpus from byte 0.
+
 Usage
 -----
-    python scripts/sample_10k.py                           # default 10 k
-    python scripts/sample_10k.py --k 5000 --seed 123       # other size
-    python scripts/sample_10k.py --in  myfile.jsonl.gz \
+    python -m scripts.sample_10k                           # default 10 k
+    python -m scripts.sample_10k --k 5000 --seed 123       # other size
+    python -m scripts.sample_10k --in  myfile.jsonl.gz \
                                  --out data/sample.jsonl.gz
 """
 
 from __future__ import annotations
-import gzip, random, argparse, pathlib
+import random, argparse, pathlib
 from tqdm.auto import tqdm
+from common.blockgz import BlockGzipFile, is_indexed
+from common.records import open_writer, read_lines
+
+
+def reservoir_indices(n: int, k: int, rnd: random.Random) -> list[int]:
+    """Record numbers the streaming reservoir below would keep, in slot order."""
+    picks = list(range(min(n, k)))
+    for i in range(k, n):
+        j = rnd.randint(0, i)
+        if j < k:
+            picks[j] = i
+    return picks
 
 
 def reservoir_sample(in_path: pathlib.Path,
@@ -30,22 +46,28 @@ def reservoir_sample(in_path: pathlib.Path,
     Deterministic because we pass an explicit RNG seed.
     """
     rnd = random.Random(seed)
-    reservoir: list[str] = []
-
-    opener = gzip.open if in_path.suffix == ".gz" else open
-    with opener(in_path, "rt", encoding="utf-8") as fin:
-        for i, line in enumerate(tqdm(fin, desc=f"Sampling {k:,}",
-                                      total=total_hint)):
-            if i < k:
-                reservoir.append(line)
-            else:
-                j = rnd.randint(0, i)
-                if j < k:
-                    reservoir[j] = line
-
-    out_path.parent.mkdir(parents=True, exist_ok=True)
-    with gzip.open(out_path, "wt", encoding="utf-8") as fout:
-        fout.writelines(reservoir)
+    reservoir: list[bytes] = []
+
+    if is_indexed(in_path):
+        with BlockGzipFile(in_path) as bg:
+            reservoir = bg.get_many(reservoir_indices(bg.count(), k, rnd))
+        with open_writer(out_path) as fout:
+            fout.write_lines(reservoir)
+        print(f"✅ Wrote exactly {len(reservoir):,} articles → {out_path}")
+        return
+
+    # raw lines: sampling never needs to decode a record
+    for i, line in enumerate(tqdm(read_lines(in_path), desc=f"Sampling {k:,}",
+                                  total=total_hint)):
+        if i < k:
+            reservoir.append(line)
+        else:
+            j = rnd.randint(0, i)
+            if j < k:
+                reservoir[j] = line
+
+    with open_writer(out_path) as fout:
+        fout.write_lines(reservoir)
 
     print(f"✅ Wrote exactly {k:,} articles → {out_path}")
 
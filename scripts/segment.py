@@ -1,15 +1,24 @@
 #!/usr/bin/env python3
-import json
-import gzip
+"""
+Sentence segmentation: tidy headline and body, split the body into
+sentences with --splitter (nlp.sentence_splitter: punkt, the default, or
+the faster rule-based splitter).
+
+With --n-process N, batches of articles are segmented by N spawned workers
+(each loading the splitter once) and written back in input order; the
+output is identical to a single-process run.
+"""
+import argparse
 import re
 import html
 import unicodedata
-import nltk
-import sys
+from contextlib import ExitStack
 from tqdm.auto import tqdm
-
-# Load sentence tokenizer
-sent_tok = nltk.data.load('tokenizers/punkt/english.pickle')
+from common import checkpoint, parallel
+from common.checkpoint import Checkpoint
+from common.incremental import content_id
+from common.records import read_records
+from nlp.sentence_splitter import SPLITTERS
 
 
 def tidy(txt: str) -> str:
@@ -18,36 +27,77 @@ def tidy(txt: str) -> str:
     - Collapse whitespace
     - Normalize Unicode to NFKC
     - Trim
+
+    Plain ASCII without an "&" has no entities to unescape and is already
+    NFKC, so it only gets the whitespace pass.
     """
+    if txt.isascii() and "&" not in txt:
+        return " ".join(txt.split())  # same as re.sub(r'\s+', ' ', …).strip()
     txt = html.unescape(txt)
     txt = re.sub(r'\s+', ' ', txt)
     return unicodedata.normalize('NFKC', txt).strip()
 
 
-def segment_file(input_path, output_path):
-    with gzip.open(input_path, 'rt', encoding='utf-8') as fin, \
-            gzip.open(output_path, 'wt', encoding='utf-8') as fout:
+def segment_article(art: dict, splitter: str = "punkt") -> dict:
+    """Attach the content `id` and tidied `sentences` list (headline first) to *art*."""
+    art["id"] = content_id(art)
+    # Clean headline and tag it
+    headline = tidy(art["headline"]) + " <HEADLINE>"
 
-        for line in tqdm(fin, desc="Segmenting articles"):
-            art = json.loads(line)
+    # Clean and split body
+    body_sents = [tidy(s) for s in SPLITTERS[splitter](
+        tidy(art["body"])) if s.strip()]
 
-            # Clean headline and tag it
-            headline = tidy(art["headline"]) + " <HEADLINE>"
+    # Attach sentence list
+    art["sentences"] = [headline] + body_sents
+    art["tickers"] = []  # Placeholder for tickers
+    return art
 
-            # Clean and split body
-            body_sents = [tidy(s) for s in sent_tok.tokenize(
-                tidy(art["body"])) if s.strip()]
 
-            # Attach sentence list
-            art["sentences"] = [headline] + body_sents
-            art["tickers"] = []  # Placeholder for tickers
+def segment_batch(arts: list, splitter: str = "punkt") -> list:
+    return [segment_article(art, splitter) for art in arts]
 
-            fout.write(json.dumps(art, ensure_ascii=False) + "\n")
 
+def _init_worker(splitter: str) -> None:
+    """Pool initializer: load the sentence splitter once per worker."""
+    SPLITTERS[splitter]("")
 
-if __name__ == "__main__":
-    if len(sys.argv) != 3:
-        print("Usage: python segment.py <infile.jsonl.gz> <outfile.jsonl.gz>")
-        sys.exit(1)
 
-    segment_file(sys.argv[1], sys.argv[2])
+def segment_file(input_path, output_path, resume=False,
+                 every=checkpoint.DEFAULT_EVERY, incremental=False,
+                 n_process=1, batch_size=200, splitter="punkt"):
+    with Checkpoint(input_path, output_path, resume, every,
+                    incremental=incremental) as fout, ExitStack() as stack:
+        arts = tqdm(read_records(input_path, start=fout.start),
+                    desc="Segmenting articles" + (f" ×{n_process}" if n_process > 1 else ""),
+                    initial=fout.start)
+        if n_process <= 1:
+            for art in arts:
+                if not fout.seen(art):
+                    fout.write(segment_article(art, splitter))
+                fout.advance()
+            return
+
+        pool = stack.enter_context(parallel.spawn_pool(n_process, _init_worker, (splitter,)))
+        batches = parallel.iter_batches(arts, fout, batch_size)
+        for consumed, done in parallel.ordered_map(pool, n_process, segment_batch,
+                                                   batches, splitter):
+            for art in done:
+                fout.write(art)
+            fout.advance(consumed)
+
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser(
+        usage="python -m scripts.segment <infile> <outfile>  "
+              "(.jsonl[.gz] / .parquet / .arrow)")
+    ap.add_argument("input")
+    ap.add_argument("output")
+    ap.add_argument("--splitter", choices=sorted(SPLITTERS), default="punkt",
+                    help="sentence splitter (default: punkt, the reference)")
+    ap.add_argument("--n-process", type=int, default=1,
+                    help="segmentation processes (default 1: in-process)")
+    checkpoint.add_arguments(ap)
+    args = ap.parse_args()
+    segment_file(args.input, args.output, args.resume, args.checkpoint_every,
+                 args.incremental, args.n_process, splitter=args.splitter)
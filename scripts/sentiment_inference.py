@@ -2,13 +2,56 @@
 """
 Batched sentiment inference with FinBERT, sub-batching to avoid OOM,
 with a tqdm progress bar showing articles processed.
+
+Sub-batches are either fixed-size chunks in article order (default) or,
+with --max-tokens, length-bucketed batches under a padded-token budget
+so short sentences do not pay for the padding of long ones.
+
+Predictions are memoised in a persistent sentence cache (cache/sentiment.db)
+so repeated boilerplate and re-runs over overlapping corpora skip the model.
+
+With --workers N the article stream is cut into shards of ARTICLE_BATCH_SIZE
+and scored by N processes, each with its own FinBERT and a share of the
+torch threads; the parent writes shards back in input order and keeps at
+most 2·N shards in flight.
+
+With --pipelined, reading/decoding, tokenisation, the forward pass and
+serialisation run as separate threads joined by bounded queues
+(common.stages.StagedExecutor), so I/O and tokenisation of neighbouring
+batches overlap the model; per-stage busy/idle times are printed at the end.
+It drives a single model, so it cannot be combined with --workers > 1.
+
+With --compact, predictions stay NumPy arrays end to end and each article
+gets two flat lists instead of a dict per sentence:
+    "sentiment_ids":  [0, 1, 2, …]     (0 NEG, 1 NEU, 2 POS)
+    "sentiment_conf": [82.1, 55.0, …]
+`aggregate_sentiment.py` accepts either form.
+
+Input and output may be JSONL(.gz), Parquet or Arrow IPC, picked by file
+extension (common.records); columnar outputs always store the compact form.
+
+JSONL(.gz) output is committed every --checkpoint-every articles
+(common.checkpoint); after a crash, --resume continues from the last commit
+and yields the same bytes as an uninterrupted run.  With --incremental the
+existing output is kept and only articles whose content ID it does not hold
+yet are scored and appended.
 """
-import gzip
-import json
-import sys
+import argparse
+import multiprocessing as mp
+import os
+import time
+from collections import defaultdict, deque
 from itertools import accumulate
+import torch
+import numpy as np
 from tqdm.auto import tqdm
-from models.finbert import FinBERT
+from common import checkpoint
+from common.checkpoint import Checkpoint
+from common.records import count_records, read_records
+from common.stages import StagedExecutor
+from models.batching import fixed_batches, token_budget_batches
+from models.finbert import BACKENDS, FinBERT
+from models.sentiment_cache import SentimentCache
 
 # Articles per batch and sub-batch size
 ARTICLE_BATCH_SIZE = 100
@@ -17,38 +60,305 @@ SUB_BATCH_SIZE = 32
 TOTAL_ARTICLES = 10445
 
 
-def main(in_path, out_path):
-    model = FinBERT()
-    with gzip.open(in_path, "rt", encoding="utf-8") as fin, \
-            gzip.open(out_path, "wt", encoding="utf-8") as fout:
+def main(in_path, out_path, max_tokens=None, cache_path=None,
+         cache_max_entries=5_000_000, backend="torch", workers=1, threads=None,
+         pipelined=False, compact=False, resume=False,
+         checkpoint_every=checkpoint.DEFAULT_EVERY, incremental=False):
+    if workers > 1 and pipelined:
+        raise ValueError("pipelined mode runs a single model; use workers=1")
+    if workers > 1:
+        return main_parallel(in_path, out_path, workers, threads, max_tokens,
+                             cache_path, cache_max_entries, backend, compact,
+                             resume, checkpoint_every, incremental)
+    if pipelined:
+        return main_pipelined(in_path, out_path, max_tokens, cache_path,
+                              cache_max_entries, backend, threads, compact,
+                              resume, checkpoint_every, incremental)
+    if threads:
+        torch.set_num_threads(threads)
+    model = FinBERT(backend=backend)
+    cache = (SentimentCache(cache_path, model.model_id, cache_max_entries)
+             if cache_path else None)
+    with Checkpoint(in_path, out_path, resume, checkpoint_every,
+                    incremental=incremental) as fout:
+
+        def flush(buffer):
+            fresh = [art for art in buffer if not fout.seen(art)]
+            if fresh:
+                process_batch(fresh, model, fout, max_tokens, cache, compact)
+            fout.advance(len(buffer))
 
         # Wrap the input stream with tqdm for progress
-        iterator = tqdm(fin, desc="Scoring sentiment", total=TOTAL_ARTICLES)
+        iterator = tqdm(read_records(in_path, start=fout.start),
+                        desc="Scoring sentiment", initial=fout.start,
+                        total=count_records(in_path) or TOTAL_ARTICLES)
 
         buffer = []
-        for line in iterator:
-            buffer.append(json.loads(line))
+        for art in iterator:
+            buffer.append(art)
             if len(buffer) >= ARTICLE_BATCH_SIZE:
-                process_batch(buffer, model, fout)
+                flush(buffer)
                 buffer.clear()
                 iterator.set_postfix_str(
                     f"Batches processed: {int(iterator.n / ARTICLE_BATCH_SIZE)}")
 
         # Handle remainder
         if buffer:
-            process_batch(buffer, model, fout)
+            flush(buffer)
 
+    if cache:
+        print(f"📦 {cache.stats()}")
+        cache.close()
     print(f"✅ Wrote sentiment-scored articles to {out_path}")
 
 
-def process_batch(arts, model, fout):
+# ---------------------------------------------------------------------------
+# Multi-process mode
+# ---------------------------------------------------------------------------
+
+
+_worker = {}
+
+
+def _init_worker(threads, max_tokens, cache_path, cache_max_entries, backend,
+                 compact):
+    """Pool initializer: one FinBERT (and cache handle) per process."""
+    torch.set_num_threads(threads)
+    model = FinBERT(device="cpu", backend=backend)
+    _worker["model"] = model
+    _worker["max_tokens"] = max_tokens
+    _worker["compact"] = compact
+    _worker["cache"] = (SentimentCache(cache_path, model.model_id, cache_max_entries)
+                        if cache_path else None)
+
+
+def _score_shard(arts):
+    """Score one shard of articles; returns the scored shard + timing."""
+    t0 = time.perf_counter()
+    if arts:
+        score_articles(arts, _worker["model"], _worker["max_tokens"],
+                       _worker["cache"], _worker["compact"])
+    n_sents = sum(len(art["sentences"]) for art in arts)
+    return arts, os.getpid(), len(arts), n_sents, time.perf_counter() - t0
+
+
+def main_parallel(in_path, out_path, workers, threads=None, max_tokens=None,
+                  cache_path=None, cache_max_entries=5_000_000, backend="torch",
+                  compact=False, resume=False,
+                  checkpoint_every=checkpoint.DEFAULT_EVERY, incremental=False):
+    threads = threads or max(1, (os.cpu_count() or 1) // workers)
+    # pid → [articles, sentences, busy seconds]
+    per_worker = defaultdict(lambda: [0, 0, 0.0])
+    t_start = time.perf_counter()
+
+    ctx = mp.get_context("spawn")
+    with ctx.Pool(workers, _init_worker,
+                  (threads, max_tokens, cache_path, cache_max_entries, backend,
+                   compact)) as pool, \
+            Checkpoint(in_path, out_path, resume, checkpoint_every,
+                       incremental=incremental) as fout, \
+            tqdm(desc=f"Scoring sentiment ×{workers}", initial=fout.start,
+                 total=count_records(in_path) or TOTAL_ARTICLES) as bar:
+
+        pending = deque()
+
+        def drain_one():
+            result, consumed = pending.popleft()
+            arts, pid, n_arts, n_sents, busy = result.get()
+            for art in arts:
+                fout.write(art)
+            fout.advance(consumed)
+            stats = per_worker[pid]
+            stats[0] += n_arts
+            stats[1] += n_sents
+            stats[2] += busy
+            bar.update(consumed)
+
+        for shard in read_batches(in_path, start=fout.start):
+            # bounded in-flight memory: wait for the oldest shard first
+            if len(pending) >= 2 * workers:
+                drain_one()
+            fresh = [art for art in shard if not fout.seen(art)]
+            pending.append((pool.apply_async(_score_shard, (fresh,)), len(shard)))
+        while pending:
+            drain_one()
+
+    wall = time.perf_counter() - t_start
+    total_sents = 0
+    for i, (pid, (n_arts, n_sents, busy)) in enumerate(sorted(per_worker.items()), 1):
+        total_sents += n_sents
+        print(f"  worker {i} (pid {pid}): {n_arts:,} articles, {n_sents:,} sentences, "
+              f"{n_sents / busy if busy else 0:.1f} sent/s")
+    print(f"⏱  {workers} workers × {threads} threads: "
+          f"{total_sents / wall:.1f} sent/s overall ({wall:.1f} s)")
+    print(f"✅ Wrote sentiment-scored articles to {out_path}")
+
+
+# ---------------------------------------------------------------------------
+# Pipelined mode
+# ---------------------------------------------------------------------------
+
+
+def read_batches(in_path, size=ARTICLE_BATCH_SIZE, start=0):
+    """Yield lists of *size* decoded articles, skipping the first *start*."""
+    batch = []
+    for art in read_records(in_path, start=start):
+        batch.append(art)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def main_pipelined(in_path, out_path, max_tokens=None, cache_path=None,
+                   cache_max_entries=5_000_000, backend="torch", threads=None,
+                   compact=False, resume=False,
+                   checkpoint_every=checkpoint.DEFAULT_EVERY, incremental=False):
+    if threads:
+        torch.set_num_threads(threads)
+    model = FinBERT(backend=backend)
+    cache = (SentimentCache(cache_path, model.model_id, cache_max_entries)
+             if cache_path else None)
+
+    def tokenize(batch):
+        # runs in one thread, in input order, so seen() stays deterministic
+        arts = [art for art in batch if not fout.seen(art)]
+        sents = [s for art in arts for s in art["sentences"]]
+        known = cache.get_many(sents) if cache else {}
+        todo = list(dict.fromkeys(s for s in sents if s not in known))
+        plan = plan_batches(todo, model, max_tokens) if todo else []
+        encs = [model.encode([todo[i] for i in idx]) for idx in plan]
+        return {"arts": arts, "consumed": len(batch), "sents": sents,
+                "known": known, "todo": todo, "plan": plan, "encs": encs}
+
+    def infer(job):
+        fresh = {}
+        for idx, enc in zip(job.pop("plan"), job.pop("encs")):
+            for i, p in zip(idx, model.to_dicts(model.forward(enc))):
+                fresh[job["todo"][i]] = p
+        job["fresh"] = fresh
+        return job
+
+    with Checkpoint(in_path, out_path, resume, checkpoint_every,
+                    incremental=incremental) as fout, \
+            tqdm(desc="Scoring sentiment (pipelined)", initial=fout.start,
+                 total=count_records(in_path) or TOTAL_ARTICLES) as bar:
+
+        def write(job):
+            known, sents = job["known"], job["sents"]
+            if cache and job["fresh"]:
+                cache.put_many(job["fresh"])
+            known.update(job["fresh"])
+            start = 0
+            for art in job["arts"]:
+                end = start + len(art["sentences"])
+                preds = [known[s] for s in sents[start:end]]
+                if compact:
+                    art["sentiment_ids"] = [model.label2id[p["label"]] for p in preds]
+                    art["sentiment_conf"] = [p["confidence"] for p in preds]
+                else:
+                    art["sentiments"] = preds
+                fout.write(art)
+                start = end
+            fout.advance(job["consumed"])
+            bar.update(job["consumed"])
+
+        executor = StagedExecutor(read_batches(in_path, start=fout.start),
+                                  [("tokenize", tokenize), ("model", infer)],
+                                  sink=("write", write))
+        executor.run()
+
+    print(executor.report())
+    if cache:
+        print(f"📦 {cache.stats()}")
+        cache.close()
+    print(f"✅ Wrote sentiment-scored articles to {out_path}")
+
+
+def plan_batches(sents, model, max_tokens=None):
+    """Index batches for *sents*: token-budget buckets or fixed chunks."""
+    if max_tokens:
+        return token_budget_batches(model.token_lengths(sents), max_tokens)
+    return fixed_batches(len(sents), SUB_BATCH_SIZE)
+
+
+def score_sentences(sents, model, max_tokens=None, cache=None):
+    """
+    Score a flat sentence list, returning predictions in input order.
+    With *max_tokens* the sentences are bucketed by tokenized length;
+    with *cache* only unique, previously unseen sentences reach the model.
+    """
+    if cache is not None:
+        known = cache.get_many(sents)
+        todo = list(dict.fromkeys(s for s in sents if s not in known))
+        if todo:
+            fresh = dict(zip(todo, score_sentences(todo, model, max_tokens)))
+            cache.put_many(fresh)
+            known.update(fresh)
+        return [known[s] for s in sents]
+
+    scores = [None] * len(sents)
+    for idx in plan_batches(sents, model, max_tokens):
+        preds = model.predict([sents[i] for i in idx])
+        # Scatter back to original positions
+        for i, p in zip(idx, preds):
+            scores[i] = p
+    return scores
+
+
+def score_sentences_arrays(sents, model, max_tokens=None, cache=None):
+    """
+    Array form of score_sentences():
+    returns (label ids int8[n], confidences float64[n]) in input order.
+    """
+    ids = np.empty(len(sents), dtype=np.int8)
+    conf = np.empty(len(sents), dtype=np.float64)
+    todo = range(len(sents))
+    if cache is not None:
+        known = cache.get_many(sents)
+        todo = []
+        for i, s in enumerate(sents):
+            p = known.get(s)
+            if p is None:
+                todo.append(i)
+            else:
+                ids[i] = model.label2id[p["label"]]
+                conf[i] = p["confidence"]
+
+    sub = [sents[i] for i in todo]
+    todo = np.asarray(todo, dtype=np.int64)
+    for idx in plan_batches(sub, model, max_tokens):
+        b_ids, b_conf = model.predict_arrays([sub[i] for i in idx])
+        # Scatter back to original positions
+        ids[todo[idx]] = b_ids
+        conf[todo[idx]] = b_conf
+
+    if cache is not None and len(todo):
+        cache.put_many({sents[i]: {"label": model.id2label[int(ids[i])],
+                                   "confidence": float(conf[i])}
+                        for i in todo.tolist()})
+    return ids, conf
+
+
+def score_articles(arts, model, max_tokens=None, cache=None, compact=False):
+    """
+    Attach predictions to every article in *arts* (in place): a `sentiments`
+    list of dicts, or `sentiment_ids` / `sentiment_conf` lists if *compact*.
+    """
     # Flatten sentences
     all_sents = [s for art in arts for s in art["sentences"]]
-    all_scores = []
-    # Sub-batch to avoid OOM
-    for i in range(0, len(all_sents), SUB_BATCH_SIZE):
-        sub = all_sents[i: i+SUB_BATCH_SIZE]
-        all_scores.extend(model.predict(sub))
+    if compact:
+        ids, conf = score_sentences_arrays(all_sents, model, max_tokens, cache)
+        start = 0
+        for art in arts:
+            end = start + len(art["sentences"])
+            art["sentiment_ids"] = ids[start:end].tolist()
+            art["sentiment_conf"] = conf[start:end].tolist()
+            start = end
+        return arts
+
+    all_scores = score_sentences(all_sents, model, max_tokens, cache)
 
     # Split scores back into articles
     lengths = [len(art["sentences"]) for art in arts]
@@ -56,12 +366,46 @@ def process_batch(arts, model, fout):
     start = 0
     for art, end in zip(arts, splits):
         art["sentiments"] = all_scores[start:end]
-        fout.write(json.dumps(art, ensure_ascii=False) + "\n")
         start = end
+    return arts
+
+
+def process_batch(arts, model, fout, max_tokens=None, cache=None, compact=False):
+    for art in score_articles(arts, model, max_tokens, cache, compact):
+        fout.write(art)
 
 
 if __name__ == "__main__":
-    if len(sys.argv) != 3:
-        print("Usage: sentiment_inference.py <in.jsonl.gz> <out.jsonl.gz>")
-        sys.exit(1)
-    main(sys.argv[1], sys.argv[2])
+    ap = argparse.ArgumentParser()
+    ap.add_argument("input", help="news_tickers_*_sector (.jsonl.gz / .parquet / .arrow)")
+    ap.add_argument("output", help="news_sentiment_* (.jsonl.gz / .parquet / .arrow)")
+    ap.add_argument("--max-tokens", type=int, default=None,
+                    help="padded-token budget per sub-batch "
+                         "(enables length-bucketed batching, e.g. 4096)")
+    ap.add_argument("--cache", default="cache/sentiment.db",
+                    help="SQLite sentence cache (default cache/sentiment.db)")
+    ap.add_argument("--no-cache", action="store_true",
+                    help="always run the model, bypassing the cache")
+    ap.add_argument("--cache-max-entries", type=int, default=5_000_000,
+                    help="LRU cap on cached sentences")
+    ap.add_argument("--backend", choices=BACKENDS, default="torch",
+                    help="FinBERT runtime: fp32 torch, dynamic int8, or ONNX Runtime")
+    ap.add_argument("--workers", type=int, default=1,
+                    help="scoring processes, each with its own model (default 1)")
+    ap.add_argument("--threads", type=int, default=None,
+                    help="torch threads per process (default: cores / workers)")
+    ap.add_argument("--pipelined", action="store_true",
+                    help="overlap I/O, tokenisation and the forward pass in "
+                         "separate threads and report per-stage busy time")
+    ap.add_argument("--compact", action="store_true",
+                    help="write sentiment_ids / sentiment_conf arrays instead "
+                         "of one dict per sentence")
+    checkpoint.add_arguments(ap)
+    args = ap.parse_args()
+    if args.pipelined and args.workers > 1:
+        ap.error("--pipelined runs one model in one process; "
+                 "it cannot be combined with --workers > 1")
+    main(args.input, args.output, args.max_tokens,
+         None if args.no_cache else args.cache, args.cache_max_entries,
+         args.backend, args.workers, args.threads, args.pipelined, args.compact,
+         args.resume, args.checkpoint_every, args.incremental)
@@ -2,23 +2,24 @@
 """
 spot_check.py  (with TICKERS column)
 ------------------------------------
-(1)  python spot_check.py
+(1)  python -m scripts.spot_check
         → data/spot_check_20.tsv  (20 random rows)
 
 (2)  Fill 'gold_overall' and/or 'gold_sectors_json', then:
 
-        python spot_check.py --eval
+        python -m scripts.spot_check --eval
 """
 
 from __future__ import annotations
 import argparse, csv, json, random, pathlib
+from common.records import read_records
 
 DEV = pathlib.Path("data/dev_gold_200.jsonl")
 OUT = pathlib.Path("data/spot_check_20.tsv")
 
 
 def sample(n: int = 20):
-    records = [json.loads(l) for l in open(DEV, encoding="utf-8")]
+    records = list(read_records(DEV))
     picks = random.sample(records, n)
 
     with OUT.open("w", newline="", encoding="utf-8") as f:
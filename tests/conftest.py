@@ -0,0 +1,5 @@
+import sys
+from pathlib import Path
+
+# tests import the repo's packages (common, nlp, scripts) as `python -m` does
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
@@ -0,0 +1,60 @@
+"""Golden test: the batch aggregation engine reproduces aggregate_article."""
+import json
+
+import pytest
+
+from scripts.aggregate_sentiment import aggregate_article, aggregate_batch, load_ticker_map
+from scripts.bench_aggregate import synth_articles
+
+
+@pytest.fixture(scope="module")
+def t2s():
+    return load_ticker_map()
+
+
+@pytest.mark.parametrize("batch_size", [1, 7, 1000])
+def test_batch_matches_reference(t2s, batch_size):
+    arts = synth_articles(3000, t2s)
+    ref = [json.dumps(aggregate_article(art, t2s)) for art in arts]
+    got = [json.dumps(rec) for i in range(0, len(arts), batch_size)
+           for rec in aggregate_batch(arts[i:i + batch_size], t2s)]
+    assert got == ref
+
+
+def test_corner_cases(t2s):
+    tk = next(iter(t2s))
+    arts = [
+        # ragged arrays, integer confidences
+        {"sentences": ["H <HEADLINE>", "a"], "tickers": [], "sectors": {"Other": 1.0},
+         "sentiment_ids": [0, 2], "sentiment_conf": [70.0]},
+        {"sentences": ["H <HEADLINE>", "a"], "tickers": [tk], "sectors": {t2s[tk]: 1.0},
+         "ticker_mentions": [[1, 0]], "sentiment_ids": [2, 2], "sentiment_conf": [70, 81]},
+        # tie → NEG; mention-less sentence votes "Other"; mean on a half-way point
+        {"sentences": ["H <HEADLINE>", f"{tk} up", "flat"], "tickers": [tk],
+         "sectors": {t2s[tk]: 0.5, "Other": 0.5}, "ticker_mentions": [[1, 0]],
+         "sentiment_ids": [2, 0, 1], "sentiment_conf": [60.005, 82.345, 99.995]},
+        # more labels than sentences: sector votes stop at the last sentence
+        {"sentences": ["H <HEADLINE>"], "tickers": [], "sectors": {"Other": 1.0},
+         "sentiment_ids": [1, 1, 0], "sentiment_conf": [61.0, 62.0, 90.0]},
+    ]
+    ref = [json.dumps(aggregate_article(art, t2s)) for art in arts]
+    assert [json.dumps(rec) for rec in aggregate_batch(arts, t2s)] == ref
+
+
+def test_no_sentiments_fails_like_reference(t2s):
+    art = {"sentences": ["H <HEADLINE>"], "tickers": [], "sectors": {"Other": 1.0},
+           "sentiment_ids": [], "sentiment_conf": []}
+    with pytest.raises(IndexError):
+        aggregate_article(art, t2s)
+    with pytest.raises(IndexError):
+        aggregate_batch([art], t2s)
+
+
+def test_mention_past_the_last_sentence_fails_like_reference(t2s):
+    tk = next(iter(t2s))
+    art = {"sentences": ["H <HEADLINE>", "a"], "tickers": [tk], "sectors": {t2s[tk]: 1.0},
+           "ticker_mentions": [[2, 0]], "sentiment_ids": [2, 2], "sentiment_conf": [70.0, 81.0]}
+    with pytest.raises(IndexError):
+        aggregate_article(art, t2s)
+    with pytest.raises(IndexError):
+        aggregate_batch([art], t2s)
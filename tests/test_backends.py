@@ -0,0 +1,59 @@
+"""FinBERT backend parity: int8 / onnx against the fp32 torch reference."""
+import os
+
+import pytest
+
+pytest.importorskip("torch")
+pytest.importorskip("transformers")
+
+from models.finbert import ONNX_PATH, FinBERT  # noqa: E402
+
+SENTENCES = [
+    "Shares of Acme rose 12% after record quarterly earnings.",
+    "The company cut its full-year guidance and its stock plunged.",
+    "The board will meet on Tuesday.",
+    "Revenue grew strongly, beating analyst estimates.",
+    "Losses widened as demand collapsed in Europe.",
+    "The bank reported net interest income in line with last year.",
+    "Regulators fined the firm $2 billion for misconduct.",
+    "Margins improved thanks to lower input costs.",
+    "The CEO will step down at the end of the month.",
+    "Sales were flat compared with the previous quarter.",
+    "The airline filed for bankruptcy protection.",
+    "Analysts upgraded the stock to buy.",
+]
+MAX_LABEL_FLIPS = 1      # of len(SENTENCES)
+MAX_CONF_DRIFT = 5.0     # percentage points, on sentences whose label agrees
+
+
+def _load(backend):
+    try:
+        return FinBERT(device="cpu", backend=backend)
+    except OSError as e:  # weights not in the local cache and no network
+        pytest.skip(f"FinBERT weights unavailable: {e}")
+
+
+@pytest.fixture(scope="module")
+def reference():
+    return _load("torch").predict(SENTENCES)
+
+
+@pytest.mark.parametrize("backend", ["int8", "onnx"])
+def test_backend_parity(backend, reference):
+    if backend == "onnx":
+        pytest.importorskip("onnxruntime")
+        if not os.path.exists(ONNX_PATH):
+            pytest.skip(f"{ONNX_PATH} missing; run `python -m models.export_onnx`")
+    preds = _load(backend).predict(SENTENCES)
+    flips = [s for s, p, r in zip(SENTENCES, preds, reference) if p["label"] != r["label"]]
+    assert len(flips) <= MAX_LABEL_FLIPS, flips
+    drift = max(abs(p["confidence"] - r["confidence"])
+                for p, r in zip(preds, reference) if p["label"] == r["label"])
+    assert drift <= MAX_CONF_DRIFT
+
+
+def test_array_and_dict_forms_agree(reference):
+    model = _load("torch")
+    ids, conf = model.predict_arrays(SENTENCES)
+    assert [model.id2label[i] for i in ids.tolist()] == [r["label"] for r in reference]
+    assert conf.tolist() == [r["confidence"] for r in reference]
@@ -0,0 +1,21 @@
+"""blockgz.convert: index line numbers are record numbers."""
+import gzip
+import json
+
+from common.blockgz import BlockGzipFile, convert, is_indexed
+from common.records import read_records
+
+
+def test_convert_drops_blank_lines(tmp_path):
+    recs = [{"id": f"{i:032x}", "n": i} for i in range(50)]
+    lines = [json.dumps(r).encode() for r in recs]
+    body = b"\n".join(l + (b"\n\n" if i % 7 == 0 else b"") for i, l in enumerate(lines))
+    path = tmp_path / "news.jsonl.gz"
+    with gzip.open(path, "wb") as f:
+        f.write(b"\n" + body.replace(lines[3], b"  \r\n" + lines[3]))   # no final newline
+    convert(path)
+    assert is_indexed(path)
+    assert list(read_records(path)) == recs
+    with BlockGzipFile(path) as bg:
+        assert bg.count() == len(recs)
+        assert [json.loads(l) for l in bg.get_many([0, 3, 49])] == [recs[0], recs[3], recs[49]]
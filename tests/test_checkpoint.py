@@ -0,0 +1,86 @@
+"""Checkpoint / --incremental: one dedup rule in both modes, `.ids` only when needed."""
+import pytest
+
+from common.checkpoint import Checkpoint
+from common.incremental import content_id, ids_path
+from common.records import JsonlWriter, read_records
+
+
+def _write(path, ids):
+    with JsonlWriter(path) as fout:
+        for i in ids:
+            fout.write({"id": f"{i:032x}", "headline": f"H{i}"})
+
+
+def _run(inp, out, incremental=False, resume=False, every=2, crash_after=None):
+    with Checkpoint(inp, out, resume, every, incremental=incremental) as ckpt:
+        for n, art in enumerate(read_records(inp, start=ckpt.start), ckpt.start):
+            if n == crash_after:
+                raise RuntimeError("crash")
+            if not ckpt.seen(art):
+                ckpt.write(art)
+            ckpt.advance()
+
+
+def _ids(path):
+    return [int(r["id"], 16) for r in read_records(path)]
+
+
+@pytest.mark.parametrize("suffix", [".jsonl", ".jsonl.gz"])
+def test_full_and_incremental_agree_on_duplicates(tmp_path, suffix):
+    inp = tmp_path / "in.jsonl"
+    _write(inp, [1, 2, 1, 3])
+    full, inc = tmp_path / f"full{suffix}", tmp_path / f"inc{suffix}"
+    _run(inp, full)
+    _run(inp, inc, incremental=True)
+    assert _ids(full) == _ids(inc) == [1, 2, 1, 3]
+    assert not ids_path(full).exists()
+    assert ids_path(inc).exists()
+
+
+def test_incremental_appends_only_the_delta(tmp_path):
+    inp, out = tmp_path / "in.jsonl", tmp_path / "out.jsonl.gz"
+    _write(inp, [1, 2, 3])
+    _run(inp, out)                                 # full run: no `.ids`
+    _write(inp, [2, 3, 4, 5, 4])
+    _run(inp, out, incremental=True)               # rebuilds the index once
+    assert _ids(out) == [1, 2, 3, 4, 5, 4]
+    assert ids_path(out).read_text().split() == [f"{i:032x}" for i in [1, 2, 3, 4, 5, 4]]
+
+
+def test_incremental_resume_is_byte_identical(tmp_path):
+    inp = tmp_path / "in.jsonl"
+    _write(inp, [1, 2])
+    ref, out = tmp_path / "ref.jsonl.gz", tmp_path / "out.jsonl.gz"
+    for path in (ref, out):
+        _run(inp, path, incremental=True)
+    _write(inp, [2, 3, 4, 3, 5, 4])
+    _run(inp, ref, incremental=True)
+    with pytest.raises(RuntimeError):
+        _run(inp, out, incremental=True, crash_after=5)
+    _run(inp, out, resume=True)
+    assert out.read_bytes() == ref.read_bytes()
+    assert _ids(out) == [1, 2, 3, 4, 3, 5, 4]
+
+
+def test_records_without_id_are_indexed_by_content_hash(tmp_path):
+    inp, out = tmp_path / "in.jsonl", tmp_path / "out.jsonl"
+    arts = [{"headline": f"H{i}", "date": "2024-01-01", "body": f"B{i}"} for i in range(3)]
+    with JsonlWriter(inp) as fout:
+        for art in arts[:2]:
+            fout.write(art)
+    _run(inp, out, incremental=True)
+    assert ids_path(out).read_text().split() == [content_id(a) for a in arts[:2]]
+    with JsonlWriter(inp) as fout:
+        for art in arts:
+            fout.write(art)
+    _run(inp, out, incremental=True)
+    assert [r["headline"] for r in read_records(out)] == ["H0", "H1", "H2"]
+
+
+def test_content_id_needs_id_or_body():
+    art = {"headline": "H", "date": "2024-01-01", "body": "B"}
+    assert content_id({**art, "id": "x"}) == "x"
+    assert content_id(art) == content_id({**art, "sentences": ["H", "b"]})
+    with pytest.raises(ValueError):
+        content_id({"headline": "H", "sentences": ["H <HEADLINE>", "B"]})
@@ -0,0 +1,65 @@
+"""The default (aho) extraction engine against the spaCy reference."""
+import json
+from pathlib import Path
+
+import pytest
+
+from common import resources
+from common.records import read_records
+from scripts import extract_tickers as et
+
+FIXTURES = Path(__file__).parent / "fixtures"
+COMPANIES = json.loads((FIXTURES / "extract_companies.json").read_text())
+ARTICLES = FIXTURES / "extract_articles.jsonl"
+
+
+@pytest.fixture
+def engines(monkeypatch):
+    """extract_tickers over the fixture company dictionary, fresh resources."""
+    monkeypatch.setattr(resources, "refdata", lambda: None)
+    monkeypatch.setattr(resources, "company_dict", lambda: COMPANIES)
+    lazies = (et.company_matcher, et.regex_company_matcher, et.spacy_pipeline)
+    for lazy in lazies:
+        lazy.clear()
+    yield et
+    for lazy in lazies:
+        lazy.clear()
+
+
+def extract(engine):
+    arts = et.extract_batch(list(read_records(str(ARTICLES))), engine)
+    return {art["id"]: (art["tickers"], art["ticker_mentions"]) for art in arts}
+
+
+# the PhraseMatcher only sees the tokenizer, which en_core_web_sm shares
+# with a blank English pipeline; the model itself is optional here
+@pytest.mark.parametrize("model", ["en_core_web_sm", "blank:en"])
+def test_aho_matches_spacy(engines, monkeypatch, model):
+    if not model.startswith("blank:"):
+        pytest.importorskip(model)
+    monkeypatch.setattr(et, "SPACY_MODEL", model)
+    ref = extract("spacy")
+    got = extract("aho")
+    assert any(mentions for _, mentions in ref.values())
+    assert got == ref
+
+
+def test_aho_regex_differs_only_on_tokenization(engines, monkeypatch):
+    monkeypatch.setattr(et, "SPACY_MODEL", "blank:en")
+    ref = extract("spacy")
+    got = extract("aho-regex")
+    differ = {i for i in ref if got[i] != ref[i]}
+    assert differ and differ < set(ref)
+    for i in differ:  # regex tokens only ever find more (nlp.ticker_matcher)
+        assert set(got[i][0]) >= set(ref[i][0])
+
+
+def test_refdata_automaton_matches_spacy(engines, monkeypatch, tmp_path):
+    from common import refdata
+
+    sources = dict(refdata.SOURCES, company_dict=str(FIXTURES / "extract_companies.json"))
+    rd = refdata.RefData(refdata.build(tmp_path / "refdata.bin", sources))
+    monkeypatch.setattr(et, "SPACY_MODEL", "blank:en")
+    ref = extract("spacy")
+    monkeypatch.setattr(resources, "refdata", lambda: rd)
+    assert extract("aho") == ref
@@ -0,0 +1,59 @@
+"""The fused pipeline writes exactly what the staged commands write."""
+import hashlib
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+pytest.importorskip("torch")
+pytest.importorskip("transformers")
+
+from common.records import read_records  # noqa: E402
+from models.finbert import FinBERT  # noqa: E402
+from scripts import (aggregate_sentiment, enrich_articles, extract_tickers,  # noqa: E402
+                     fused_pipeline, sentiment_inference)
+
+SAMPLE = Path(__file__).parent / "fixtures" / "segmented_sample.jsonl"
+
+
+class HashedFinBERT(FinBERT):
+    """FinBERT's output path over probabilities hashed from each sentence (no weights)."""
+
+    def __init__(self, device=None, backend="torch"):
+        self.backend, self.device, self.model_id = backend, "cpu", "hashed"
+        self.id2label = {0: "NEG", 1: "NEU", 2: "POS"}
+        self.label2id = {v: k for k, v in self.id2label.items()}
+
+    def encode(self, texts):
+        return texts
+
+    def forward(self, texts):
+        raw = np.array([list(hashlib.sha256(t.encode()).digest()[:3]) for t in texts],
+                       dtype=np.float32).reshape(-1, 3) + 1
+        return raw / raw.sum(axis=-1, keepdims=True)
+
+    def token_lengths(self, texts):
+        return [len(t.split()) + 2 for t in texts]
+
+
+@pytest.fixture
+def model(monkeypatch):
+    for module in (sentiment_inference, fused_pipeline):
+        monkeypatch.setattr(module, "FinBERT", HashedFinBERT)
+
+
+@pytest.mark.parametrize("suffix", [".jsonl", ".jsonl.gz"])
+def test_fused_matches_staged(tmp_path, model, suffix):
+    inp = str(SAMPLE)
+    t = {name: str(tmp_path / f"{name}{suffix}")
+         for name in ("tickers", "sector", "sentiment", "staged", "fused")}
+    extract_tickers.run(inp, t["tickers"])
+    enrich_articles.main(t["tickers"], t["sector"])
+    sentiment_inference.main(t["sector"], t["sentiment"])
+    aggregate_sentiment.run(t["sentiment"], t["staged"])
+    fused_pipeline.main(Path(inp), Path(t["fused"]))
+
+    staged = list(read_records(t["staged"]))
+    assert len(staged) == sum(1 for _ in read_records(inp))
+    assert any(rec["tickers"] for rec in staged)
+    assert list(read_records(t["fused"])) == staged
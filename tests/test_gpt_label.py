@@ -0,0 +1,133 @@
+"""gpt_label_dev against a local mock server: order, retries, resume, cache."""
+import asyncio
+import json
+from types import SimpleNamespace
+
+import pytest
+
+pytest.importorskip("openai")
+
+from common.records import JsonlWriter, read_records  # noqa: E402
+from scripts import gpt_label_dev  # noqa: E402
+from scripts.bench_gpt_label import mock_server  # noqa: E402
+
+
+def _sample(path, n):
+    with JsonlWriter(path) as fout:
+        for i in range(n):
+            fout.write({"headline": f"Headline {i}", "date": "2024-01-02",
+                        "sentences": [f"Headline {i} <HEADLINE>", f"Body {i}."]})
+
+
+@pytest.fixture
+def server():
+    servers = []
+
+    def start(fail_share=0.0, fail_status=429):
+        srv, stats = mock_server(0.0, fail_share, fail_status)
+        servers.append(srv)
+        return f"http://127.0.0.1:{srv.server_port}/v1", stats
+
+    yield start
+    for srv in servers:
+        srv.shutdown()
+
+
+def _label(inp, out, base_url, **kw):
+    return gpt_label_dev.main(inp, out, base_url=base_url, cache_path=None, **kw)
+
+
+@pytest.mark.parametrize("status,retried", [(429, True), (503, True),
+                                            (401, False), (400, False)])
+def test_only_transient_errors_are_retried(tmp_path, server, status, retried):
+    inp, out = tmp_path / "in.jsonl", tmp_path / "out.jsonl"
+    _sample(inp, 4)
+    base_url, stats = server(fail_share=1.0, fail_status=status)
+    rc = _label(inp, out, base_url, retries=3)
+    assert stats["requests"] == (8 if retried else 4)
+    assert rc == (0 if retried else 1)
+    assert len(list(read_records(out))) == (4 if retried else 0)
+
+
+def test_unparsable_answer_is_not_retried():
+    calls = []
+
+    async def create(**kw):
+        calls.append(kw)
+        msg = SimpleNamespace(content="not json")
+        return SimpleNamespace(choices=[SimpleNamespace(message=msg)])
+
+    client = SimpleNamespace(chat=SimpleNamespace(
+        completions=SimpleNamespace(create=create)))
+    labeller = gpt_label_dev.Labeller(client, retries=3)
+    with pytest.raises(json.JSONDecodeError):
+        asyncio.run(labeller.ask("HEADLINE: x\nARTICLE:\n"))
+    assert len(calls) == 1
+
+
+def test_output_without_ids_needs_fresh(tmp_path, server):
+    inp, out = tmp_path / "in.jsonl", tmp_path / "out.jsonl"
+    _sample(inp, 3)
+    old = json.dumps({"headline_summary": "Headline 0", "overall": {}}) + "\n"
+    out.write_text(old)
+    base_url, stats = server()
+    assert _label(inp, out, base_url) == 2
+    assert out.read_text() == old and stats["requests"] == 0
+
+    assert _label(inp, out, base_url, fresh=True) == 0
+    recs = list(read_records(out))
+    assert len(recs) == 3 and all(r["id"] for r in recs)
+
+
+def _article_ids(path):
+    return [gpt_label_dev.article_id(r) for r in read_records(path)]
+
+
+def _overall(path):
+    return {r["id"]: r["overall"] for r in read_records(path)}
+
+
+def test_concurrent_labels_match_sequential_in_input_order(tmp_path, server):
+    inp = tmp_path / "in.jsonl"
+    _sample(inp, 12)
+    base_url, _ = server(fail_share=0.2)          # back-off path runs too
+    assert _label(inp, tmp_path / "seq.jsonl", base_url, concurrency=1) == 0
+    assert _label(inp, tmp_path / "par.jsonl", base_url, concurrency=8) == 0
+    assert _overall(tmp_path / "par.jsonl") == _overall(tmp_path / "seq.jsonl")
+    assert [r["id"] for r in read_records(tmp_path / "par.jsonl")] == _article_ids(inp)
+
+
+def test_shared_headlines_are_both_labelled(tmp_path, server):
+    inp, out = tmp_path / "in.jsonl", tmp_path / "out.jsonl"
+    with JsonlWriter(inp) as fout:
+        for i in range(2):
+            fout.write({"headline": "Same", "sentences": ["Same <HEADLINE>", f"Body {i}."]})
+    base_url, _ = server()
+    assert _label(inp, out, base_url) == 0
+    assert [r["id"] for r in read_records(out)] == _article_ids(inp)
+
+
+def test_resume_after_a_torn_line(tmp_path, server):
+    inp, out = tmp_path / "in.jsonl", tmp_path / "out.jsonl"
+    _sample(inp, 10)
+    base_url, stats = server()
+    assert _label(inp, out, base_url) == 0
+    lines = out.read_bytes().splitlines(keepends=True)
+    out.write_bytes(b"".join(lines[:4]) + lines[4][:20])
+    before = stats["requests"]
+    assert _label(inp, out, base_url) == 0
+    assert stats["requests"] - before == 6
+    assert [r["id"] for r in read_records(out)] == _article_ids(inp)
+
+
+def test_cached_answers_make_no_requests(tmp_path, server):
+    inp = tmp_path / "in.jsonl"
+    _sample(inp, 5)
+    base_url, stats = server()
+    cache = str(tmp_path / "labels.db")
+    for name in ("cold.jsonl", "warm.jsonl"):
+        before = stats["requests"]
+        assert gpt_label_dev.main(inp, tmp_path / name, base_url=base_url,
+                                  cache_path=cache) == 0
+    assert stats["requests"] == before
+    assert _overall(tmp_path / "warm.jsonl") == _overall(tmp_path / "cold.jsonl")
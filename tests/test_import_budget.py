@@ -0,0 +1,52 @@
+"""Start-up budget: pipeline modules import fast and load nothing heavy."""
+import json
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+from scripts.bench_import import BUDGET_MS, MODULES, import_profile
+
+ROOT = Path(__file__).resolve().parents[1]
+HEAVY = ("spacy", "torch", "transformers", "nltk", "onnxruntime")
+
+
+def fresh_import(module: str) -> dict:
+    """sys.modules / resource state right after `import module` in a new interpreter."""
+    code = (f"import json, sys, {module}\n"
+            "from common import resources\n"
+            "print(json.dumps({'modules': sorted(sys.modules),"
+            " 'loaded': resources.loaded()}))")
+    proc = subprocess.run([sys.executable, "-c", code], cwd=ROOT,
+                          capture_output=True, text=True, check=True)
+    return json.loads(proc.stdout)
+
+
+@pytest.mark.parametrize("module", MODULES)
+def test_import_budget(module, monkeypatch):
+    monkeypatch.chdir(ROOT)
+    best_ms = min(import_profile(module)[module][1] for _ in range(3)) / 1000
+    assert best_ms < BUDGET_MS, f"{module} imports in {best_ms:.0f} ms"
+
+
+def test_ticker_extractor_loads_nothing_heavy():
+    state = fresh_import("nlp.ticker_extractor")
+    assert not [m for m in state["modules"] if m.split(".")[0] in HEAVY]
+    assert state["loaded"] == []           # no spaCy model, no refdata mapping
+    assert "common.refdata" not in state["modules"]
+
+
+def test_extract_tickers_maps_refdata_only_on_use():
+    state = fresh_import("scripts.extract_tickers")
+    assert not [m for m in state["modules"] if m.split(".")[0] in HEAVY]
+    assert state["loaded"] == []
+
+
+def test_ticker_extractor_nlp_attribute_loads_on_access(monkeypatch):
+    from nlp import ticker_extractor
+
+    monkeypatch.setattr(ticker_extractor, "load_nlp", lambda: "pipeline")
+    assert ticker_extractor.nlp == "pipeline"
+    with pytest.raises(AttributeError):
+        ticker_extractor.no_such_name
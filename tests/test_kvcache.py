@@ -0,0 +1,54 @@
+"""The shared SQLite key/value cache and the sentence cache built on it."""
+import sqlite3
+
+from common.kvcache import KVCache
+from models.sentiment_cache import SentimentCache
+
+
+def test_ttl_and_none_values(tmp_path):
+    cache = KVCache(str(tmp_path / "c.db"))
+    cache.put_many({"a": "Technology", "b": None})
+    cache.put("c", 1, ttl=-1)                      # already expired
+    assert cache.get_many(["a", "b", "c", "d"]) == {"a": "Technology", "b": None}
+    assert cache.get("c", "gone") == "gone"
+    assert cache.purge() == 1
+    cache.close()
+
+
+def test_size_counts_only_new_keys(tmp_path):
+    cache = KVCache(str(tmp_path / "c.db"), max_entries=3)
+    cache.put_many({"a": 1, "b": 2})
+    cache.put_many({"a": 3, "b": 2})
+    assert cache._size == 2
+    assert cache.get_many(["a"]) == {"a": 3}
+    cache.put_many({"c": 4, "d": 5})               # evicts "b", least recently used
+    assert cache._size == 3
+    assert set(cache.get_many("abcd")) == {"a", "c", "d"}
+    cache.close()
+
+
+def test_older_layout_is_discarded(tmp_path):
+    path = str(tmp_path / "c.db")
+    db = sqlite3.connect(path)
+    db.execute("CREATE TABLE entries (key BLOB PRIMARY KEY, label TEXT, confidence REAL,"
+               " last_used REAL)")
+    db.execute("INSERT INTO entries VALUES (x'00', 'POS', 90.0, 0)")
+    db.commit()
+    db.close()
+    cache = SentimentCache(path)
+    assert cache._size == 0
+    cache.close()
+
+
+def test_sentence_cache(tmp_path):
+    cache = SentimentCache(str(tmp_path / "s.db"), model_id="m")
+    cache.put_many({"Shares  rose.": {"label": "POS", "confidence": 97.1}})
+    got = cache.get_many(["Shares rose.", " Shares rose. ", "Shares fell."])
+    assert got == {"Shares rose.": {"label": "POS", "confidence": 97.1},
+                   " Shares rose. ": {"label": "POS", "confidence": 97.1}}
+    assert got["Shares rose."] is not got[" Shares rose. "]
+    assert (cache.hits, cache.misses) == (2, 1)
+    other = SentimentCache(str(tmp_path / "s.db"), model_id="other")
+    assert other.get_many(["Shares rose."]) == {}
+    cache.close()
+    other.close()
@@ -0,0 +1,58 @@
+"""ArticleIndex.search / query against a brute-force scan."""
+import random
+
+import pytest
+
+from common.postings import ArticleIndex, build
+from common.records import JsonlWriter
+from scripts.bench_postings import matches, random_query
+from scripts.bench_rollup import synth_records
+
+RECS = synth_records(3000, 365)
+_rng = random.Random(2)
+QUERIES = [random_query(_rng) for _ in range(150)] + [
+    {},                                                   # everything
+    {"ticker": "NONE"},                                   # unknown key
+    {"ticker": "AAPL", "sector": "Energy", "label": "NEG"},
+    {"start": "2024-03-01", "end": "2024-03-01"},         # one day
+    {"end": "2024-01-10"},                                # undated records excluded
+    {"start": "2030-01-01"},                              # past the last day
+    {"label": "POS", "min_conf": 99.99},
+]
+
+
+@pytest.fixture(scope="module", params=[".jsonl.gz", ".jsonl"])
+def index(tmp_path_factory, request):
+    path = tmp_path_factory.mktemp("postings") / f"news_final{request.param}"
+    with JsonlWriter(path) as fout:
+        for r in RECS:
+            fout.write(r)
+    build(path)
+    with ArticleIndex(path) as idx:
+        yield idx
+
+
+@pytest.mark.parametrize("q", QUERIES, ids=str)
+def test_search_matches_brute_force(index, q):
+    want = [i for i, r in enumerate(RECS) if matches(r, q)]
+    assert index.search(**q).tolist() == want
+
+
+def test_query_fetches_records_in_file_order(index):
+    q = {"sector": "Technology", "label": "NEU"}
+    want = [r for r in RECS if matches(r, q)]
+    assert want and index.query(**q) == want
+    assert index.query(limit=3, **q) == want[:3]
+    assert index.fetch([5, 0, 5]) == [RECS[5], RECS[0], RECS[5]]
+
+
+def test_stale_index_is_refused(tmp_path):
+    path = tmp_path / "news_final.jsonl"
+    with JsonlWriter(path) as fout:
+        fout.write(RECS[0])
+    build(path)
+    with JsonlWriter(path) as fout:
+        for r in RECS[:2]:
+            fout.write(r)
+    with pytest.raises(ValueError):
+        ArticleIndex(path)
@@ -0,0 +1,31 @@
+"""read_records position: consumed input, malformed lines included."""
+import json
+
+from common.checkpoint import manifest_path
+from common.records import read_records
+from scripts import enrich_articles
+
+LINES = [b'{"id": "a", "sentences": ["x"]}', b"{broken", b"",
+         b'{"id": "b", "sentences": ["y"]}', b"{also broken"]
+
+
+def test_position_counts_malformed_lines(tmp_path):
+    path = tmp_path / "in.jsonl"
+    path.write_bytes(b"\n".join(LINES) + b"\n")
+    errors = []
+    records = read_records(path, on_error=lambda i, e: errors.append(i))
+    seen = [(rec["id"], records.position) for rec in records]
+    assert seen == [("a", 1), ("b", 3)]
+    assert records.position == 4 and errors == [2, 5]   # physical line numbers
+
+    records = read_records(path, on_error=lambda i, e: None, start=2)
+    assert [rec["id"] for rec in records] == ["b"] and records.position == 4
+
+
+def test_enrich_commits_malformed_lines_as_consumed(tmp_path):
+    inp, out = tmp_path / "in.jsonl", tmp_path / "out.jsonl.gz"
+    inp.write_bytes(b"\n".join(LINES) + b"\n")
+    enrich_articles.main(str(inp), str(out), every=1)
+    manifest = json.loads(manifest_path(out).read_text())
+    assert manifest["records_in"] == 4 and manifest["records_out"] == 2
+    assert [r["id"] for r in read_records(out)] == ["a", "b"]
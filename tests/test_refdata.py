@@ -0,0 +1,63 @@
+"""refdata.bin: views agree with the text sources; freshness by size / mtime first."""
+import os
+import shutil
+
+import pytest
+
+from common import refdata
+
+
+@pytest.fixture
+def sources(tmp_path):
+    out = {}
+    for key, path in refdata.SOURCES.items():
+        if not os.path.exists(path):
+            pytest.skip(f"{path} missing")
+        out[key] = str(shutil.copy(path, tmp_path))
+    return out
+
+
+@pytest.fixture
+def rd(tmp_path, sources):
+    return refdata.RefData(refdata.build(tmp_path / "refdata.bin", sources))
+
+
+def test_views_match_text_sources(rd, sources):
+    master = set(refdata.parse_ticker_master(sources["ticker_master"]))
+    t2s = refdata.parse_ticker_sector(sources["ticker2sector"])
+    alt = refdata.parse_sector_map(sources["sector_map"])
+    companies = {n: t for n, t in refdata.parse_company_dict(sources["company_dict"]).items()
+                 if t}
+
+    wl = rd.whitelist()
+    assert set(wl) == master and len(wl) == len(master)
+    assert all(t in wl for t in master)
+    assert "NOT-A-TICKER" not in wl and 42 not in wl
+    assert dict(rd.ticker_sector()) == t2s and len(rd.ticker_sector()) == len(t2s)
+    assert dict(rd.ticker_sector(alt=True)) == alt
+    assert rd.company_dict() == companies
+    ts = rd.ticker_sector()
+    for t in list(t2s)[:50]:
+        assert ts[t] == ts.get(t) == t2s[t]
+    assert ts.get("NOT-A-TICKER", "Other") == "Other"
+    with pytest.raises(KeyError):
+        ts["NOT-A-TICKER"]
+    for i in range(0, rd.n_tickers, 97):
+        assert rd.ticker_id(rd.ticker(i)) == i
+
+
+def test_freshness_hashes_only_changed_files(rd, sources, monkeypatch):
+    calls = []
+    real = refdata._sha256
+    monkeypatch.setattr(refdata, "_sha256", lambda p: calls.append(p) or real(p))
+
+    assert rd.is_current(sources) and calls == []
+
+    path = sources["ticker_master"]
+    st = os.stat(path)
+    os.utime(path, ns=(st.st_atime_ns, st.st_mtime_ns + 10**9))   # touched only
+    assert rd.is_current(sources) and calls == [path]
+
+    with open(path, "a", encoding="utf-8") as f:
+        f.write("ZZZZQ\n")
+    assert not rd.is_current(sources)
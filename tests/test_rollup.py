@@ -0,0 +1,65 @@
+"""SentimentIndex: order-independent merges, dedup by id, brute-force totals."""
+import random
+from collections import defaultdict
+
+import pytest
+
+from common.rollup import SentimentIndex
+from scripts.bench_rollup import brute_force, dump, synth_records
+
+N_ARTICLES, N_DAYS = 2000, 60
+
+
+@pytest.fixture(scope="module")
+def recs():
+    return synth_records(N_ARTICLES, N_DAYS)
+
+
+@pytest.fixture
+def full(tmp_path, recs):
+    path = tmp_path / "full.db"
+    with SentimentIndex(str(path)) as idx:
+        assert idx.ingest(recs) == (N_ARTICLES, 0)
+    return path
+
+
+def test_day_by_day_equals_one_pass(tmp_path, recs, full):
+    by_day = defaultdict(list)
+    for r in recs:
+        by_day[r["date"] or ""].append(r)
+    rng = random.Random(1)
+    for day in sorted(by_day, reverse=True):
+        rng.shuffle(by_day[day])
+        with SentimentIndex(str(tmp_path / "daily.db")) as idx:
+            idx.ingest(by_day[day], batch_size=37)
+    assert dump(tmp_path / "daily.db") == dump(full)
+
+
+def test_reingest_skips_known_ids(recs, full):
+    before = dump(full)
+    with SentimentIndex(str(full)) as idx:
+        assert idx.ingest(recs) == (0, N_ARTICLES)
+        # a repeated id within one batch counts once
+        dup = {**recs[0], "id": "f" * 32}
+        assert idx.ingest([dup, dup]) == (1, 1)
+    assert dump(full) != before
+
+
+def test_records_without_id_are_rejected(full):
+    with SentimentIndex(str(full)) as idx:
+        with pytest.raises(ValueError):
+            idx.ingest([{"date": "2024-01-01", "overall": {"label": "POS"}}])
+
+
+@pytest.mark.parametrize("kind,key", [("ticker", "AAPL"), ("ticker", "T007"),
+                                      ("ticker", "NONE"), ("sector", "Technology"),
+                                      ("sector", "Energy")])
+def test_summary_matches_brute_force(recs, full, kind, key):
+    with SentimentIndex(str(full), readonly=True) as idx:
+        start, end = idx.resolve_range(days=30)
+        want = brute_force(recs, kind, key, start, end)
+        got = idx.summary(kind, key, start, end)
+        assert {k: got[k] for k in want} == want
+        days = idx.series(kind, key, start, end)
+        assert sum(d["articles"] for d in days) == want["articles"]
+        assert all(start <= d["date"] <= end for d in days)
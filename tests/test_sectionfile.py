@@ -0,0 +1,22 @@
+"""Section files: string tables round-trip, including empty strings."""
+import pytest
+
+from common.sectionfile import SectionFile, string_table, write
+
+MAGIC = b"TESTSEC\0"
+
+
+@pytest.mark.parametrize("items", [
+    [], [""], ["", ""], ["", "Energy", "Technology"], ["a", ""], ["ünïcode", "x y"],
+])
+def test_string_table_round_trips(tmp_path, items):
+    path = write(tmp_path / "t.bin", MAGIC, 1, {"names": string_table(items)})
+    f = SectionFile(path, MAGIC, 1)
+    assert f.strings("names") == items
+    f.close()
+
+
+def test_version_mismatch_is_refused(tmp_path):
+    path = write(tmp_path / "t.bin", MAGIC, 1, {"names": string_table(["a"])})
+    with pytest.raises(ValueError):
+        SectionFile(path, MAGIC, 2)
@@ -0,0 +1,111 @@
+"""SectorResolver against a local stand-in server: results, retries, cache."""
+import random
+
+import pytest
+
+pytest.importorskip("requests")
+
+from common.kvcache import KVCache  # noqa: E402
+from scripts.bench_sector_lookup import SECTORS, stand_in_server  # noqa: E402
+from scripts.build_ticker2sector import (JsonProvider, SectorResolver,  # noqa: E402
+                                         WikipediaProvider, YFinanceProvider)
+
+TICKERS = [f"T{i:03d}" for i in range(60)]
+
+
+@pytest.fixture(scope="module")
+def truth():
+    rng = random.Random(0)
+    json_ = {t: rng.choice(SECTORS) for t in TICKERS if rng.random() < 0.6}
+    yahoo = {t: rng.choice(SECTORS) for t in TICKERS if t not in json_ and rng.random() < 0.5}
+    wiki = {t: rng.choice(SECTORS) for t in TICKERS
+            if t not in json_ and t not in yahoo and rng.random() < 0.5}
+    return json_, yahoo, wiki
+
+
+@pytest.fixture
+def server(truth):
+    json_, yahoo, wiki = truth
+    srv, stats = stand_in_server(json_, wiki, 0.0, fail_share=0.1, yahoo=yahoo)
+    yield f"http://127.0.0.1:{srv.server_port}", stats
+    srv.shutdown()
+
+
+@pytest.fixture
+def providers(server):
+    base, _ = server
+    chain = [JsonProvider(base), YFinanceProvider(base)]
+    try:
+        import bs4  # noqa: F401
+        chain.append(WikipediaProvider(base + "/wiki"))
+    except ImportError:  # the wikipedia provider needs BeautifulSoup
+        pass
+    return chain
+
+
+@pytest.fixture
+def expected(truth, providers):
+    json_, yahoo, wiki = truth
+    if len(providers) < 3:
+        wiki = {}
+    return {t: json_.get(t) or yahoo.get(t) or wiki.get(t) for t in TICKERS}
+
+
+def _resolve(providers, path, workers=8, refresh=False):
+    cache = KVCache(str(path))
+    res = SectorResolver(providers, cache, workers, rates={p.name: 0 for p in providers})
+    got = res.resolve(TICKERS, refresh=refresh, progress=False)
+    cache.close()
+    return got, res
+
+
+def test_errors_are_retried_on_the_next_run(tmp_path, server, providers, expected):
+    _, stats = server
+    got, res = _resolve(providers, tmp_path / "s.db")
+    assert res.errors > 0
+    assert sum(got[t] != expected[t] for t in TICKERS) <= res.errors
+
+    got, res = _resolve(providers, tmp_path / "s.db")
+    assert got == expected and res.errors == 0
+
+    before = stats["requests"]
+    got, res = _resolve(providers, tmp_path / "s.db")
+    assert got == expected and stats["requests"] == before and res.fetched == 0
+
+
+def test_sequential_and_concurrent_agree(tmp_path, providers, expected):
+    for name, workers in (("seq.db", 1), ("par.db", 16)):
+        _resolve(providers, tmp_path / name, workers)  # first run: injected errors
+        got, _ = _resolve(providers, tmp_path / name, workers)
+        assert got == expected
+
+
+def test_expired_entries_are_refetched(tmp_path, server, providers, expected):
+    _, stats = server
+    for _ in range(2):
+        _resolve(providers, tmp_path / "s.db")
+    db = KVCache(str(tmp_path / "s.db"))
+    db.db.execute("UPDATE entries SET expires = 0")
+    db.close()
+    before = stats["requests"]
+    _resolve(providers, tmp_path / "s.db")
+    assert stats["requests"] - before >= len(TICKERS)
+
+
+def _fetch(provider, ticker):
+    """fetch(), past an injected 503 on the first request."""
+    try:
+        return provider.fetch(ticker)
+    except Exception as e:
+        assert e.response.status_code == 503
+        return provider.fetch(ticker)
+
+
+def test_yfinance_honours_base_url(server, truth):
+    base, _ = server
+    _, yahoo, _ = truth
+    yf = YFinanceProvider(base)
+    assert yf.base_url == base
+    for tk in list(yahoo)[:5]:
+        assert _fetch(yf, tk) == yahoo[tk]
+    assert _fetch(yf, "NOPE") is None  # 404 → no sector
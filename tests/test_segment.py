@@ -0,0 +1,75 @@
+"""Segmentation: tidy's ASCII fast path, the rule splitter, parallel runs."""
+import html
+import re
+import unicodedata
+
+import pytest
+
+from common.records import JsonlWriter, read_records
+from nlp.sentence_splitter import rule_split
+from scripts.segment import segment_file, tidy
+
+
+def tidy_reference(txt: str) -> str:
+    """tidy() before the ASCII fast path."""
+    txt = html.unescape(txt)
+    txt = re.sub(r'\s+', ' ', txt)
+    return unicodedata.normalize('NFKC', txt).strip()
+
+
+@pytest.mark.parametrize("text", [
+    "", "   ", "plain text", "  lead and trail  ", "tabs\tand\nnewlines\r\n",
+    "multiple     spaces", "\x0bvertical\x0cfeed\x1c\x1d\x1e\x1fseparators",
+    "AT&amp;T rose", "AT&T rose", "&nbsp;padded&nbsp;", "café – dash",
+    " no-break space", "ﬁligature ①", "full　width",
+    "&#x2009;thin&#8202;", "zero​width",
+])
+def test_tidy_fast_path_matches_reference(text):
+    assert tidy(text) == tidy_reference(text)
+
+
+@pytest.mark.parametrize("text,expected", [
+    ("Apple Inc. rose 3.5% in Q4. Shares of MSFT fell.",
+     ["Apple Inc. rose 3.5% in Q4.", "Shares of MSFT fell."]),
+    ("The U.S. economy grew. Rates held.", ["The U.S. economy grew.", "Rates held."]),
+    ("Mr. Smith met Dr. Jones on Jan. 5. They agreed.",
+     ["Mr. Smith met Dr. Jones on Jan. 5.", "They agreed."]),
+    ("J. P. Morgan said so. Markets rallied!", ["J. P. Morgan said so.", "Markets rallied!"]),
+    ("It ranked No. 2 in sales. He said no. Then left.",
+     ["It ranked No. 2 in sales.", "He said no.", "Then left."]),
+    ('"Buy," he said. "Sell?" she asked. (Nobody knew.) Done.',
+     ['"Buy," he said.', '"Sell?" she asked.', "(Nobody knew.)", "Done."]),
+    ("Shares hit $AAPL.US highs. $MSFT slid.", ["Shares hit $AAPL.US highs.", "$MSFT slid."]),
+    ("Revenue rose 12 pct. 2024 looks strong.", ["Revenue rose 12 pct. 2024 looks strong."]),
+    ("Wait... what? Yes!", ["Wait... what?", "Yes!"]),
+    ("no boundary here", ["no boundary here"]),
+    ("", []),
+])
+def test_rule_split(text, expected):
+    assert rule_split(text) == expected
+
+
+ARTICLES = [
+    {"headline": f"Headline {i} &amp; more", "date": "2024-01-02",
+     "body": f"Apple Inc. rose {i}.5% today.  Shares of MSFT fell. "
+             f"The U.S. market was mixed – again. Article {i} ends here."}
+    for i in range(23)
+]
+
+
+@pytest.mark.parametrize("splitter", ["rules", "punkt"])
+def test_parallel_segmentation_is_identical(tmp_path, splitter):
+    if splitter == "punkt":
+        pytest.importorskip("nltk")
+    inp = tmp_path / "raw.jsonl"
+    with JsonlWriter(inp) as fout:
+        for art in ARTICLES:
+            fout.write(art)
+    one, many = tmp_path / "one.jsonl.gz", tmp_path / "many.jsonl.gz"
+    segment_file(inp, one, splitter=splitter)
+    segment_file(inp, many, splitter=splitter, n_process=2, batch_size=5)
+    assert many.read_bytes() == one.read_bytes()
+    recs = list(read_records(one))
+    assert [r["sentences"][0] for r in recs] == [f"Headline {i} & more <HEADLINE>"
+                                                 for i in range(23)]
+    assert all(r["sentences"][-1] == f"Article {i} ends here." for i, r in enumerate(recs))
@@ -0,0 +1,41 @@
+"""The ticker_component factory: tagging and a relocatable saved pipeline."""
+import json
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+spacy = pytest.importorskip("spacy")
+
+import nlp.ticker_component  # noqa: E402,F401  (registers the factory)
+
+ROOT = Path(__file__).resolve().parents[1]
+TEXT = "AAPL and MSFT rose while IBM and THE fell."
+
+
+def ents(doc):
+    return [(e.text, e.label_) for e in doc.ents]
+
+
+def test_tags_whitelisted_tickers():
+    pipe = spacy.blank("en")
+    pipe.add_pipe("ticker_component").set_whitelist(["AAPL", "MSFT", "lower"])
+    assert ents(pipe(TEXT)) == [("AAPL", "TICKER"), ("MSFT", "TICKER")]
+
+
+def test_saved_pipeline_loads_from_another_directory(tmp_path):
+    pipe = spacy.blank("en")
+    pipe.add_pipe("ticker_component").set_whitelist(["AAPL", "IBM"])
+    pipe.to_disk(tmp_path / "model")
+    elsewhere = tmp_path / "cwd"
+    elsewhere.mkdir()
+    code = ("import json, spacy, nlp.ticker_component\n"
+            f"doc = spacy.load({str(tmp_path / 'model')!r})({TEXT!r})\n"
+            "print(json.dumps([(e.text, e.label_) for e in doc.ents]))")
+    env = {**os.environ, "PYTHONPATH": str(ROOT)}
+    proc = subprocess.run([sys.executable, "-c", code], cwd=elsewhere, env=env,
+                          capture_output=True, text=True)
+    assert proc.returncode == 0, proc.stderr
+    assert json.loads(proc.stdout) == [["AAPL", "TICKER"], ["IBM", "TICKER"]]
@@ -0,0 +1,95 @@
+"""CompanyMatcher vs. spaCy's PhraseMatcher on tokenization corner cases."""
+import pytest
+
+from nlp.ticker_matcher import CompanyMatcher, regex_tokens
+
+COMPANIES = {
+    "apple": "AAPL",
+    "at&t": "T",
+    "alphabet inc.": "GOOGL",
+    "alphabet inc": "GOOGL",
+    "u.s. steel": "X",
+    "3m": "MMM",
+    "general motors": "GM",
+}
+
+# text → tickers found by the default (regex-token) matcher; where spaCy's
+# tokenizer differs (see nlp.ticker_matcher) the PhraseMatcher set is noted
+CASES = [
+    ("Shares of Apple rose.", {"AAPL"}),
+    ("Apple's margin", {"AAPL"}),
+    ("(Apple) and Pineapple", {"AAPL"}),
+    ("General   Motors cut jobs", {"GM"}),        # spaCy: whitespace token
+    ("AT & T rose.", {"T"}),                      # spaCy: name at&t is one token
+    ("AT&T rose.", {"T"}),
+    ("Alphabet Inc. gained", {"GOOGL"}),          # spaCy: name → alphabet inc .
+    ("U.S. Steel cut output", {"X"}),             # spaCy: name → u.s . steel
+    ("visit apple.com today", {"AAPL"}),          # spaCy: apple.com one token
+    ("the 3M-made mask", {"MMM"}),                # spaCy: name → 3 m
+    ("no company here", set()),
+]
+# where the PhraseMatcher finds nothing
+SPACY_DIFFERS = {"General   Motors cut jobs", "AT & T rose.", "Alphabet Inc. gained",
+                 "U.S. Steel cut output", "visit apple.com today", "the 3M-made mask"}
+
+
+@pytest.fixture(scope="module")
+def matcher():
+    return CompanyMatcher(COMPANIES)
+
+
+@pytest.mark.parametrize("text,expected", CASES)
+def test_find(matcher, text, expected):
+    assert matcher.find(text) == expected
+
+
+@pytest.mark.parametrize("text,expected", CASES)
+def test_spans_point_at_names(matcher, text, expected):
+    spans = matcher.find_spans(text)
+    assert {tk for _, tk in spans} == expected
+    for start, _ in spans:
+        assert text[start].isalnum()
+
+
+def test_spans_offsets(matcher):
+    assert matcher.find_spans("Apple, then Apple again") == [(0, "AAPL"), (12, "AAPL")]
+    assert regex_tokens("AT&T") == [(0, "at"), (2, "&"), (3, "t")]
+
+
+def test_array_automaton_matches(matcher):
+    from nlp.ticker_matcher import ArrayAutomaton
+
+    vocab = sorted({sym for goto in matcher.automaton._goto for sym in goto})
+    tickers = sorted(set(COMPANIES.values()))
+    arrays = matcher.automaton.to_arrays({s: i for i, s in enumerate(vocab)},
+                                         lambda v: (tickers.index(v[0]), v[1]))
+    flat = CompanyMatcher(automaton=ArrayAutomaton(
+        vocab, decode=lambda v: (tickers[v[0]], v[1]), **arrays))
+    for text, expected in CASES:
+        assert flat.find(text) == expected
+        assert flat.find_spans(text) == matcher.find_spans(text)
+
+
+def _phrase_matcher():
+    spacy = pytest.importorskip("spacy")
+    from spacy.matcher import PhraseMatcher
+
+    nlp = spacy.blank("en")
+    pm = PhraseMatcher(nlp.vocab, attr="LOWER")
+    pm.add("COMPANY", [nlp.make_doc(name) for name in COMPANIES])
+
+    def find(text):
+        doc = nlp.make_doc(text)
+        return {COMPANIES[doc[a:b].text.lower()] for _, a, b in pm(doc)
+                if doc[a:b].text.lower() in COMPANIES}
+    return find
+
+
+@pytest.mark.parametrize("text,expected", CASES)
+def test_spacy_tokenizer_matches_phrase_matcher(text, expected):
+    from nlp.ticker_matcher import spacy_tokenizer
+
+    phrase = _phrase_matcher()
+    exact = CompanyMatcher(COMPANIES, tokenizer=spacy_tokenizer())
+    assert exact.find(text) == phrase(text)
+    assert phrase(text) == (set() if text in SPACY_DIFFERS else expected)